@@ -0,0 +1 @@
+"""Benchmarks for the Miner integration."""
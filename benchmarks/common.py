@@ -0,0 +1,63 @@
+"""Shared helpers for running the integration inside a bare Home Assistant."""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import uuid
+
+from homeassistant import bootstrap
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntries
+from homeassistant.core import HomeAssistant
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def config_entry_dict(ip: str, title: str | None = None, **data) -> dict:
+    """Return a stored config entry for a miner at an IP."""
+    return {
+        "entry_id": uuid.uuid4().hex,
+        "version": 1,
+        "domain": "miner",
+        "title": title or ip,
+        "data": {"ip": ip, **data},
+        "options": {},
+        "source": "user",
+        "unique_id": None,
+    }
+
+
+async def async_start_hass(config_dir: str, entries: list[dict]) -> HomeAssistant:
+    """Start a bare Home Assistant that has the given miner entries stored.
+
+    Entries are written to storage before loading, so setting up the miner
+    component sets them all up concurrently, the same as at real startup.
+    Minor version 1 lets Home Assistant migrate the entries to its format.
+    """
+    if REPO_ROOT not in sys.path:
+        # Makes custom_components.miner importable by the loader
+        sys.path.insert(0, REPO_ROOT)
+
+    os.makedirs(os.path.join(config_dir, ".storage"), exist_ok=True)
+    with open(
+        os.path.join(config_dir, ".storage", "core.config_entries"), "w"
+    ) as file:
+        json.dump(
+            {
+                "version": 1,
+                "minor_version": 1,
+                "key": "core.config_entries",
+                "data": {"entries": entries},
+            },
+            file,
+        )
+
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    # Only used by discovery in the config flow, skip its http dependency
+    hass.config.components.add("network")
+    return hass
@@ -0,0 +1,110 @@
+"""Check the import cost of the integration against a budget.
+
+Run from the repository root::
+
+    python -m benchmarks.import_time --budget-ms 50
+
+Imports every module of custom_components.miner in a fresh interpreter
+with ``python -X importtime``. The Home Assistant modules a running
+instance has loaded anyway are imported first and not counted. Exits
+non-zero if pyasic is imported or the remaining cost is over budget.
+Prints a JSON report.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import REPO_ROOT
+
+PACKAGE = "custom_components.miner"
+
+# Loaded by Home Assistant before any custom integration
+PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.diagnostics",
+    "homeassistant.components.number",
+    "homeassistant.components.sensor",
+    "homeassistant.components.switch",
+    "homeassistant.components.select",
+)
+
+MARKER = "-- miner import start --"
+
+
+def integration_modules() -> list[str]:
+    """Return every module of the integration package."""
+    package_dir = os.path.join(REPO_ROOT, *PACKAGE.split("."))
+    return [PACKAGE] + [
+        f"{PACKAGE}.{name[:-3]}"
+        for name in sorted(os.listdir(package_dir))
+        if name.endswith(".py") and name != "__init__.py"
+    ]
+
+
+def measure() -> list[tuple[str, int]]:
+    """Return (module, self time in us) for each module the integration imports."""
+    code = "\n".join(
+        [
+            *(f"import {module}" for module in PRELOADED),
+            f"import sys; sys.stderr.write({MARKER!r} + '\\n')",
+            *(f"import {module}" for module in integration_modules()),
+        ]
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    lines = result.stderr.splitlines()
+    imported = []
+    for line in lines[lines.index(MARKER) + 1 :]:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        imported.append((name.strip(), int(self_us)))
+    return imported
+
+
+def main() -> None:
+    """Run the check from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--budget-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    imported = measure()
+    total_ms = sum(self_us for _, self_us in imported) / 1000
+    pyasic_modules = [name for name, _ in imported if name.split(".")[0] == "pyasic"]
+    slowest = sorted(imported, key=lambda item: item[1], reverse=True)[:10]
+
+    report = {
+        "budget_ms": args.budget_ms,
+        "total_ms": round(total_ms, 2),
+        "modules": len(imported),
+        "pyasic_modules": len(pyasic_modules),
+        "slowest": [
+            {"module": name, "self_ms": round(self_us / 1000, 2)}
+            for name, self_us in slowest
+        ],
+    }
+    print(json.dumps(report, indent=2))  # noqa: T201
+
+    if pyasic_modules:
+        sys.exit("pyasic is imported at module load, import it lazily")
+    if total_ms > args.budget_ms:
+        sys.exit(f"Import took {total_ms:.1f} ms, over the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
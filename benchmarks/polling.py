@@ -0,0 +1,386 @@
+"""Benchmark fleet polling of MinerCoordinator against simulated or recorded miners.
+
+Run from the repository root::
+
+    python -m benchmarks.polling --sizes 1,10,100,1000 --rounds 5
+    python -m benchmarks.polling --replay benchmarks/fixtures/*.json
+    python -m benchmarks.polling --sizes 1000 --workers 3
+
+A simulator (see ``benchmarks.simulator``) is started in its own process
+with the largest fleet size. With ``--replay`` the miners are served from
+recorded fixtures instead (see ``benchmarks.replay``), round robin, with
+no network and no latency. Each size is then measured in a fresh child
+process, so peak RSS and open sockets are its own: a bare Home Assistant
+gets one config entry per miner and a MinerCoordinator is created for
+each, without entities. Every round calls
+``_async_update_data`` once per coordinator, within the same global and
+per subnet limits the poll scheduler applies.
+
+The first round fingerprints the miners and is reported on its own, the
+following rounds are the steady state. One extra round runs under
+tracemalloc for the allocation figures. With ``--workers`` the polls run
+in that many worker processes, see ``custom_components.miner.workers``.
+Prints a JSON report.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .common import REPO_ROOT
+from .common import async_start_hass
+from .common import config_entry_dict
+from .replay import MinerRecording
+from .replay import MinerReplay
+
+DEFAULT_SIZES = (1, 10, 100, 1000)
+# Seconds between event loop lag samples
+LAG_SAMPLE_INTERVAL = 0.01
+# Seconds to wait for the simulator to list its miners
+SIMULATOR_START_TIMEOUT = 120
+
+
+def percentiles(values: list[float], scale: float = 1000) -> dict:
+    """Return p50/p90/p99/max of values, in milliseconds by default."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(fraction: float) -> float:
+        index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+        return round(ordered[index] * scale, 2)
+
+    return {
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+        "p99": pick(0.99),
+        "max": round(ordered[-1] * scale, 2),
+    }
+
+
+def open_sockets() -> int | None:
+    """Return the number of sockets the process has open, if /proc is available."""
+    try:
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return None
+    count = 0
+    for fd in fds:
+        with contextlib.suppress(OSError):
+            count += os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+    return count
+
+
+def peak_rss_mib() -> float:
+    """Return the peak resident set size of the process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class LoopMonitor:
+    """Sample event loop lag and open sockets while a benchmark runs."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.lag: list[float] = []
+        self.peak_sockets = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        samples = 0
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            self.lag.append(max(0.0, loop.time() - start - LAG_SAMPLE_INTERVAL))
+            samples += 1
+            # Listing /proc is too slow to do on every sample
+            if samples % 10 == 0 and (sockets := open_sockets()) is not None:
+                self.peak_sockets = max(self.peak_sockets, sockets)
+
+
+async def async_poll_round(scheduler, coordinators: list) -> tuple[list, int]:
+    """Poll every coordinator once, return the latencies and the error count."""
+    from homeassistant.helpers.update_coordinator import UpdateFailed
+
+    latencies = []
+    errors = 0
+
+    async def poll(coordinator) -> None:
+        nonlocal errors
+        async with scheduler._global_limit, scheduler._subnet_limit(coordinator):
+            start = time.perf_counter()
+            try:
+                await coordinator._async_update_data()
+            except UpdateFailed:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(poll(coordinator) for coordinator in coordinators))
+    return latencies, errors
+
+
+async def async_run_size(
+    hosts: list[str],
+    rounds: int,
+    all_tiers: bool,
+    fixtures: list[str] | None,
+    workers: int = 0,
+) -> dict:
+    """Measure polling the miners at hosts inside a bare Home Assistant.
+
+    With fixtures, the hosts are replayed from them round robin. With
+    workers, polls run in that many worker processes.
+    """
+    from custom_components.miner.coordinator import MinerCoordinator
+    from custom_components.miner.scheduler import MinerPollScheduler
+    from custom_components.miner.workers import MinerWorkerPool
+
+    credentials = {host: {} for host in hosts}
+    with contextlib.ExitStack() as stack:
+        if fixtures:
+            recordings = [MinerRecording.load(path) for path in fixtures]
+            replayed = {
+                host: recordings[index % len(recordings)]
+                for index, host in enumerate(hosts)
+            }
+            credentials = {
+                host: recording.credentials for host, recording in replayed.items()
+            }
+            stack.enter_context(MinerReplay(replayed).patch())
+        config_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        hass = await async_start_hass(
+            config_dir,
+            [config_entry_dict(host, **credentials[host]) for host in hosts],
+        )
+        scheduler = MinerPollScheduler(hass)
+        coordinators = [
+            MinerCoordinator(hass, entry)
+            for entry in hass.config_entries.async_entries("miner")
+        ]
+        if workers:
+            pool = MinerWorkerPool(hass, workers)
+            for coordinator in coordinators:
+                coordinator.worker_pool = pool
+        monitor = LoopMonitor()
+        monitor.start()
+
+        first_latencies, first_errors = await async_poll_round(scheduler, coordinators)
+        first_lag_samples = len(monitor.lag)
+
+        latencies = []
+        errors = 0
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            if all_tiers:
+                for coordinator in coordinators:
+                    coordinator.async_invalidate_cached_fields()
+            round_latencies, round_errors = await async_poll_round(
+                scheduler, coordinators
+            )
+            latencies.extend(round_latencies)
+            errors += round_errors
+        elapsed = time.perf_counter() - start
+        retained_blocks = sys.getallocatedblocks() - blocks_before
+
+        await monitor.stop()
+
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        await async_poll_round(scheduler, coordinators)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if workers:
+            await pool.async_shutdown()
+        await hass.async_stop(force=True)
+
+    polls = len(latencies)
+    return {
+        "miners": len(hosts),
+        "first_round": {
+            "latency_ms": percentiles(first_latencies),
+            "loop_lag_ms": percentiles(monitor.lag[:first_lag_samples]),
+            "errors": first_errors,
+        },
+        "rounds": rounds,
+        "polls": polls,
+        "errors": errors,
+        "latency_ms": percentiles(latencies),
+        "polls_per_second": round(polls / elapsed, 1) if elapsed else None,
+        "loop_lag_ms": percentiles(monitor.lag[first_lag_samples:]),
+        "peak_rss_mib": peak_rss_mib(),
+        "peak_open_sockets": monitor.peak_sockets,
+        "allocations": {
+            "retained_blocks_per_poll": round(retained_blocks / polls, 1)
+            if polls
+            else None,
+            "traced_peak_kib_per_poll": round((peak - baseline) / len(hosts) / 1024, 1),
+            "traced_retained_kib_per_poll": round(
+                (current - baseline) / len(hosts) / 1024, 1
+            ),
+        },
+    }
+
+
+def start_simulator(args: argparse.Namespace, count: int) -> tuple:
+    """Start the simulator process and return it with its miner hosts."""
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.simulator",
+        "--count",
+        str(count),
+        "--mix",
+        args.mix,
+        "--latency",
+        str(args.latency),
+        "--jitter",
+        str(args.jitter),
+        "--timeout-rate",
+        str(args.timeout_rate),
+        "--error-rate",
+        str(args.error_rate),
+    ]
+    process = subprocess.Popen(
+        command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True
+    )
+    # The simulator prints its miners as JSON once they all listen
+    output = ""
+    deadline = time.monotonic() + SIMULATOR_START_TIMEOUT
+    while time.monotonic() < deadline:
+        line = process.stdout.readline()
+        if not line:
+            break
+        output += line
+        with contextlib.suppress(json.JSONDecodeError):
+            miners = json.loads(output)
+            return process, [miner["host"] for miner in miners]
+    process.kill()
+    sys.exit("The simulator did not start, is port 80 available?")
+
+
+def run_child(args: argparse.Namespace, hosts: list[str]) -> dict:
+    """Measure one fleet size in a fresh interpreter."""
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.polling",
+        "--child",
+        "--rounds",
+        str(args.rounds),
+        "--log-level",
+        args.log_level,
+    ]
+    if args.all_tiers:
+        command.append("--all-tiers")
+    if args.workers:
+        command += ["--workers", str(args.workers)]
+    if args.replay:
+        command += ["--replay", *args.replay]
+    result = subprocess.run(
+        command,
+        cwd=REPO_ROOT,
+        input=json.dumps(hosts),
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=list(DEFAULT_SIZES),
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--all-tiers",
+        action="store_true",
+        help="fetch the hashboard and identity tiers on every round",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="poll in this many worker processes, simulated miners only",
+    )
+    parser.add_argument("--mix", default="antminer=4,vnish=3,braiins=2,bitaxe=1")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--replay", nargs="+", metavar="FIXTURE", help="replay recorded miners"
+    )
+    parser.add_argument("--log-level", default="ERROR")
+    # Internal: measure the hosts given on stdin and print the result
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Imported up front as setup does, pyasic also sets the root log level
+        import pyasic  # noqa: F401
+
+        logging.basicConfig(level=args.log_level, force=True)
+        hosts = json.load(sys.stdin)
+        report = asyncio.run(
+            async_run_size(
+                hosts, args.rounds, args.all_tiers, args.replay, args.workers
+            )
+        )
+        print(json.dumps(report))  # noqa: T201
+        return
+
+    if args.replay and args.workers:
+        sys.exit("Worker processes poll over the network, they cannot replay")
+    if args.replay:
+        hosts = [f"10.0.{i // 250}.{i % 250 + 1}" for i in range(max(args.sizes))]
+        results = [run_child(args, hosts[:size]) for size in sorted(args.sizes)]
+        source = {"replay": args.replay}
+    else:
+        simulator, hosts = start_simulator(args, max(args.sizes))
+        try:
+            results = [run_child(args, hosts[:size]) for size in sorted(args.sizes)]
+        finally:
+            simulator.terminate()
+            simulator.wait()
+        source = {"mix": args.mix, "latency": args.latency, "jitter": args.jitter}
+
+    report = {
+        **source,
+        "all_tiers": args.all_tiers,
+        "workers": args.workers,
+        "sizes": results,
+    }
+    print(json.dumps(report, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,730 @@
+"""Record miner traffic as fixtures and replay it to pyasic without a network.
+
+Record a miner while MinerCoordinator polls it, from the repository root::
+
+    python -m benchmarks.replay record 192.168.1.20 benchmarks/fixtures/s19.json --polls 3
+
+``--actions`` also stops and resumes mining and sets the power limit, the
+calls the switch and number entities make. Check that the fixtures still
+parse to the data they were recorded with::
+
+    python -m benchmarks.replay check benchmarks/fixtures/*.json
+
+Exchanges are captured at the transport level: CGMiner RPC as the raw
+bytes sent and received over TCP, HTTP as method, path, body and the
+response, and the Braiins OS gRPC API as serialized protobuf messages.
+Responses to the same request are kept in recorded order, repeats of the
+previous response are dropped, and replay serves them in that order,
+wrapping around. Replay needs no network and adds no latency.
+
+The RPC and web passwords are replaced by REDACTED in recorded requests
+and replayed with REDACTED configured as the password. Other secrets
+the miner returns, like session tokens, are stored as received.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from unittest import mock
+
+from .common import async_start_hass
+from .common import config_entry_dict
+
+FIXTURE_VERSION = 1
+# Stands in for passwords in fixtures, replay configures it as the password
+REDACTED = "**REDACTED**"
+# Distinct responses kept for one request
+MAX_RESPONSES_PER_REQUEST = 10
+# Response headers pyasic looks at
+KEPT_HEADERS = ("content-type", "location", "www-authenticate")
+# pyasic and integration modules that open TCP connections themselves
+CONNECTION_MODULES = (
+    "pyasic.miners.factory",
+    "pyasic.rpc.base",
+    "pyasic.rpc.btminer",
+    "custom_components.miner.breaker",
+)
+# Data of a poll that is compared by check
+CHECKED_KEYS = (
+    "hostname",
+    "mac",
+    "make",
+    "model",
+    "ip",
+    "is_mining",
+    "fw_ver",
+    "miner_sensors",
+    "board_sensors",
+)
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="surrogateescape")
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", errors="surrogateescape")
+
+
+class MinerRecording:
+    """The recorded exchanges of one miner."""
+
+    def __init__(self, name: str = "", data: dict | None = None) -> None:
+        """Initialize a recording, from fixture data if given."""
+        data = data or {}
+        self.name = data.get("name", name)
+        self.recorded_at = data.get("recorded_at", time.time())
+        self.expected: dict | None = data.get("expected")
+        # Entry data to replay with, passwords are REDACTED or empty
+        self.credentials: dict = data.get("credentials", {})
+        self.ports: set[int] = set(data.get("ports", ()))
+        self._exchanges: dict[tuple, list] = {}
+        for item in data.get("rpc", ()):
+            key = ("rpc", item["port"], item["request"])
+            self._exchanges[key] = item["responses"]
+        for item in data.get("http", ()):
+            key = (
+                "http",
+                item["method"],
+                item["port"],
+                item["path"],
+                item["auth"],
+                item["body"],
+            )
+            self._exchanges[key] = item["responses"]
+        for item in data.get("grpc", ()):
+            key = ("grpc", item["route"], item["request"])
+            self._exchanges[key] = item["responses"]
+
+    @classmethod
+    def load(cls, path: str) -> MinerRecording:
+        """Load a recording from a fixture file."""
+        with open(path) as file:
+            data = json.load(file)
+        if data.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"{path} is not a version {FIXTURE_VERSION} fixture")
+        return cls(data=data)
+
+    def save(self, path: str) -> None:
+        """Write the recording to a fixture file."""
+        with open(path, "w") as file:
+            json.dump(self.as_dict(), file, indent=1)
+            file.write("\n")
+
+    def as_dict(self) -> dict:
+        """Return the recording as fixture data."""
+        data = {
+            "version": FIXTURE_VERSION,
+            "name": self.name,
+            "recorded_at": round(self.recorded_at),
+            "ports": sorted(self.ports),
+            "credentials": self.credentials,
+            "rpc": [],
+            "http": [],
+            "grpc": [],
+            "expected": self.expected,
+        }
+        for key, responses in self._exchanges.items():
+            if key[0] == "rpc":
+                item = {"port": key[1], "request": key[2]}
+            elif key[0] == "http":
+                item = dict(zip(("method", "port", "path", "auth", "body"), key[1:]))
+            else:
+                item = {"route": key[1], "request": key[2]}
+            data[key[0]].append({**item, "responses": responses})
+        return data
+
+    def add(self, key: tuple, response) -> None:
+        """Add the response to a request unless it repeats the previous one.
+
+        HTTP responses only differing in headers, like digest challenges with
+        a new nonce, count as repeats.
+        """
+        responses = self._exchanges.setdefault(key, [])
+        if len(responses) >= MAX_RESPONSES_PER_REQUEST:
+            return
+        if responses and _without_headers(responses[-1]) == _without_headers(response):
+            return
+        responses.append(response)
+
+    def responses(self, key: tuple) -> list | None:
+        """Return the responses recorded for a request."""
+        return self._exchanges.get(key)
+
+
+def _without_headers(response):
+    if isinstance(response, dict):
+        return {key: value for key, value in response.items() if key != "headers"}
+    return response
+
+
+def _rpc_key(port: int, request: bytes) -> tuple:
+    """Return the key of an RPC request.
+
+    pyasic joins multicommands from a set, so their order changes between
+    runs; the reply is keyed by command and does not depend on it.
+    """
+    text = _decode(request)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return ("rpc", port, text)
+    if isinstance(data, dict) and isinstance(data.get("command"), str):
+        data["command"] = "+".join(sorted(data["command"].split("+")))
+        text = json.dumps(data)
+    return ("rpc", port, text)
+
+
+def _http_port(url) -> int:
+    return url.port or (443 if url.scheme == "https" else 80)
+
+
+def _http_key(request, body: bytes) -> tuple:
+    return (
+        "http",
+        request.method,
+        _http_port(request.url),
+        _decode(request.url.raw_path),
+        "authorization" in request.headers,
+        _decode(body),
+    )
+
+
+class _AsyncioProxy:
+    """The asyncio module with open_connection replaced."""
+
+    def __init__(self, open_connection) -> None:
+        self.open_connection = open_connection
+
+    def __getattr__(self, name: str):
+        return getattr(asyncio, name)
+
+
+class _RecordingReader:
+    """Stream reader that keeps a copy of what it reads."""
+
+    def __init__(self, reader: asyncio.StreamReader) -> None:
+        self._reader = reader
+        self.received = b""
+
+    async def read(self, n: int = -1) -> bytes:
+        data = await self._reader.read(n)
+        self.received += data
+        return data
+
+    async def readexactly(self, n: int) -> bytes:
+        data = await self._reader.readexactly(n)
+        self.received += data
+        return data
+
+    def __getattr__(self, name: str):
+        return getattr(self._reader, name)
+
+
+class _RecordingWriter:
+    """Stream writer that records the exchange when the connection closes."""
+
+    def __init__(self, writer: asyncio.StreamWriter, on_close) -> None:
+        self._writer = writer
+        self._on_close = on_close
+        self.sent = b""
+
+    def write(self, data: bytes) -> None:
+        self.sent += data
+        self._writer.write(data)
+
+    def close(self) -> None:
+        self._on_close()
+        self._writer.close()
+
+    async def wait_closed(self) -> None:
+        self._on_close()
+        await self._writer.wait_closed()
+
+    def __getattr__(self, name: str):
+        return getattr(self._writer, name)
+
+
+class _ClosedTransport:
+    """Transport of a replayed connection, closed once answered."""
+
+    def is_closing(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+
+class _ReplayWriter:
+    """Stream writer that answers a request from a recording."""
+
+    def __init__(self, reader: asyncio.StreamReader, answer) -> None:
+        self._reader = reader
+        self._answer = answer
+        self._sent = b""
+        self.transport = _ClosedTransport()
+
+    def write(self, data: bytes) -> None:
+        self._sent += data
+
+    async def drain(self) -> None:
+        if self._sent and not self._reader.at_eof():
+            self._reader.feed_data(self._answer(self._sent))
+            self._reader.feed_eof()
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+    async def wait_closed(self) -> None:
+        """Nothing to wait for."""
+
+
+class _RecordingStream:
+    """gRPC stream that records the exchange of a wrapped stream."""
+
+    def __init__(self, recorder: MinerRecorder, host: str, stream, route: str):
+        self._recorder = recorder
+        self._host = host
+        self._stream = stream
+        self._route = route
+        self._request = ""
+        self._response: dict = {}
+
+    async def __aenter__(self):
+        await self._stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        from grpclib.exceptions import GRPCError
+
+        if isinstance(exc_info[1], GRPCError):
+            self._response = {"status": exc_info[1].status.value}
+        self._recorder.recording(self._host).add(
+            ("grpc", self._route, self._request), self._response
+        )
+        return await self._stream.__aexit__(*exc_info)
+
+    async def send_message(self, message, end: bool = False) -> None:
+        await self._stream.send_message(message, end=end)
+        if getattr(message, "password", None):
+            # Key the login the way replay sends it
+            message = type(message)().parse(bytes(message))
+            message.password = self._recorder.redact(message.password)
+        self._request = base64.b64encode(bytes(message)).decode()
+
+    async def recv_initial_metadata(self) -> None:
+        await self._stream.recv_initial_metadata()
+        self._response["metadata"] = dict(self.initial_metadata or {})
+
+    async def recv_message(self):
+        message = await self._stream.recv_message()
+        if message is not None:
+            self._response["message"] = base64.b64encode(bytes(message)).decode()
+        return message
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+
+class _ReplayStream:
+    """gRPC stream that answers from a recording."""
+
+    def __init__(self, replay: MinerReplay, host: str, route: str, reply_type):
+        self._replay = replay
+        self._host = host
+        self._route = route
+        self._reply_type = reply_type
+        self._response: dict | None = None
+        self.initial_metadata = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def send_message(self, message, end: bool = False) -> None:
+        from grpclib.const import Status
+        from grpclib.exceptions import GRPCError
+
+        request = base64.b64encode(bytes(message)).decode()
+        response = self._replay.next_response(
+            self._host, ("grpc", self._route, request)
+        )
+        if response is None:
+            raise GRPCError(Status.UNIMPLEMENTED)
+        if "status" in response:
+            raise GRPCError(Status(response["status"]))
+        self._response = response
+
+    async def recv_initial_metadata(self) -> None:
+        self.initial_metadata = self._response.get("metadata", {})
+
+    async def recv_message(self):
+        message = self._reply_type()
+        if "message" in self._response:
+            message.parse(base64.b64decode(self._response["message"]))
+        return message
+
+
+class MinerRecorder:
+    """Record the traffic pyasic exchanges with a set of hosts."""
+
+    def __init__(self, name: str = "", secrets: tuple[str, ...] = ()) -> None:
+        """Initialize the recorder, secrets are replaced by REDACTED."""
+        self._name = name
+        self._secrets = tuple(secret for secret in secrets if secret)
+        self.recordings: dict[str, MinerRecording] = {}
+        self._transport = None
+
+    def recording(self, host: str) -> MinerRecording:
+        """Return the recording of a host."""
+        if (recording := self.recordings.get(host)) is None:
+            recording = self.recordings[host] = MinerRecording(self._name)
+        return recording
+
+    def redact(self, text: str) -> str:
+        """Return request text with the secrets replaced."""
+        for secret in self._secrets:
+            text = text.replace(secret, REDACTED)
+        return text
+
+    @contextlib.contextmanager
+    def patch(self) -> Iterator[None]:
+        """Record pyasic traffic while the context is active."""
+        from pyasic import settings
+
+        self._transport = settings.transport
+        with _patch_transports(
+            self._open_connection, self._http_transport, self._channel
+        ):
+            yield
+
+    async def _open_connection(self, host, port, **kwargs):
+        host = str(host)
+        reader, writer = await asyncio.open_connection(host, port, **kwargs)
+        self.recording(host).ports.add(port)
+        recording_reader = _RecordingReader(reader)
+        closed = False
+
+        def on_close() -> None:
+            nonlocal closed
+            if closed or not recording_writer.sent:
+                return
+            closed = True
+            self.recording(host).add(
+                _rpc_key(port, _encode(self.redact(_decode(recording_writer.sent)))),
+                _decode(recording_reader.received),
+            )
+
+        recording_writer = _RecordingWriter(writer, on_close)
+        return recording_reader, recording_writer
+
+    def _http_transport(self, *args, **kwargs):
+        import httpx
+
+        recorder = self
+        real = self._transport(*args, **kwargs)
+
+        class RecordingTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                body = await request.aread()
+                key = _http_key(request, _encode(recorder.redact(_decode(body))))
+                recording = recorder.recording(request.url.host)
+                try:
+                    response = await real.handle_async_request(request)
+                    content = await response.aread()
+                except httpx.TimeoutException:
+                    recording.add(key, {"error": "timeout"})
+                    raise
+                except httpx.TransportError:
+                    recording.add(key, {"error": "connect"})
+                    raise
+                recording.ports.add(_http_port(request.url))
+                recording.add(
+                    key,
+                    {
+                        "status": response.status_code,
+                        "headers": {
+                            name: response.headers[name]
+                            for name in KEPT_HEADERS
+                            if name in response.headers
+                        },
+                        "body": _decode(content),
+                    },
+                )
+                return response
+
+            async def aclose(self):
+                await real.aclose()
+
+        return RecordingTransport()
+
+    def _channel(self, host, port, **kwargs):
+        from grpclib.client import Channel
+
+        recorder = self
+        channel = Channel(host, port, **kwargs)
+
+        class RecordingChannel:
+            async def __aenter__(self):
+                await channel.__aenter__()
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return await channel.__aexit__(*exc_info)
+
+            def request(self, route, *args, **kwargs):
+                recorder.recording(str(host)).ports.add(port)
+                return _RecordingStream(
+                    recorder, str(host), channel.request(route, *args, **kwargs), route
+                )
+
+            def close(self):
+                channel.close()
+
+        return RecordingChannel()
+
+
+class MinerReplay:
+    """Serve recorded traffic to pyasic in place of the network."""
+
+    def __init__(self, recordings: dict[str, MinerRecording]) -> None:
+        """Initialize the replay with the recording to serve for each host."""
+        self.recordings = recordings
+        self._served: dict[tuple, int] = {}
+
+    def next_response(self, host: str, key: tuple):
+        """Return the next recorded response to a request, None if unknown."""
+        if (recording := self.recordings.get(host)) is None:
+            return None
+        if not (responses := recording.responses(key)):
+            return None
+        index = self._served.get((host, key), 0)
+        self._served[(host, key)] = index + 1
+        return responses[index % len(responses)]
+
+    @contextlib.contextmanager
+    def patch(self) -> Iterator[None]:
+        """Replay pyasic traffic while the context is active."""
+        with _patch_transports(
+            self._open_connection, self._http_transport, self._channel
+        ):
+            yield
+
+    def _accepts(self, host: str, port: int) -> bool:
+        recording = self.recordings.get(host)
+        return recording is not None and port in recording.ports
+
+    async def _open_connection(self, host, port, **kwargs):
+        host = str(host)
+        if not self._accepts(host, port):
+            raise ConnectionRefusedError(f"Nothing recorded for {host}:{port}")
+        reader = asyncio.StreamReader()
+
+        def answer(request: bytes) -> bytes:
+            response = self.next_response(host, _rpc_key(port, request))
+            return _encode(response or "")
+
+        return reader, _ReplayWriter(reader, answer)
+
+    def _http_transport(self, *args, **kwargs):
+        import httpx
+
+        replay = self
+
+        class ReplayTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                host = request.url.host
+                if not replay._accepts(host, _http_port(request.url)):
+                    raise httpx.ConnectError("Nothing recorded", request=request)
+                body = await request.aread()
+                response = replay.next_response(host, _http_key(request, body))
+                if response is None:
+                    return httpx.Response(404, request=request)
+                if response.get("error") == "timeout":
+                    raise httpx.ReadTimeout("Recorded timeout", request=request)
+                if "error" in response:
+                    raise httpx.ConnectError("Recorded error", request=request)
+                return httpx.Response(
+                    response["status"],
+                    headers=response["headers"],
+                    content=_encode(response["body"]),
+                    request=request,
+                )
+
+        return ReplayTransport()
+
+    def _channel(self, host, port, **kwargs):
+        replay = self
+        host = str(host)
+
+        class ReplayChannel:
+            async def __aenter__(self):
+                if not replay._accepts(host, port):
+                    raise ConnectionRefusedError(f"Nothing recorded for {host}:{port}")
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return None
+
+            def request(self, route, cardinality, request_type, reply_type, **kwargs):
+                return _ReplayStream(replay, host, route, reply_type)
+
+            def close(self):
+                """Nothing to close."""
+
+        return ReplayChannel()
+
+
+@contextlib.contextmanager
+def _patch_transports(open_connection, http_transport, channel) -> Iterator[None]:
+    """Route pyasic's TCP, HTTP and gRPC connections through the given factories."""
+    import importlib
+
+    from pyasic import settings
+    from pyasic.web.braiins_os import boser
+
+    proxy = _AsyncioProxy(open_connection)
+    with contextlib.ExitStack() as stack:
+        for name in CONNECTION_MODULES:
+            module = importlib.import_module(name)
+            stack.enter_context(mock.patch.object(module, "asyncio", proxy))
+        stack.enter_context(mock.patch.object(settings, "transport", http_transport))
+        stack.enter_context(mock.patch.object(boser, "Channel", channel))
+        yield
+
+
+def checked_data(data) -> dict:
+    """Return the comparable part of a MinerSnapshot, as stored in JSON."""
+    data = data.as_dict()
+    return json.loads(
+        json.dumps({key: data.get(key) for key in CHECKED_KEYS}, default=str)
+    )
+
+
+async def async_record(args: argparse.Namespace) -> MinerRecording:
+    """Poll a miner through MinerCoordinator and return the recording."""
+    from custom_components.miner.const import CONF_RPC_PASSWORD
+    from custom_components.miner.const import CONF_WEB_PASSWORD
+    from custom_components.miner.const import CONF_WEB_USERNAME
+    from custom_components.miner.coordinator import MinerCoordinator
+    from custom_components.miner.models import SENSOR_POWER_LIMIT
+
+    recorder = MinerRecorder(
+        args.name or args.host, (args.rpc_password, args.web_password)
+    )
+    credentials = {
+        CONF_RPC_PASSWORD: args.rpc_password,
+        CONF_WEB_USERNAME: args.web_username,
+        CONF_WEB_PASSWORD: args.web_password,
+    }
+    with tempfile.TemporaryDirectory() as config_dir, recorder.patch():
+        hass = await async_start_hass(
+            config_dir, [config_entry_dict(args.host, **credentials)]
+        )
+        coordinator = MinerCoordinator(
+            hass, hass.config_entries.async_entries("miner")[0]
+        )
+        expected = checked_data(await coordinator._async_update_data())
+        for _ in range(args.polls - 1):
+            # Fetch every tier so the slow ones get more than one sample
+            coordinator.async_invalidate_cached_fields()
+            data = await coordinator._async_update_data()
+
+        if args.actions and (miner := coordinator.miner) is not None:
+            await miner.stop_mining()
+            await coordinator._async_update_data()
+            await miner.resume_mining()
+            data = await coordinator._async_update_data()
+            if (limit := data.sensors[SENSOR_POWER_LIMIT]) is not None:
+                await miner.set_power_limit(int(limit))
+        await hass.async_stop(force=True)
+
+    recording = recorder.recording(args.host)
+    recording.expected = expected
+    recording.credentials = {
+        CONF_RPC_PASSWORD: recorder.redact(args.rpc_password),
+        CONF_WEB_USERNAME: args.web_username,
+        CONF_WEB_PASSWORD: recorder.redact(args.web_password),
+    }
+    return recording
+
+
+async def async_check(path: str) -> dict:
+    """Replay a fixture through MinerCoordinator and compare its first poll."""
+    from custom_components.miner.coordinator import MinerCoordinator
+
+    recording = MinerRecording.load(path)
+    host = "127.0.0.1"
+    replay = MinerReplay({host: recording})
+    with tempfile.TemporaryDirectory() as config_dir, replay.patch():
+        hass = await async_start_hass(
+            config_dir, [config_entry_dict(host, **recording.credentials)]
+        )
+        coordinator = MinerCoordinator(
+            hass, hass.config_entries.async_entries("miner")[0]
+        )
+        start = time.perf_counter()
+        data = checked_data(await coordinator._async_update_data())
+        seconds = time.perf_counter() - start
+        await hass.async_stop(force=True)
+
+    expected = dict(recording.expected or {}, ip=host)
+    differences = {
+        key: {"expected": expected.get(key), "replayed": data.get(key)}
+        for key in CHECKED_KEYS
+        if expected.get(key) != data.get(key)
+    }
+    return {
+        "fixture": path,
+        "name": recording.name,
+        "poll_ms": round(seconds * 1000, 2),
+        "differences": differences,
+    }
+
+
+def main() -> None:
+    """Record or check fixtures from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="record a miner to a fixture")
+    record.add_argument("host")
+    record.add_argument("output")
+    record.add_argument("--name")
+    record.add_argument("--polls", type=int, default=3)
+    record.add_argument(
+        "--actions",
+        action="store_true",
+        help="also stop and resume mining and set the power limit",
+    )
+    record.add_argument("--rpc-password", default="")
+    record.add_argument("--web-username", default="")
+    record.add_argument("--web-password", default="")
+
+    check = commands.add_parser("check", help="check fixtures still parse the same")
+    check.add_argument("fixtures", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        recording = asyncio.run(async_record(args))
+        recording.save(args.output)
+        print(json.dumps(recording.expected, indent=2))  # noqa: T201
+        return
+
+    results = [asyncio.run(async_check(path)) for path in args.fixtures]
+    print(json.dumps(results, indent=2))  # noqa: T201
+    if any(result["differences"] for result in results):
+        sys.exit("Replayed data differs from the recording")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1297 @@
+"""Simulate a fleet of miners on localhost.
+
+Run from the repository root::
+
+    python -m benchmarks.simulator --count 100 --mix antminer=4,vnish=3,braiins=2,bitaxe=1
+
+Each simulated miner listens on its own loopback address (127.1.0.1,
+127.1.0.2, ...) on the ports pyasic expects: CGMiner RPC on TCP 4028 and
+the web API on port 80. ``pyasic.get_miner`` fingerprints them like real
+hardware, so the integration runs against them unchanged.
+
+Firmwares:
+
+- ``antminer``: stock Bitmain, digest authenticated CGI web API and
+  bmminer RPC that rejects joined multicommands, like an S19/S21.
+- ``vnish``: VNish web API with token unlock, plus bmminer style RPC.
+- ``braiins``: Braiins OS+ gRPC API on port 50051 and BOSMiner RPC.
+- ``bitaxe``: AxeOS HTTP API, no RPC port.
+
+Faults are injected per miner: added latency, requests that hang,
+random error responses, commands that always fail, a miner that is
+offline, and the VNish autotune presets reply that makes pyasic fail
+to read the config.
+
+Binding port 80 needs root or ``sysctl net.ipv4.ip_unprivileged_port_start=80``.
+Two or three sockets are listened on per miner, raise ``ulimit -n`` for large fleets.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import ipaddress
+import json
+import random
+import secrets
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+
+from aiohttp import web
+
+FIRMWARE_ANTMINER = "antminer"
+FIRMWARE_VNISH = "vnish"
+FIRMWARE_BRAIINS = "braiins"
+FIRMWARE_BITAXE = "bitaxe"
+FIRMWARES = (FIRMWARE_ANTMINER, FIRMWARE_VNISH, FIRMWARE_BRAIINS, FIRMWARE_BITAXE)
+
+RPC_PORT = 4028
+WEB_PORT = 80
+GRPC_PORT = 50051
+
+# First simulated address, miners are numbered upwards from here
+FIRST_ADDRESS = ipaddress.IPv4Address("127.1.0.1")
+
+VNISH_VERSION = "1.2.6"
+BRAIINS_VERSION = "2024-09-18-0-62b47a04-24.08-plus"
+ANTMINER_COMPILE_TIME = "Thu Jul 13 19:20:36 CST 2023"
+AXEOS_VERSION = "v2.4.2"
+
+
+@dataclass(frozen=True)
+class MinerModel:
+    """Hardware profile a simulated miner reports."""
+
+    name: str
+    boards: int
+    chips: int
+    # Nominal hashrate of the whole miner in GH/s
+    ideal_ghs: float
+    watts: int
+    fans: int
+
+
+MODELS = {
+    "S19j Pro": MinerModel("Antminer S19j Pro", 3, 126, 104_000, 3068, 4),
+    "S19k Pro": MinerModel("Antminer S19k Pro", 3, 77, 120_000, 2760, 4),
+    "S21": MinerModel("Antminer S21", 3, 108, 200_000, 3500, 4),
+    "BM1370": MinerModel("BM1370", 1, 1, 1_070, 18, 1),
+    "BM1366": MinerModel("BM1366", 1, 1, 500, 12, 1),
+}
+
+DEFAULT_MODELS = {
+    FIRMWARE_ANTMINER: "S21",
+    FIRMWARE_VNISH: "S19j Pro",
+    FIRMWARE_BRAIINS: "S19j Pro",
+    FIRMWARE_BITAXE: "BM1370",
+}
+
+# Power presets offered by the VNish autotuner, in watts
+VNISH_PRESETS = (2500, 2800, 3100, 3400)
+
+
+@dataclass
+class MinerFaults:
+    """Faults injected into the responses of one miner."""
+
+    # Seconds added to every response, plus a random spread
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Probability a request is never answered; the connection is held for
+    # hang seconds and then closed
+    timeout_rate: float = 0.0
+    hang: float = 30.0
+    # Probability a request is answered with an error
+    error_rate: float = 0.0
+    # RPC commands or web paths that always return an error
+    failing_commands: frozenset[str] = frozenset()
+    # Refuse all connections
+    offline: bool = False
+    # Serve the VNish autotune presets in the shape pyasic fails to parse
+    vnish_config_bug: bool = False
+
+
+@dataclass
+class SimulatedMiner:
+    """State of one simulated miner."""
+
+    host: str
+    firmware: str
+    model: MinerModel
+    faults: MinerFaults = field(default_factory=MinerFaults)
+    is_mining: bool = True
+    power_limit: int | None = None
+    started_at: float = field(default_factory=time.time)
+    requests: int = 0
+
+    def __post_init__(self) -> None:
+        """Derive stable identity values from the address."""
+        self._random = random.Random(self.host)
+        suffix = self.host.rsplit(".", 2)
+        self.hostname = f"{self.firmware}-{suffix[1]}-{suffix[2]}"
+        self.mac = "02:00:" + ":".join(
+            f"{part:02X}" for part in ipaddress.IPv4Address(self.host).packed
+        )
+        self.serials = [
+            f"SIM{self._random.randrange(16**10):010X}"
+            for _ in range(self.model.boards)
+        ]
+        if self.power_limit is None:
+            self.power_limit = self.model.watts
+        self.token = secrets.token_hex(8)
+
+    @property
+    def uptime(self) -> int:
+        """Return seconds since the miner started."""
+        return int(time.time() - self.started_at)
+
+    def board_hashrates(self) -> list[float]:
+        """Return the current hashrate of each board in GH/s."""
+        if not self.is_mining:
+            return [0.0] * self.model.boards
+        scale = min(1.0, self.power_limit / self.model.watts)
+        per_board = self.model.ideal_ghs * scale / self.model.boards
+        return [
+            round(per_board * self._random.gauss(1, 0.01), 2)
+            for _ in range(self.model.boards)
+        ]
+
+    def board_temperatures(self) -> list[tuple[float, float]]:
+        """Return (board, chip) temperatures of each board."""
+        if not self.is_mining:
+            return [(30.0, 32.0)] * self.model.boards
+        return [
+            (
+                round(self._random.gauss(58, 1.5), 1),
+                round(self._random.gauss(72, 2), 1),
+            )
+            for _ in range(self.model.boards)
+        ]
+
+    def wattage(self) -> int:
+        """Return the current power draw."""
+        if not self.is_mining:
+            return 15
+        return round(self.power_limit * self._random.gauss(0.98, 0.005))
+
+    def fan_speeds(self) -> list[int]:
+        """Return the speed of each fan in RPM."""
+        base = 5400 if self.is_mining else 1200
+        return [round(self._random.gauss(base, 60)) for _ in range(self.model.fans)]
+
+    def fault_for(self, command: str) -> str | None:
+        """Return the fault to inject into a request, if any.
+
+        One of "hang" or "error"; None answers normally.
+        """
+        self.requests += 1
+        faults = self.faults
+        if command in faults.failing_commands:
+            return "error"
+        if faults.timeout_rate and self._random.random() < faults.timeout_rate:
+            return "hang"
+        if faults.error_rate and self._random.random() < faults.error_rate:
+            return "error"
+        return None
+
+    async def delay(self) -> None:
+        """Sleep for the injected latency."""
+        faults = self.faults
+        if faults.latency or faults.jitter:
+            await asyncio.sleep(
+                max(0.0, faults.latency + self._random.uniform(-1, 1) * faults.jitter)
+            )
+
+
+# CGMiner RPC
+
+
+def _status(code: str, msg: str, description: str) -> list[dict]:
+    """Return a CGMiner STATUS section."""
+    return [
+        {
+            "STATUS": code,
+            "When": int(time.time()),
+            "Code": 11 if code == "S" else 14,
+            "Msg": msg,
+            "Description": description,
+        }
+    ]
+
+
+def rpc_response(miner: SimulatedMiner, request: dict) -> dict:
+    """Return the RPC reply of a miner to a request."""
+    command = str(request.get("command", ""))
+    description = {
+        FIRMWARE_ANTMINER: "bmminer 1.0.0",
+        FIRMWARE_VNISH: "bmminer 1.0.0",
+        FIRMWARE_BRAIINS: "BOSminer bosminer-plus-tuner 0.2.0",
+    }[miner.firmware]
+
+    if "+" in command:
+        if miner.firmware == FIRMWARE_ANTMINER:
+            # Stock bmminer does not support joined commands
+            return {"STATUS": _status("E", "Invalid command", description), "id": 1}
+        reply = {
+            name: [rpc_response(miner, {"command": name})]
+            for name in command.split("+")
+        }
+        reply["id"] = 1
+        return reply
+
+    handler = RPC_COMMANDS[miner.firmware].get(command)
+    if handler is None or command in miner.faults.failing_commands:
+        return {"STATUS": _status("E", "Invalid command", description), "id": 1}
+    reply = handler(miner, request)
+    reply.setdefault("STATUS", _status("S", command, description))
+    reply["id"] = 1
+    return reply
+
+
+def _bmminer_version(miner: SimulatedMiner, request: dict) -> dict:
+    version = {
+        "BMMiner": "1.0.0",
+        "API": "3.1",
+        "Miner": "uart_trans.1.3",
+        "CompileTime": ANTMINER_COMPILE_TIME,
+        "Type": miner.model.name,
+    }
+    if miner.firmware == FIRMWARE_VNISH:
+        # VNish names itself instead of the model, which fingerprints it
+        version["Miner"] = f"Vnish {VNISH_VERSION}"
+        del version["Type"]
+    return {"VERSION": [version]}
+
+
+def _bmminer_summary(miner: SimulatedMiner, request: dict) -> dict:
+    total = sum(miner.board_hashrates())
+    summary = {
+        "Elapsed": miner.uptime,
+        "GHS 5s": round(total, 2),
+        "GHS av": round(total, 2),
+        "Found Blocks": 0,
+        "Getworks": miner.uptime // 30,
+        "Accepted": miner.uptime // 4,
+        "Rejected": miner.uptime // 900,
+        "Hardware Errors": 12,
+        "Utility": 15.2,
+        "Best Share": 2104852331,
+    }
+    if request.get("new_api"):
+        summary = {
+            "elapsed": miner.uptime,
+            "rate_5s": round(total, 2),
+            "rate_avg": round(total, 2),
+            "rate_ideal": miner.model.ideal_ghs,
+            "rate_unit": "GH/s",
+            "hw_all": 12,
+            "bestshare": 2104852331,
+            "status": [
+                {"type": "rate", "status": "s", "code": 0, "msg": ""},
+                {"type": "network", "status": "s", "code": 0, "msg": ""},
+                {"type": "fans", "status": "s", "code": 0, "msg": ""},
+                {"type": "temp", "status": "s", "code": 0, "msg": ""},
+            ],
+        }
+    return {"SUMMARY": [summary]}
+
+
+def _bmminer_stats(miner: SimulatedMiner, request: dict) -> dict:
+    rates = miner.board_hashrates()
+    temps = miner.board_temperatures()
+    fans = miner.fan_speeds()
+    model = miner.model
+
+    if request.get("new_api"):
+        chains = []
+        for index, (rate, (board_temp, chip_temp)) in enumerate(zip(rates, temps)):
+            chains.append(
+                {
+                    "index": index,
+                    "freq_avg": 490,
+                    "rate_ideal": round(model.ideal_ghs / model.boards, 2),
+                    "rate_real": rate,
+                    "asic_num": model.chips,
+                    "temp_pic": [
+                        board_temp - 4,
+                        board_temp - 3,
+                        board_temp,
+                        board_temp - 2,
+                    ],
+                    "temp_pcb": [
+                        board_temp - 6,
+                        board_temp - 4,
+                        board_temp,
+                        board_temp - 2,
+                    ],
+                    "temp_chip": [
+                        chip_temp - 3,
+                        chip_temp - 1,
+                        chip_temp,
+                        chip_temp - 2,
+                    ],
+                    "hw": 4,
+                    "eeprom_loaded": True,
+                    "sn": miner.serials[index],
+                }
+            )
+        return {
+            "STATS": [
+                {
+                    "elapsed": miner.uptime,
+                    "rate_5s": round(sum(rates), 2),
+                    "rate_avg": round(sum(rates), 2),
+                    "rate_ideal": model.ideal_ghs,
+                    "rate_unit": "GH/s",
+                    "chain_num": model.boards,
+                    "fan_num": model.fans,
+                    "fan": fans,
+                    "hwp_total": 0.0002,
+                    "miner-mode": 0 if miner.is_mining else 1,
+                    "freq-level": 100,
+                    "chain": chains,
+                }
+            ]
+        }
+
+    stats = {
+        "Elapsed": miner.uptime,
+        "GHS 5s": round(sum(rates), 2),
+        "GHS av": round(sum(rates), 2),
+        "miner_count": model.boards,
+        "frequency": 490,
+        "fan_num": model.fans,
+        "total_rateideal": model.ideal_ghs,
+        "rate_unit": "GH",
+        "total_freqavg": 490,
+        "total_acn": model.chips * model.boards,
+        "total_rate": round(sum(rates), 2),
+        "temp_max": max(chip for _, chip in temps),
+        "no_matching_work": 0,
+    }
+    for fan, speed in enumerate(fans, start=1):
+        stats[f"fan{fan}"] = speed
+    for slot, (rate, (board_temp, chip_temp)) in enumerate(zip(rates, temps), start=1):
+        stats[f"chain_acn{slot}"] = model.chips
+        stats[f"chain_acs{slot}"] = " ".join(["oooooooo"] * (model.chips // 8))
+        stats[f"chain_rate{slot}"] = rate
+        stats[f"chain_rateideal{slot}"] = round(model.ideal_ghs / model.boards, 2)
+        stats[f"chain_hw{slot}"] = 4
+        stats[f"temp{slot}"] = chip_temp
+        stats[f"temp2_{slot}"] = board_temp
+        stats[f"temp_pcb{slot}"] = f"{board_temp - 6:.0f}-{board_temp:.0f}"
+        stats[f"temp_chip{slot}"] = f"{chip_temp - 3:.0f}-{chip_temp:.0f}"
+    version = {"BMMiner": "1.0.0", "Miner": "uart_trans.1.3", "Type": miner.model.name}
+    if miner.firmware == FIRMWARE_VNISH:
+        version["Type"] = f"{miner.model.name} (Vnish {VNISH_VERSION})"
+    return {"STATS": [version, stats]}
+
+
+def _pools(miner: SimulatedMiner, request: dict) -> dict:
+    return {
+        "POOLS": [
+            {
+                "POOL": 0,
+                "URL": "stratum+tcp://pool.example.com:3333",
+                "Status": "Alive",
+                "Priority": 0,
+                "Accepted": miner.uptime // 4,
+                "Rejected": miner.uptime // 900,
+                "Get Failures": 0,
+                "Remote Failures": 0,
+                "User": f"sim.{miner.hostname}",
+                "Stratum Active": True,
+            }
+        ]
+    }
+
+
+def _devdetails(miner: SimulatedMiner, request: dict) -> dict:
+    model = f"Bitmain {miner.model.name}"
+    return {
+        "DEVDETAILS": [
+            {
+                "DEVDETAILS": slot,
+                "Name": "Hashchain",
+                "ID": slot + 1,
+                "Driver": "bosminer",
+                "Kernel": "",
+                "Model": model,
+                "Chips": miner.model.chips,
+                "Frequency": 490.0,
+                "Voltage": 13.9,
+            }
+            for slot in range(miner.model.boards)
+        ]
+    }
+
+
+def _bosminer_version(miner: SimulatedMiner, request: dict) -> dict:
+    return {"VERSION": [{"BOSminer": "0.2.0-11012d53", "API": "3.7"}]}
+
+
+def _bosminer_summary(miner: SimulatedMiner, request: dict) -> dict:
+    total_mhs = sum(miner.board_hashrates()) * 1000
+    return {
+        "SUMMARY": [
+            {
+                "Elapsed": miner.uptime,
+                "MHS av": round(total_mhs, 2),
+                "MHS 5s": round(total_mhs, 2),
+                "MHS 1m": round(total_mhs, 2),
+                "MHS 5m": round(total_mhs, 2),
+                "MHS 15m": round(total_mhs, 2),
+                "Accepted": miner.uptime // 4,
+                "Rejected": miner.uptime // 900,
+                "Hardware Errors": 0,
+            }
+        ]
+    }
+
+
+def _bosminer_devs(miner: SimulatedMiner, request: dict) -> dict:
+    nominal = miner.model.ideal_ghs * 1000 / miner.model.boards
+    return {
+        "DEVS": [
+            {
+                "ASC": slot,
+                "Name": "",
+                "ID": slot + 1,
+                "Enabled": "Y",
+                "Status": "Alive" if miner.is_mining else "Dead",
+                "MHS av": rate * 1000,
+                "MHS 5s": rate * 1000,
+                "MHS 1m": rate * 1000,
+                "MHS 5m": rate * 1000,
+                "MHS 15m": rate * 1000,
+                "Nominal MHS": nominal,
+                "Hardware Errors": 0,
+            }
+            for slot, rate in enumerate(miner.board_hashrates())
+        ]
+    }
+
+
+def _bosminer_temps(miner: SimulatedMiner, request: dict) -> dict:
+    return {
+        "TEMPS": [
+            {"TEMPS": slot, "ID": slot + 1, "Board": board, "Chip": chip}
+            for slot, (board, chip) in enumerate(miner.board_temperatures())
+        ]
+    }
+
+
+def _bosminer_fans(miner: SimulatedMiner, request: dict) -> dict:
+    return {
+        "FANS": [
+            {"FANS": fan, "ID": fan, "RPM": speed, "Speed": 100}
+            for fan, speed in enumerate(miner.fan_speeds())
+        ]
+    }
+
+
+def _bosminer_tunerstatus(miner: SimulatedMiner, request: dict) -> dict:
+    per_board = miner.wattage() // miner.model.boards
+    return {
+        "TUNERSTATUS": [
+            {
+                "PowerLimit": miner.power_limit,
+                "DynamicPowerScaling": "Disabled",
+                "ApproximateMinerPowerConsumption": miner.wattage(),
+                "ApproximateChainPowerConsumption": per_board * miner.model.boards,
+                "TunerChainStatus": [
+                    {
+                        "HashchainIndex": slot,
+                        "Iteration": 4,
+                        "StageElapsed": miner.uptime,
+                        "ApproximatePowerConsumptionWatt": per_board,
+                        "PowerLimitWatt": miner.power_limit // miner.model.boards,
+                        "HashrateGHS": rate,
+                        "TunerRunning": False,
+                        "Status": "Stable",
+                    }
+                    for slot, rate in enumerate(miner.board_hashrates())
+                ],
+            }
+        ]
+    }
+
+
+def _bosminer_pause(miner: SimulatedMiner, request: dict) -> dict:
+    miner.is_mining = False
+    return {"PAUSE": [{"PAUSE": True}]}
+
+
+def _bosminer_resume(miner: SimulatedMiner, request: dict) -> dict:
+    miner.is_mining = True
+    return {"RESUME": [{"RESUME": True}]}
+
+
+RPC_COMMANDS = {
+    FIRMWARE_ANTMINER: {
+        "version": _bmminer_version,
+        "summary": _bmminer_summary,
+        "stats": _bmminer_stats,
+        "pools": _pools,
+    },
+    FIRMWARE_VNISH: {
+        "version": _bmminer_version,
+        "summary": _bmminer_summary,
+        "stats": _bmminer_stats,
+        "pools": _pools,
+    },
+    FIRMWARE_BRAIINS: {
+        "version": _bosminer_version,
+        "summary": _bosminer_summary,
+        "devs": _bosminer_devs,
+        "devdetails": _devdetails,
+        "temps": _bosminer_temps,
+        "fans": _bosminer_fans,
+        "tunerstatus": _bosminer_tunerstatus,
+        "pools": _pools,
+        "pause": _bosminer_pause,
+        "resume": _bosminer_resume,
+    },
+}
+
+
+async def _read_rpc_request(reader: asyncio.StreamReader) -> dict | None:
+    """Read one JSON request, the client keeps its side open."""
+    data = b""
+    while chunk := await reader.read(4096):
+        data += chunk
+        try:
+            return json.loads(data)
+        except ValueError:
+            continue
+    return None
+
+
+def _rpc_handler(miner: SimulatedMiner):
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            if (request := await _read_rpc_request(reader)) is None:
+                return
+            fault = miner.fault_for(str(request.get("command")))
+            if fault == "hang":
+                await asyncio.sleep(miner.faults.hang)
+                return
+            await miner.delay()
+            if fault == "error":
+                reply = {"STATUS": _status("E", "Internal error", "bmminer"), "id": 1}
+            else:
+                reply = rpc_response(miner, request)
+            writer.write(json.dumps(reply).encode() + b"\x00")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+# Braiins OS+ gRPC
+
+
+async def _grpc_fault(miner: SimulatedMiner, method: str) -> None:
+    """Apply the injected faults to a gRPC call."""
+    from grpclib import GRPCError
+    from grpclib.const import Status
+
+    fault = miner.fault_for(method)
+    if fault == "hang":
+        await asyncio.sleep(miner.faults.hang)
+    await miner.delay()
+    if fault is not None:
+        raise GRPCError(Status.UNAVAILABLE, "Simulated failure")
+
+
+def _grpc_services(miner: SimulatedMiner) -> list:
+    """Return the Braiins OS+ gRPC services of a miner.
+
+    Built on the service bases pyasic generates for its own client, which
+    are imported here so only Braiins miners need them.
+    """
+    from grpclib.const import Cardinality
+    from grpclib.const import Handler
+    from pyasic.web.braiins_os.proto.braiins.bos import v1 as bos
+
+    def giga(rate: float) -> bos.GigaHashrate:
+        return bos.GigaHashrate(gigahash_per_second=rate)
+
+    class Authentication(bos.AuthenticationServiceBase):
+        async def _rpc_login(self, stream) -> None:
+            await stream.recv_message()
+            await _grpc_fault(miner, "Login")
+            # pyasic reads the token from the initial metadata
+            await stream.send_initial_metadata(metadata={"authorization": miner.token})
+            await stream.send_message(
+                bos.LoginResponse(token=miner.token, timeout_s=3600)
+            )
+
+        def __mapping__(self) -> dict:
+            mapping = super().__mapping__()
+            mapping["/braiins.bos.v1.AuthenticationService/Login"] = Handler(
+                self._rpc_login,
+                Cardinality.UNARY_UNARY,
+                bos.LoginRequest,
+                bos.LoginResponse,
+            )
+            return mapping
+
+    class Miner(bos.MinerServiceBase):
+        async def get_miner_details(self, request) -> bos.GetMinerDetailsResponse:
+            await _grpc_fault(miner, "GetMinerDetails")
+            return bos.GetMinerDetailsResponse(
+                uid=miner.serials[0],
+                miner_identity=bos.MinerIdentity(
+                    name=miner.model.name, miner_model=miner.model.name
+                ),
+                bos_version=bos.BosVersion(
+                    current=BRAIINS_VERSION, major="24.08", bos_plus=True
+                ),
+                hostname=miner.hostname,
+                mac_address=miner.mac,
+                system_uptime=miner.uptime,
+                sticker_hashrate=giga(miner.model.ideal_ghs),
+                bosminer_uptime_s=miner.uptime,
+                system_uptime_s=miner.uptime,
+            )
+
+        async def get_miner_stats(self, request) -> bos.GetMinerStatsResponse:
+            await _grpc_fault(miner, "GetMinerStats")
+            total = sum(miner.board_hashrates())
+            return bos.GetMinerStatsResponse(
+                miner_stats=bos.WorkSolverStats(
+                    real_hashrate=bos.RealHashrate(
+                        last_5_s=giga(total), last_1_m=giga(total)
+                    ),
+                    nominal_hashrate=giga(miner.model.ideal_ghs),
+                ),
+                power_stats=bos.MinerPowerStats(
+                    approximated_consumption=bos.Power(watt=miner.wattage())
+                ),
+            )
+
+        async def get_hashboards(self, request) -> bos.GetHashboardsResponse:
+            await _grpc_fault(miner, "GetHashboards")
+            boards = zip(miner.board_hashrates(), miner.board_temperatures())
+            return bos.GetHashboardsResponse(
+                hashboards=[
+                    bos.Hashboard(
+                        id=str(slot + 1),
+                        enabled=True,
+                        chips_count=miner.model.chips,
+                        highest_chip_temp=bos.TemperatureSensor(
+                            temperature=bos.Temperature(degree_c=chip)
+                        ),
+                        board_temp=bos.Temperature(degree_c=board),
+                        stats=bos.WorkSolverStats(
+                            real_hashrate=bos.RealHashrate(last_5_s=giga(rate)),
+                            nominal_hashrate=giga(
+                                miner.model.ideal_ghs / miner.model.boards
+                            ),
+                        ),
+                        serial_number=miner.serials[slot],
+                    )
+                    for slot, (rate, (board, chip)) in enumerate(boards)
+                ]
+            )
+
+    class Performance(bos.PerformanceServiceBase):
+        async def get_active_performance_mode(self, request) -> bos.PerformanceMode:
+            await _grpc_fault(miner, "GetActivePerformanceMode")
+            return bos.PerformanceMode(
+                tuner_mode=bos.TunerPerformanceMode(
+                    power_target=bos.PowerTargetMode(
+                        power_target=bos.Power(watt=miner.power_limit)
+                    )
+                )
+            )
+
+        async def set_power_target(self, request) -> bos.SetPowerTargetResponse:
+            await _grpc_fault(miner, "SetPowerTarget")
+            miner.power_limit = request.power_target.watt
+            return bos.SetPowerTargetResponse(
+                power_target=bos.Power(watt=miner.power_limit)
+            )
+
+    class Cooling(bos.CoolingServiceBase):
+        async def get_cooling_state(self, request) -> bos.GetCoolingStateResponse:
+            await _grpc_fault(miner, "GetCoolingState")
+            return bos.GetCoolingStateResponse(
+                fans=[
+                    bos.FanState(position=fan, rpm=speed)
+                    for fan, speed in enumerate(miner.fan_speeds())
+                ]
+            )
+
+    class Configuration(bos.ConfigurationServiceBase):
+        async def get_miner_configuration(
+            self, request
+        ) -> bos.GetMinerConfigurationResponse:
+            await _grpc_fault(miner, "GetMinerConfiguration")
+            return bos.GetMinerConfigurationResponse(
+                pool_groups=[
+                    bos.PoolGroupConfiguration(
+                        uid="1",
+                        name="Default",
+                        quota=bos.Quota(value=1),
+                        pools=[
+                            bos.PoolConfiguration(
+                                uid="1",
+                                url="stratum+tcp://pool.example.com:3333",
+                                user=f"sim.{miner.hostname}",
+                                password="x",
+                                enabled=True,
+                            )
+                        ],
+                    )
+                ],
+                tuner=bos.TunerConfiguration(
+                    enabled=True,
+                    tuner_mode=bos.TunerMode.POWER_TARGET,
+                    power_target=bos.Power(watt=miner.power_limit),
+                ),
+            )
+
+    class Actions(bos.ActionsServiceBase):
+        async def pause_mining(self, request) -> bos.PauseMiningResponse:
+            await _grpc_fault(miner, "PauseMining")
+            already_paused = not miner.is_mining
+            miner.is_mining = False
+            return bos.PauseMiningResponse(already_paused=already_paused)
+
+        async def resume_mining(self, request) -> bos.ResumeMiningResponse:
+            await _grpc_fault(miner, "ResumeMining")
+            already_mining = miner.is_mining
+            miner.is_mining = True
+            return bos.ResumeMiningResponse(already_mining=already_mining)
+
+    return [
+        Authentication(),
+        Miner(),
+        Performance(),
+        Cooling(),
+        Configuration(),
+        Actions(),
+    ]
+
+
+# Web API
+
+
+async def _antminer_routes(miner: SimulatedMiner, request: web.Request):
+    path = request.path
+    if (
+        path == "/"
+        or request.headers.get("Authorization", "").split(" ")[0] != "Digest"
+    ):
+        return web.Response(
+            status=401,
+            headers={
+                "WWW-Authenticate": (
+                    'Digest realm="antMiner Configuration", '
+                    f'nonce="{secrets.token_hex(16)}", qop="auth"'
+                )
+            },
+        )
+    if not path.startswith("/cgi-bin/") or not path.endswith(".cgi"):
+        return web.Response(status=404, text="Not Found")
+    command = path[len("/cgi-bin/") : -len(".cgi")]
+
+    if command == "get_system_info":
+        return {
+            "minertype": miner.model.name,
+            "nettype": "DHCP",
+            "netdevice": "eth0",
+            "macaddr": miner.mac,
+            "hostname": miner.hostname,
+            "ipaddress": miner.host,
+            "netmask": "255.255.255.0",
+            "gateway": "",
+            "dnsservers": "",
+            "system_mode": "GNU/Linux",
+            "system_kernel_version": "Linux 4.9.38 #1 SMP PREEMPT",
+            "system_filesystem_version": ANTMINER_COMPILE_TIME,
+            "firmware_type": "Release",
+            "serinum": f"SIM{miner.mac.replace(':', '')}",
+        }
+    if command == "get_network_info":
+        return {
+            "nettype": "DHCP",
+            "netdevice": "eth0",
+            "macaddr": miner.mac,
+            "ipaddress": miner.host,
+            "netmask": "255.255.255.0",
+            "conf_nettype": "DHCP",
+            "conf_hostname": miner.hostname,
+            "conf_ipaddress": "",
+            "conf_netmask": "",
+            "conf_gateway": "",
+            "conf_dnsservers": "",
+        }
+    if command == "get_miner_conf":
+        return {
+            "pools": [
+                {
+                    "url": "stratum+tcp://pool.example.com:3333",
+                    "user": f"sim.{miner.hostname}",
+                    "pass": "x",
+                }
+            ],
+            "api-listen": True,
+            "api-network": True,
+            "api-groups": "A:stats:pools:devs:summary:version",
+            "api-allow": "A:0/0,W:*",
+            "bitmain-fan-ctrl": False,
+            "bitmain-fan-pwm": "100",
+            "bitmain-use-vil": True,
+            "bitmain-freq": "490",
+            "bitmain-voltage": "1400",
+            "bitmain-ccdelay": "0",
+            "bitmain-pwth": "0",
+            "bitmain-work-mode": "0" if miner.is_mining else "1",
+            "bitmain-freq-level": "100",
+        }
+    if command == "set_miner_conf":
+        conf = await request.json()
+        # Read back as bitmain-work-mode, written as miner-mode
+        miner.is_mining = str(conf.get("miner-mode", 0)) != "1"
+        return {"stats": "success", "code": "M000", "msg": "OK!"}
+    if command == "summary":
+        return {
+            "STATUS": {"STATUS": "S", "when": int(time.time()), "Msg": "summary"},
+            "INFO": {
+                "miner_version": "uart_trans.1.3",
+                "CompileTime": ANTMINER_COMPILE_TIME,
+                "type": miner.model.name,
+            },
+            "SUMMARY": _bmminer_summary(miner, {"new_api": True})["SUMMARY"],
+        }
+    if command == "stats":
+        return {
+            "STATUS": {"STATUS": "S", "when": int(time.time()), "Msg": "stats"},
+            "INFO": {
+                "miner_version": "uart_trans.1.3",
+                "CompileTime": ANTMINER_COMPILE_TIME,
+                "type": miner.model.name,
+            },
+            "STATS": _bmminer_stats(miner, {"new_api": True})["STATS"],
+        }
+    if command == "get_blink_status":
+        return {"blink": False}
+    if command == "blink":
+        return {"code": "B000"}
+    if command == "reboot":
+        miner.started_at = time.time()
+        return {"code": "R000"}
+    return web.Response(status=404, text="Not Found")
+
+
+def _vnish_settings(miner: SimulatedMiner) -> dict:
+    return {
+        "miner": {
+            "cooling": {
+                "mode": {"name": "auto", "param": 65},
+                "fan_min_count": miner.model.fans,
+                "fan_min_duty": 10,
+                "fan_max_duty": 100,
+            },
+            "overclock": {
+                "preset": str(miner.power_limit),
+                "globals": {"volt": 1380, "freq": 490},
+                "chains": [
+                    {"freq": 490, "disabled": False} for _ in range(miner.model.boards)
+                ],
+            },
+            "pools": [
+                {
+                    "url": "pool.example.com:3333",
+                    "user": f"sim.{miner.hostname}",
+                    "pass": "x",
+                }
+            ],
+        },
+        "misc": {"restart_temp": 85},
+    }
+
+
+def _vnish_preset(watts: int, miner: SimulatedMiner) -> dict:
+    terahash = round(miner.model.ideal_ghs / 1000 * watts / miner.model.watts, 1)
+    return {
+        "name": str(watts),
+        "pretty": f"{watts} watt ~ {terahash} TH",
+        "status": "tuned",
+        "modded_psu_required": watts > miner.model.watts,
+    }
+
+
+async def _vnish_routes(miner: SimulatedMiner, request: web.Request):
+    path = request.path
+    if path == "/":
+        return web.Response(
+            text="<!doctype html><html><head><title>AnthillOS</title></head>"
+            '<body><div id="app"></div></body></html>',
+            content_type="text/html",
+        )
+    if not path.startswith("/api/v1/"):
+        return web.Response(status=404, text="Not Found")
+    command = path[len("/api/v1/") :]
+
+    if command == "unlock":
+        return {"token": miner.token}
+    auth = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if auth != miner.token:
+        return web.json_response({"err": "unauthorized"}, status=401)
+
+    if command in ("summary", "info"):
+        rates = miner.board_hashrates()
+        temps = miner.board_temperatures()
+        return {
+            "system": {
+                "os": "GNU/Linux",
+                "miner_name": miner.model.name,
+                "file_system_version": VNISH_VERSION,
+                "uptime": str(miner.uptime),
+                "network_status": {
+                    "mac": miner.mac,
+                    "dhcp": True,
+                    "ip": miner.host,
+                    "netmask": "255.255.255.0",
+                    "gateway": "",
+                    "dns": [],
+                    "hostname": miner.hostname,
+                },
+            },
+            "miner": {
+                "miner_status": {
+                    "miner_state": "mining" if miner.is_mining else "stopped",
+                    "miner_state_time": miner.uptime,
+                },
+                "miner_type": f"{miner.model.name} (Vnish {VNISH_VERSION})",
+                "hr_realtime": round(sum(rates) / 1000, 2),
+                "hr_average": round(sum(rates) / 1000, 2),
+                "hr_nominal": miner.model.ideal_ghs / 1000,
+                "power_usage": miner.wattage(),
+                "power_efficiency": round(
+                    miner.wattage() / max(sum(rates) / 1000, 1), 2
+                ),
+                "overclock": {"preset": str(miner.power_limit)},
+                "chains": [
+                    {
+                        "id": slot + 1,
+                        "frequency": 490,
+                        "voltage": 13.8,
+                        "power_consumption": miner.wattage() // miner.model.boards,
+                        "hashrate_ideal": miner.model.ideal_ghs / miner.model.boards,
+                        "hashrate_rt": rate,
+                        "hashrate_percentage": 100,
+                        "hr_error": 0,
+                        "hw_errors": 4,
+                        "pcb_temp": {"min": board - 6, "max": board},
+                        "chip_temp": {"min": chip - 3, "max": chip},
+                        "chip_statuses": {"red": 0, "orange": 0, "grey": 0},
+                        "status": {"state": "mining" if miner.is_mining else "stopped"},
+                    }
+                    for slot, (rate, (board, chip)) in enumerate(zip(rates, temps))
+                ],
+                "cooling": {
+                    "fan_num": miner.model.fans,
+                    "fans": [
+                        {"id": fan, "rpm": speed, "status": "ok", "max_rpm": 6000}
+                        for fan, speed in enumerate(miner.fan_speeds())
+                    ],
+                    "settings": {"mode": {"name": "auto"}},
+                },
+            },
+        }
+    if command == "settings":
+        if request.method == "POST":
+            body = await request.json()
+            preset = body.get("miner", {}).get("overclock", {}).get("preset")
+            if preset is not None and str(preset).isdigit():
+                miner.power_limit = int(preset)
+            return {"restart_required": False, "reboot_required": False}
+        return _vnish_settings(miner)
+    if command == "autotune/presets":
+        presets = [_vnish_preset(watts, miner) for watts in VNISH_PRESETS]
+        if miner.faults.vnish_config_bug:
+            # Bare list instead of an object, pyasic fails reading the config
+            return presets
+        return {"presets": presets}
+    if command == "perf-summary":
+        return {"current_preset": _vnish_preset(miner.power_limit, miner)}
+    if command in ("mining/stop", "mining/pause"):
+        miner.is_mining = False
+        return {"success": True}
+    if command in ("mining/start", "mining/resume", "mining/restart"):
+        miner.is_mining = True
+        return {"success": True}
+    if command == "system/reboot":
+        miner.started_at = time.time()
+        return {"success": True}
+    if command == "find-miner":
+        return {"on": False}
+    return web.Response(status=404, text="Not Found")
+
+
+async def _braiins_routes(miner: SimulatedMiner, request: web.Request):
+    path = request.path
+    if path == "/":
+        return web.Response(
+            text="<!DOCTYPE html><html><head><title>Braiins OS</title></head>"
+            "<body></body></html>",
+            content_type="text/html",
+        )
+    return web.Response(status=404, text="Not Found")
+
+
+async def _bitaxe_routes(miner: SimulatedMiner, request: web.Request):
+    path = request.path
+    if path == "/":
+        return web.Response(
+            text="<!doctype html><html><head><title>AxeOS</title></head>"
+            "<body><app-root></app-root></body></html>",
+            content_type="text/html",
+        )
+    if path == "/api/system/info":
+        [(board_temp, chip_temp)] = miner.board_temperatures()
+        return {
+            "power": round(miner.wattage() * 1.0, 2),
+            "voltage": 5140.0,
+            "current": 3500.0,
+            "temp": chip_temp,
+            "vrTemp": board_temp,
+            "hashRate": sum(miner.board_hashrates()),
+            "bestDiff": "1.2G",
+            "freeHeap": 180000,
+            "coreVoltage": 1150,
+            "coreVoltageActual": 1143,
+            "frequency": 525,
+            "ssid": "simulator",
+            "macAddr": miner.mac,
+            "hostname": miner.hostname,
+            "wifiStatus": "Connected!",
+            "sharesAccepted": miner.uptime // 20,
+            "sharesRejected": 0,
+            "uptimeSeconds": miner.uptime,
+            "asicCount": 1,
+            "smallCoreCount": 2040 if miner.model.name == "BM1370" else 894,
+            "ASICModel": miner.model.name,
+            "stratumURL": "pool.example.com",
+            "stratumPort": 3333,
+            "stratumUser": f"sim.{miner.hostname}",
+            "version": AXEOS_VERSION,
+            "boardVersion": "601",
+            "runningPartition": "ota_0",
+            "flipscreen": 1,
+            "invertscreen": 0,
+            "invertfanpolarity": 1,
+            "autofanspeed": 1,
+            "fanspeed": 40,
+            "fanrpm": miner.fan_speeds()[0],
+        }
+    if path == "/api/system/asic":
+        return {"ASICModel": miner.model.name, "asicCount": 1}
+    if path == "/api/system/restart":
+        miner.started_at = time.time()
+        return web.Response(text="System will restart shortly.")
+    if path == "/api/system" and request.method == "PATCH":
+        return web.Response(status=200)
+    return web.Response(status=404, text="Not Found")
+
+
+WEB_ROUTES = {
+    FIRMWARE_ANTMINER: _antminer_routes,
+    FIRMWARE_VNISH: _vnish_routes,
+    FIRMWARE_BRAIINS: _braiins_routes,
+    FIRMWARE_BITAXE: _bitaxe_routes,
+}
+
+
+class MinerSimulator:
+    """Serve a fleet of simulated miners on loopback addresses."""
+
+    def __init__(self) -> None:
+        """Initialize an empty simulator."""
+        self.miners: dict[str, SimulatedMiner] = {}
+        self._rpc_servers: dict[str, asyncio.Server] = {}
+        self._grpc_servers: dict = {}
+        self._runner: web.AppRunner | None = None
+        self._sites: dict[str, web.TCPSite] = {}
+
+    async def async_start(self) -> None:
+        """Start the shared web application."""
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle_web)
+        self._runner = web.AppRunner(app, access_log=None, handle_signals=False)
+        await self._runner.setup()
+
+    async def async_stop(self) -> None:
+        """Stop every miner."""
+        for host in list(self.miners):
+            await self.async_remove_miner(host)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def async_add_miner(
+        self,
+        firmware: str,
+        model: str | None = None,
+        faults: MinerFaults | None = None,
+        host: str | None = None,
+    ) -> SimulatedMiner:
+        """Start a simulated miner and return it."""
+        if host is None:
+            host = str(FIRST_ADDRESS + len(self.miners))
+        miner = SimulatedMiner(
+            host,
+            firmware,
+            MODELS[model or DEFAULT_MODELS[firmware]],
+            # Copied so taking one miner offline leaves the others alone
+            replace(faults) if faults is not None else MinerFaults(),
+        )
+        self.miners[host] = miner
+        if not miner.faults.offline:
+            await self._async_listen(miner)
+        return miner
+
+    async def async_add_fleet(
+        self,
+        count: int,
+        mix: dict[str, int] | None = None,
+        faults: MinerFaults | None = None,
+    ) -> list[SimulatedMiner]:
+        """Start count miners, spread over firmwares by the weights in mix."""
+        mix = mix or {FIRMWARE_ANTMINER: 1}
+        firmwares = [
+            firmware for firmware, weight in mix.items() for _ in range(weight)
+        ]
+        return [
+            await self.async_add_miner(firmwares[index % len(firmwares)], faults=faults)
+            for index in range(count)
+        ]
+
+    async def async_remove_miner(self, host: str) -> None:
+        """Stop and forget a miner."""
+        await self.async_set_offline(host, True)
+        del self.miners[host]
+
+    async def async_set_offline(self, host: str, offline: bool) -> None:
+        """Take a miner off the network or bring it back."""
+        miner = self.miners[host]
+        miner.faults.offline = offline
+        if offline:
+            if (server := self._rpc_servers.pop(host, None)) is not None:
+                server.close()
+            if (server := self._grpc_servers.pop(host, None)) is not None:
+                server.close()
+                await server.wait_closed()
+            if (site := self._sites.pop(host, None)) is not None:
+                await site.stop()
+        elif host not in self._sites:
+            miner.started_at = time.time()
+            await self._async_listen(miner)
+
+    async def _async_listen(self, miner: SimulatedMiner) -> None:
+        """Open the ports of a miner."""
+        if miner.firmware in RPC_COMMANDS:
+            self._rpc_servers[miner.host] = await asyncio.start_server(
+                _rpc_handler(miner), miner.host, RPC_PORT, reuse_address=True
+            )
+        if miner.firmware == FIRMWARE_BRAIINS:
+            from grpclib.server import Server
+
+            server = Server(_grpc_services(miner))
+            await server.start(miner.host, GRPC_PORT, reuse_address=True)
+            self._grpc_servers[miner.host] = server
+        site = web.TCPSite(self._runner, miner.host, WEB_PORT, reuse_address=True)
+        await site.start()
+        self._sites[miner.host] = site
+
+    async def _handle_web(self, request: web.Request) -> web.StreamResponse:
+        """Dispatch a web request to the miner owning the local address."""
+        host = request.transport.get_extra_info("sockname")[0]
+        miner = self.miners[host]
+        fault = miner.fault_for(request.path)
+        if fault == "hang":
+            await asyncio.sleep(miner.faults.hang)
+            raise web.HTTPGatewayTimeout
+        await miner.delay()
+        if fault == "error":
+            return web.Response(status=500, text="Internal Server Error")
+
+        reply = await WEB_ROUTES[miner.firmware](miner, request)
+        if isinstance(reply, web.StreamResponse):
+            return reply
+        return web.json_response(reply)
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    """Parse firmware=weight pairs."""
+    mix = {}
+    for item in value.split(","):
+        firmware, _, weight = item.partition("=")
+        if firmware not in FIRMWARES:
+            raise argparse.ArgumentTypeError(f"Unknown firmware {firmware}")
+        mix[firmware] = int(weight or 1)
+    return mix
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    faults = MinerFaults(
+        latency=args.latency,
+        jitter=args.jitter,
+        timeout_rate=args.timeout_rate,
+        error_rate=args.error_rate,
+        vnish_config_bug=args.vnish_config_bug,
+    )
+    simulator = MinerSimulator()
+    await simulator.async_start()
+    try:
+        miners = await simulator.async_add_fleet(args.count, args.mix, faults)
+        print(  # noqa: T201
+            json.dumps(
+                [
+                    {
+                        "host": miner.host,
+                        "firmware": miner.firmware,
+                        "model": miner.model.name,
+                    }
+                    for miner in miners
+                ],
+                indent=2,
+            ),
+            flush=True,
+        )
+        with contextlib.suppress(asyncio.CancelledError):
+            await asyncio.Event().wait()
+    finally:
+        await simulator.async_stop()
+
+
+def main() -> None:
+    """Run the simulator from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--mix", type=_parse_mix, default={FIRMWARE_ANTMINER: 1})
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--vnish-config-bug", action="store_true")
+    args = parser.parse_args()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_async_main(args))
+
+
+if __name__ == "__main__":
+    main()
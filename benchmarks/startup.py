@@ -0,0 +1,136 @@
+"""Benchmark Home Assistant startup with many miner config entries.
+
+Run from the repository root::
+
+    python -m benchmarks.startup --entries 50
+
+pyasic.get_miner is replaced by a fake with a fixed fingerprint latency, so
+the result depends on how often setup fingerprints and polls each miner
+rather than on the network. Prints a JSON report.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from unittest import mock
+
+import pyasic
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.setup import async_setup_component
+from pyasic.data import HashBoard
+from pyasic.data import MinerData
+from pyasic.device.algorithm.hashrate.sha256 import SHA256HashRate
+
+from .common import async_start_hass
+from .common import config_entry_dict
+
+
+class FakeMiner:
+    """Minimal stand-in for a fingerprinted pyasic miner."""
+
+    make = "AntMiner"
+    model = "S19"
+    expected_hashboards = 3
+    supports_autotuning = False
+    supports_shutdown = False
+    supports_power_modes = False
+    api = rpc = web = ssh = None
+
+    def __init__(self, ip: str, data_latency: float, counters: dict) -> None:
+        """Initialize the fake miner."""
+        self.ip = ip
+        self._data_latency = data_latency
+        self._counters = counters
+
+    async def get_data(self, include=None) -> MinerData:
+        """Return a fixed data set after the configured latency."""
+        self._counters["get_data"] += 1
+        await asyncio.sleep(self._data_latency)
+        return MinerData(
+            ip=self.ip,
+            hostname=f"miner-{self.ip}",
+            mac=f"00:00:00:00:00:{self.ip.rsplit('.', 1)[-1]:0>2}",
+            fw_ver="1.0.0",
+            expected_hashrate=SHA256HashRate(rate=100.0),
+            wattage=3250,
+            raw_wattage_limit=3300,
+            hashboards=[
+                HashBoard(
+                    slot=slot,
+                    temp=55,
+                    chip_temp=70,
+                    hashrate=SHA256HashRate(rate=33.3),
+                )
+                for slot in range(self.expected_hashboards)
+            ],
+        )
+
+
+async def async_start(
+    config_dir: str, entries: list[dict], counters: dict
+) -> dict:
+    """Start Home Assistant, set up the miner component and measure it."""
+    hass = await async_start_hass(config_dir, entries)
+    counters.update(get_miner=0, get_data=0)
+
+    start = time.perf_counter()
+    await async_setup_component(hass, "miner", {})
+    await hass.async_block_till_done()
+    setup_seconds = time.perf_counter() - start
+
+    loaded = sum(
+        entry.state is ConfigEntryState.LOADED
+        for entry in hass.config_entries.async_entries("miner")
+    )
+    report = {
+        "entries_loaded": loaded,
+        "setup_seconds": round(setup_seconds, 3),
+        "fingerprints": counters["get_miner"],
+        "fingerprints_per_entry": round(counters["get_miner"] / len(entries), 2),
+        "get_data_calls": counters["get_data"],
+    }
+    # Stopping flushes the persisted snapshots used by the next start
+    await hass.async_stop(force=True)
+    return report
+
+
+async def async_run(entries: int, fingerprint_latency: float, data_latency: float) -> dict:
+    """Measure a first start and a restart with N miner entries."""
+    counters = {}
+
+    async def get_miner(ip):
+        counters["get_miner"] += 1
+        await asyncio.sleep(fingerprint_latency)
+        return FakeMiner(str(ip), data_latency, counters)
+
+    stored_entries = [
+        config_entry_dict(f"10.0.{i // 250}.{i % 250 + 1}") for i in range(entries)
+    ]
+    with (
+        tempfile.TemporaryDirectory() as config_dir,
+        mock.patch.object(pyasic, "get_miner", get_miner),
+    ):
+        first_start = await async_start(config_dir, stored_entries, counters)
+        restart = await async_start(config_dir, stored_entries, counters)
+
+    return {"entries": entries, "first_start": first_start, "restart": restart}
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--fingerprint-latency", type=float, default=0.5)
+    parser.add_argument("--data-latency", type=float, default=0.2)
+    args = parser.parse_args()
+    report = asyncio.run(
+        async_run(args.entries, args.fingerprint_latency, args.data_latency)
+    )
+    print(json.dumps(report, indent=2))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,13 @@
 """The Miner integration."""
 from __future__ import annotations
 
-import sys
-
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 
-from .const import CONF_IP
 from .const import DOMAIN
-from .const import PYASIC_VERSION
+from .patch import async_ensure_pyasic
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
@@ -20,59 +17,49 @@ PLATFORMS: list[Platform] = [
 ]
 
 
-def _ensure_pyasic():
-    """Ensure pyasic is installed and imported (runs in executor)."""
-    import importlib
-    
-    def try_import():
-        try:
-            from importlib.metadata import version
-            import pyasic
-            # Verify the module actually loaded correctly
-            if not hasattr(pyasic, 'get_miner'):
-                raise ImportError("pyasic module incomplete")
-            if version("pyasic") != PYASIC_VERSION:
-                raise ImportError("Version mismatch")
-            return pyasic
-        except Exception:
-            return None
-    
-    pyasic = try_import()
-    if pyasic:
-        return pyasic
-    
-    # Need to install/reinstall
-    from .patch import install_package
-    install_package(f"pyasic=={PYASIC_VERSION}", force_reinstall=True)
-    
-    # Clear any cached broken imports
-    for mod_name in list(sys.modules.keys()):
-        if mod_name.startswith('pyasic'):
-            del sys.modules[mod_name]
-    
-    import pyasic
-    return pyasic
-
-
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Set up Miner from a config entry."""
     # Import pyasic in executor to avoid blocking the event loop
-    pyasic = await hass.async_add_executor_job(_ensure_pyasic)
+    await async_ensure_pyasic(hass)
 
     # Import coordinator and services AFTER pyasic is installed
     from .coordinator import MinerCoordinator
+    from .scheduler import async_get_scheduler
     from .services import async_setup_services
-
-    miner_ip = config_entry.data[CONF_IP]
-    miner = await pyasic.get_miner(miner_ip)
-
-    if miner is None:
-        raise ConfigEntryNotReady("Miner could not be found.")
+    from .statistics import async_get_statistics
+    from .workers import async_get_worker_pool
+    from .workers import use_poll_workers
 
     m_coordinator = MinerCoordinator(hass, config_entry)
-    hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = m_coordinator
-
-    await m_coordinator.async_config_entry_first_refresh()
+    if use_poll_workers(hass):
+        # Too many miners for one event loop, poll them in worker processes
+        m_coordinator.worker_pool = async_get_worker_pool(hass)
+
+    if await m_coordinator.async_restore_snapshot():
+        # Start from the last known data and poll in the background, so a
+        # slow or offline miner does not hold up Home Assistant startup. The
+        # first poll keeps the stable phase of the entry, see the scheduler
+        hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = m_coordinator
+    else:
+        # Fingerprint once, the first refresh reuses the cached miner
+        if await m_coordinator.get_miner() is None:
+            raise ConfigEntryNotReady("Miner could not be found.")
+
+        hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = m_coordinator
+
+        await m_coordinator.async_config_entry_first_refresh()
+
+    config_entry.async_on_unload(
+        async_get_scheduler(hass).async_add_coordinator(m_coordinator)
+    )
+    if m_coordinator.statistics is not None:
+        # Hourly mean, min and max of the main sensors for long-term charts
+        config_entry.async_on_unload(
+            async_get_statistics(hass).async_add_coordinator(m_coordinator)
+        )
+    config_entry.async_on_unload(
+        config_entry.add_update_listener(async_update_options)
+    )
 
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
@@ -81,6 +68,20 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     return True
 
 
+async def async_update_options(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the entry."""
+    hass.data[DOMAIN][config_entry.entry_id].async_apply_options()
+
+
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the persisted snapshot and board history of a deleted entry."""
+    from .history import async_remove_history
+    from .snapshot import MinerSnapshotStore
+
+    await MinerSnapshotStore(hass, config_entry.entry_id).async_remove()
+    await async_remove_history(hass, config_entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(
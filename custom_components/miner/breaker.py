@@ -0,0 +1,85 @@
+"""Circuit breaker for polling offline miners."""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+BREAKER_STATES = [STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN]
+
+# Consecutive failed polls before the breaker opens
+FAILURE_THRESHOLD = 3
+# Backoff in seconds, doubled per failure after the threshold
+BACKOFF_BASE = 20
+BACKOFF_MAX = 600
+# Random spread applied to each backoff so a dead rack does not retry in sync
+BACKOFF_JITTER = 0.2
+
+# Web API and CGMiner RPC ports, probed before a full fingerprint
+PROBE_PORTS = (80, 4028)
+PROBE_TIMEOUT = 2
+
+
+class MinerCircuitBreaker:
+    """Track whether a miner should be polled at all.
+
+    Closed polls normally. After FAILURE_THRESHOLD consecutive failures it
+    opens and rejects polls until an exponentially growing, jittered backoff
+    expires. The first poll after that runs half-open: success closes the
+    breaker, failure opens it again for longer.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the breaker in the closed state."""
+        self.state = STATE_CLOSED
+        self.next_retry: datetime | None = None
+        self._retry_at: float | None = None
+
+    def allow_request(self) -> bool:
+        """Return if a poll may run now, moving to half-open when due."""
+        if self.state != STATE_OPEN:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        self.state = STATE_HALF_OPEN
+        return True
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful poll."""
+        self.state = STATE_CLOSED
+        self.next_retry = None
+        self._retry_at = None
+
+    def record_failure(self, failure_count: int) -> None:
+        """Open the breaker once failures reach the threshold."""
+        if self.state != STATE_HALF_OPEN and failure_count < FAILURE_THRESHOLD:
+            return
+
+        exponent = max(failure_count - FAILURE_THRESHOLD, 0)
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2**exponent)
+        delay *= random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+
+        self.state = STATE_OPEN
+        self._retry_at = time.monotonic() + delay
+        self.next_retry = dt_util.utcnow() + timedelta(seconds=delay)
+
+
+async def async_probe(host: str) -> bool:
+    """Return if any miner port accepts a TCP connection."""
+    for port in PROBE_PORTS:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), PROBE_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError):
+            continue
+        writer.close()
+        return True
+    return False
@@ -0,0 +1,131 @@
+"""Per-firmware cache of pyasic DataOptions a miner cannot serve."""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+DATA_CAPABILITIES = f"{DOMAIN}_capabilities"
+
+STORAGE_KEY = f"{DOMAIN}.capabilities"
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+# Unsupported options are tried again after this long, firmware may be fixed
+REPROBE_INTERVAL = timedelta(hours=6)
+# Consecutive failures of an option before it is left out, so a single
+# timeout of one miner does not drop it for every miner of the firmware
+UNSUPPORTED_AFTER_FAILURES = 3
+
+
+async def async_get_capability_cache(hass: HomeAssistant) -> MinerCapabilityCache:
+    """Return the loaded capability cache shared by all config entries."""
+    if (cache := hass.data.get(DATA_CAPABILITIES)) is None:
+        cache = hass.data[DATA_CAPABILITIES] = MinerCapabilityCache(hass)
+    if not cache.loaded:
+        await cache.async_load()
+    return cache
+
+
+def capability_key(make, model, fw_ver) -> str:
+    """Return the cache key for a make, model and firmware version.
+
+    Until the firmware version is known the key is the make and model,
+    see MinerCapabilityCache.async_migrate.
+    """
+    if fw_ver is None:
+        return f"{make}|{model}"
+    return f"{make}|{model}|{fw_ver}"
+
+
+class MinerCapabilityCache:
+    """Remember which DataOptions fail for a make, model and firmware.
+
+    Options failing UNSUPPORTED_AFTER_FAILURES times in a row are left out
+    of later polls and probed again once REPROBE_INTERVAL has passed. The
+    unsupported options are persisted in hass storage, the failure counts
+    are not.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._load_lock = asyncio.Lock()
+        self._unsupported: dict[str, dict[str, float]] = {}
+        # Key to the consecutive failures of each option
+        self._failures: dict[str, dict[str, int]] = {}
+        self.loaded = False
+
+    async def async_load(self) -> None:
+        """Load the cache from storage once."""
+        async with self._load_lock:
+            if self.loaded:
+                return
+            if (stored := await self._store.async_load()) is not None:
+                self._unsupported = stored.get("unsupported", {})
+            self.loaded = True
+
+    def unsupported(self, key: str) -> set[str]:
+        """Return the options to leave out for a key."""
+        failed = self._unsupported.get(key)
+        if not failed:
+            return set()
+        reprobe_after = time.time() - REPROBE_INTERVAL.total_seconds()
+        return {option for option, failed_at in failed.items() if failed_at > reprobe_after}
+
+    @callback
+    def async_record_failure(self, key: str, option: str) -> None:
+        """Count a failure of an option, marking it unsupported once repeated."""
+        failures = self._failures.setdefault(key, {})
+        failures[option] = failures.get(option, 0) + 1
+        if failures[option] < UNSUPPORTED_AFTER_FAILURES:
+            return
+        self._unsupported.setdefault(key, {})[option] = time.time()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_mark_supported(self, key: str, options) -> None:
+        """Forget failures of options that were fetched successfully."""
+        if (failures := self._failures.get(key)) is not None:
+            for option in options:
+                failures.pop(str(option), None)
+        failed = self._unsupported.get(key)
+        if not failed:
+            return
+        changed = False
+        for option in options:
+            if failed.pop(str(option), None) is not None:
+                changed = True
+        if not failed:
+            del self._unsupported[key]
+        if changed:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_migrate(self, old_key: str, new_key: str) -> None:
+        """Move the failures recorded under one key to another.
+
+        Probes made before the firmware version was known are kept under
+        its key once it is.
+        """
+        if (failures := self._failures.pop(old_key, None)) is not None:
+            merged_failures = self._failures.setdefault(new_key, {})
+            for option, count in failures.items():
+                merged_failures[option] = max(count, merged_failures.get(option, 0))
+        if (failed := self._unsupported.pop(old_key, None)) is None:
+            return
+        merged = self._unsupported.setdefault(new_key, {})
+        for option, failed_at in failed.items():
+            merged[option] = max(failed_at, merged.get(option, failed_at))
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Return the data to persist."""
+        return {"unsupported": self._unsupported}
@@ -1,60 +1,73 @@
 """Config flow for Miner."""
 import logging
-from importlib.metadata import version
 
-from .const import PYASIC_VERSION
-
-# Lazy import - will be populated when needed
-pyasic = None
-MinerNetwork = None
-MinerMake = None
-
-
-def _ensure_pyasic():
-    """Ensure pyasic is installed and imported."""
-    global pyasic, MinerNetwork, MinerMake
-    if pyasic is not None:
-        return
-    
-    try:
-        import pyasic as _pyasic
-        if version("pyasic") != PYASIC_VERSION:
-            raise ImportError("Version mismatch")
-    except (ImportError, Exception):
-        from .patch import install_package
-        install_package(f"pyasic=={PYASIC_VERSION}")
-        import pyasic as _pyasic
-    
-    pyasic = _pyasic
-    from pyasic import MinerNetwork as _MinerNetwork
-    MinerNetwork = _MinerNetwork
-    from pyasic.device.makes import MinerMake as _MinerMake
-    MinerMake = _MinerMake
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.components import network
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.selector import TextSelector
 from homeassistant.helpers.selector import TextSelectorConfig
 from homeassistant.helpers.selector import TextSelectorType
 
+from .const import CONF_BOARD_HISTORY
+from .const import CONF_DEADBAND
+from .const import CONF_DEADBAND_RELATIVE
+from .const import CONF_HASHBOARD_INTERVAL
+from .const import CONF_HISTORY_RETENTION
+from .const import CONF_IDENTITY_TTL
 from .const import CONF_IP
+from .const import CONF_LOOP_WATCHDOG
 from .const import CONF_MIN_POWER
 from .const import CONF_MAX_POWER
+from .const import CONF_MIN_PUBLISH_INTERVAL
+from .const import CONF_PUBLISH_RULES
+from .const import CONF_PUBLISH_SENSOR
 from .const import CONF_RPC_PASSWORD
 from .const import CONF_SSH_PASSWORD
 from .const import CONF_SSH_USERNAME
 from .const import CONF_TITLE
 from .const import CONF_WEB_PASSWORD
 from .const import CONF_WEB_USERNAME
+from .const import DEFAULT_HASHBOARD_INTERVAL
+from .const import DEFAULT_HISTORY_RETENTION
+from .const import DEFAULT_IDENTITY_TTL
 from .const import DOMAIN
+from .patch import async_ensure_pyasic
+from .publish import NO_PUBLISH_RULE
+from .publish import PUBLISH_SENSORS
+from .publish import publish_rules
+from .watchdog import OPERATION_CONFIG_FLOW
+from .watchdog import track_operation
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# Lazy import - will be populated when needed
+pyasic = None
+MinerNetwork = None
+MinerMake = None
+
+
+async def _async_ensure_pyasic(hass):
+    """Ensure pyasic is installed and bind the names used by the flow."""
+    global pyasic, MinerNetwork, MinerMake
+    if pyasic is not None:
+        return
+
+    _pyasic = await async_ensure_pyasic(hass)
+    # Already loaded by async_ensure_pyasic, these are cheap lookups
+    from pyasic import MinerNetwork as _MinerNetwork
+    from pyasic.device.makes import MinerMake as _MinerMake
+
+    pyasic = _pyasic
+    MinerNetwork = _MinerNetwork
+    MinerMake = _MinerMake
+
+
 async def _async_has_devices(hass: HomeAssistant) -> bool:
     """Return if there are devices that can be discovered."""
-    await hass.async_add_executor_job(_ensure_pyasic)
+    await _async_ensure_pyasic(hass)
     adapters = await network.async_get_adapters(hass)
 
     for adapter in adapters:
@@ -62,7 +75,8 @@ async def _async_has_devices(hass: HomeAssistant) -> bool:
             local_ip = ip_info["address"]
             network_prefix = ip_info["network_prefix"]
             miner_net = MinerNetwork.from_subnet(f"{local_ip}/{network_prefix}")
-            miners = await miner_net.scan()
+            with track_operation(hass, OPERATION_CONFIG_FLOW, label="scan"):
+                miners = await miner_net.scan()
             if len(miners) > 0:
                 return True
     return False
@@ -73,10 +87,11 @@ async def validate_ip_input(
     data: dict[str, str]
 ):
     """Validate the user input allows us to connect."""
-    await hass.async_add_executor_job(_ensure_pyasic)
+    await _async_ensure_pyasic(hass)
     miner_ip = data.get(CONF_IP)
 
-    miner = await pyasic.get_miner(miner_ip)
+    with track_operation(hass, OPERATION_CONFIG_FLOW, label=miner_ip):
+        miner = await pyasic.get_miner(miner_ip)
     if miner is None:
         return {"base": "Unable to connect to Miner, is IP correct?"}, None
 
@@ -93,6 +108,12 @@ class MinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._data = {}
         self._miner = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return MinerOptionsFlowHandler()
+
     async def async_step_user(self, user_input=None):
         """Get miner IP and check if it is available."""
         if user_input is None:
@@ -248,3 +269,82 @@ class MinerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             return self.async_abort(reason="no_devices_found")
 
         return await self.async_step_user()
+
+
+class MinerOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Miner options."""
+
+    def __init__(self) -> None:
+        """Initialize the options flow."""
+        self._options: dict = {}
+        self._publish_sensor: str | None = None
+
+    async def async_step_init(self, user_input=None):
+        """Configure the polling tiers, and pick a sensor kind to publish."""
+        if user_input is not None:
+            self._publish_sensor = user_input.pop(CONF_PUBLISH_SENSOR, None)
+            self._options = {**self.config_entry.options, **user_input}
+            if self._publish_sensor:
+                return await self.async_step_publish()
+            return self.async_create_entry(data=self._options)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_HASHBOARD_INTERVAL,
+                    default=options.get(
+                        CONF_HASHBOARD_INTERVAL, DEFAULT_HASHBOARD_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Optional(
+                    CONF_IDENTITY_TTL,
+                    default=options.get(CONF_IDENTITY_TTL, DEFAULT_IDENTITY_TTL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=30, max=86400)),
+                vol.Optional(
+                    CONF_BOARD_HISTORY,
+                    default=options.get(CONF_BOARD_HISTORY, False),
+                ): bool,
+                vol.Optional(
+                    CONF_HISTORY_RETENTION,
+                    default=options.get(
+                        CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=365)),
+                vol.Optional(
+                    CONF_LOOP_WATCHDOG,
+                    default=options.get(CONF_LOOP_WATCHDOG, False),
+                ): bool,
+                vol.Optional(CONF_PUBLISH_SENSOR): vol.In(PUBLISH_SENSORS),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
+
+    async def async_step_publish(self, user_input=None):
+        """Configure when changes of the picked sensor kind are written."""
+        if user_input is not None:
+            rules = {
+                **self._options.get(CONF_PUBLISH_RULES, {}),
+                self._publish_sensor: user_input,
+            }
+            return self.async_create_entry(
+                data={**self._options, CONF_PUBLISH_RULES: rules}
+            )
+
+        rule = publish_rules(self._options).get(self._publish_sensor, NO_PUBLISH_RULE)
+        schema = vol.Schema(
+            {
+                vol.Optional(CONF_DEADBAND, default=rule.deadband): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_DEADBAND_RELATIVE, default=rule.relative): bool,
+                vol.Optional(
+                    CONF_MIN_PUBLISH_INTERVAL, default=rule.min_interval
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=86400)),
+            }
+        )
+        return self.async_show_form(
+            step_id="publish",
+            data_schema=schema,
+            description_placeholders={"sensor": self._publish_sensor},
+        )
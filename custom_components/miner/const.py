@@ -11,10 +11,27 @@ CONF_WEB_PASSWORD = "web_password"
 CONF_WEB_USERNAME = "web_username"
 CONF_MIN_POWER = "min_power"
 CONF_MAX_POWER = "max_power"
+CONF_HASHBOARD_INTERVAL = "hashboard_interval"
+CONF_IDENTITY_TTL = "identity_ttl"
+CONF_PUBLISH_RULES = "publish_rules"
+CONF_PUBLISH_SENSOR = "publish_sensor"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_RELATIVE = "deadband_relative"
+CONF_MIN_PUBLISH_INTERVAL = "min_publish_interval"
+CONF_BOARD_HISTORY = "board_history"
+CONF_HISTORY_RETENTION = "history_retention"
+CONF_LOOP_WATCHDOG = "loop_watchdog"
+
+DEFAULT_HASHBOARD_INTERVAL = 30
+DEFAULT_IDENTITY_TTL = 300
+# Days of board history kept when it is enabled
+DEFAULT_HISTORY_RETENTION = 28
 
 SERVICE_REBOOT = "reboot"
 SERVICE_RESTART_BACKEND = "restart_backend"
 SERVICE_SET_WORK_MODE = "set_work_mode"
+SERVICE_PROFILE = "profile"
+SERVICE_BOARD_HISTORY = "board_history"
 
 TERA_HASH_PER_SECOND = "TH/s"
 JOULES_PER_TERA_HASH = "J/TH"
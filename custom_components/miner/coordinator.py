@@ -1,18 +1,37 @@
 """Miner DataUpdateCoordinator."""
+import asyncio
 import logging
+import time
+from datetime import datetime
+from collections.abc import Mapping
 from datetime import timedelta
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     import pyasic
 
+    from .profiling import PollProfiler
+    from .workers import MinerWorkerPool
+
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers.update_coordinator import UpdateFailed
-
+from homeassistant.util import dt as dt_util
+
+from .breaker import MinerCircuitBreaker
+from .breaker import async_probe
+from .capabilities import async_get_capability_cache
+from .capabilities import capability_key
+from .const import CONF_BOARD_HISTORY
+from .const import CONF_HASHBOARD_INTERVAL
+from .const import CONF_HISTORY_RETENTION
+from .const import CONF_IDENTITY_TTL
 from .const import CONF_IP
+from .const import CONF_LOOP_WATCHDOG
 from .const import CONF_MIN_POWER
 from .const import CONF_MAX_POWER
 from .const import CONF_RPC_PASSWORD
@@ -20,13 +39,61 @@ from .const import CONF_SSH_PASSWORD
 from .const import CONF_SSH_USERNAME
 from .const import CONF_WEB_PASSWORD
 from .const import CONF_WEB_USERNAME
+from .const import DEFAULT_HASHBOARD_INTERVAL
+from .const import DEFAULT_HISTORY_RETENTION
+from .const import DEFAULT_IDENTITY_TTL
+from .history import BoardHistoryStore
+from .models import BOARD_SENSORS
+from .models import MINER_SENSORS
+from .models import MinerSnapshot
+from .models import board_values
+from .models import snapshot_changes
+from .publish import PublishRule
+from .publish import publish_rules
+from .rolling import MinerRolling
+from .snapshot import MinerSnapshotStore
+from .statistics import MinerStatistics
+from .timing import METRIC_FINGERPRINT
+from .timing import METRIC_GET_DATA
+from .timing import METRIC_POST_PROCESSING
+from .timing import METRIC_RETRIES
+from .timing import MinerPollStats
+from .timing import PollTiming
+from .timing import instrument_miner
+from .trace import MinerTrace
+from .watchdog import OPERATION_FINGERPRINT
+from .watchdog import OPERATION_POLL
+from .watchdog import async_get_watchdog
+from .watchdog import track_operation
 
 _LOGGER = logging.getLogger(__name__)
 
 # Matches iotwatt data log interval
 REQUEST_REFRESH_DEFAULT_COOLDOWN = 5
 
-DEFAULT_DATA = {
+# Default interval between polls, driven by the fleet scheduler
+DEFAULT_POLL_INTERVAL = timedelta(seconds=10)
+
+# How long last known data is published during an outage instead of zeroes
+LAST_KNOWN_DATA_MAX_AGE = timedelta(minutes=5)
+
+# Seconds an unchanged sensor may go without rewriting its last_updated
+FIELD_UPDATED_RESOLUTION = 300
+
+# Consecutive failed polls before the cached miner is fingerprinted again
+REFINGERPRINT_FAILURE_THRESHOLD = 2
+
+# Polling tiers, as pyasic DataOptions values (pyasic is imported lazily).
+# Telemetry fetched on every poll
+FAST_DATA_OPTIONS = ("is_mining", "hashrate", "wattage", "wattage_limit")
+# Fetched at most every CONF_HASHBOARD_INTERVAL seconds
+HASHBOARD_DATA_OPTIONS = ("hashboards",)
+# Cached for CONF_IDENTITY_TTL seconds or until a control action
+IDENTITY_DATA_OPTIONS = ("hostname", "mac", "fw_ver", "expected_hashrate", "config")
+# Options build_data cannot do without, never left out of a poll
+REQUIRED_DATA_OPTIONS = ("hashrate", "wattage", "hashboards")
+
+DEFAULT_DATA = MinerSnapshot.from_dict({
     "hostname": None,
     "mac": None,
     "make": None,
@@ -46,8 +113,7 @@ DEFAULT_DATA = {
     "board_sensors": {},
 #EBE_20260309
 #    "fan_sensors": {},
-    "config": {},
-}
+})
 
 
 class MinerCoordinator(DataUpdateCoordinator):
@@ -59,12 +125,53 @@ class MinerCoordinator(DataUpdateCoordinator):
         """Initialize MinerCoordinator object."""
         self.miner = None
         self._failure_count = 0
+        self.breaker = MinerCircuitBreaker()
+        self._fingerprint_stale = False
+        self._fingerprint_task: asyncio.Task | None = None
+        self._fw_ver = None
+        self.poll_interval = DEFAULT_POLL_INTERVAL
+        self._hashboard_interval = DEFAULT_HASHBOARD_INTERVAL
+        self._identity_ttl = DEFAULT_IDENTITY_TTL
+        # Publish rule of each sensor kind, see publish
+        self.publish_rules: dict[str, PublishRule] = {}
+        self._tier_fetched_at: dict[tuple[str, ...], float] = {}
+        self._field_cache: dict = {}
+        self._snapshot = MinerSnapshotStore(hass, entry.entry_id)
+        self._restored_miner_info: dict = {}
+        # Data comes from the persisted snapshot until the first live poll
+        self.restored = False
+        self._last_good_data: MinerSnapshot | None = None
+        self._last_good_at: float | None = None
+        self._field_updated: dict[str, float] = {}
+        self.trace = MinerTrace()
+        self.poll_stats = MinerPollStats(trace=self.trace)
+        # Long-term statistics buckets, imported by FleetStatistics, only
+        # collected with the recorder loaded
+        self.statistics: MinerStatistics | None = None
+        if "recorder" in hass.config.components:
+            self.statistics = MinerStatistics()
+        # Rolling windows, kept once a rolling sensor is enabled
+        self.rolling: MinerRolling | None = None
+        # Full resolution board history, when enabled in the options
+        self.history: BoardHistoryStore | None = None
+        # Set by the profile service while this miner's polls are profiled
+        self.profiler: PollProfiler | None = None
+        # Removes the entry from the loop watchdog, while it is enabled
+        self._unsub_watchdog: CALLBACK_TYPE | None = None
+        # Set up for large fleets, polls then run in worker processes
+        self.worker_pool: MinerWorkerPool | None = None
+        # Data, success and last_updated window last published to listeners,
+        # to notify changes only
+        self._notified_data: MinerSnapshot | None = None
+        self._notified_success: bool | None = None
+        self._notified_window: int | None = None
         super().__init__(
             hass=hass,
             logger=_LOGGER,
             config_entry=entry,
             name=entry.title,
-            update_interval=timedelta(seconds=10),
+            # Polling is driven by the shared MinerPollScheduler
+            update_interval=None,
             request_refresh_debouncer=Debouncer(
                 hass,
                 _LOGGER,
@@ -72,246 +179,656 @@ class MinerCoordinator(DataUpdateCoordinator):
                 immediate=True,
             ),
         )
+        self.async_apply_options()
+
+    def async_apply_options(self) -> None:
+        """Apply the polling tier, publish, history and watchdog options."""
+        options = self.config_entry.options
+        self._hashboard_interval = options.get(
+            CONF_HASHBOARD_INTERVAL, DEFAULT_HASHBOARD_INTERVAL
+        )
+        self._identity_ttl = options.get(CONF_IDENTITY_TTL, DEFAULT_IDENTITY_TTL)
+        self.publish_rules = publish_rules(options)
+        retention = options.get(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION)
+        if not options.get(CONF_BOARD_HISTORY, False):
+            if self.history is not None:
+                self.hass.async_create_task(self.history.async_close())
+                self.history = None
+        elif self.history is None:
+            self.history = BoardHistoryStore(
+                self.hass, self.config_entry.entry_id, retention
+            )
+            self.history.async_start()
+        else:
+            self.history.retention_days = retention
+        if not options.get(CONF_LOOP_WATCHDOG, False):
+            if self._unsub_watchdog is not None:
+                self._unsub_watchdog()
+                self._unsub_watchdog = None
+        elif self._unsub_watchdog is None:
+            self._unsub_watchdog = async_get_watchdog(self.hass).async_add_entry(
+                self.config_entry.entry_id
+            )
+
+    async def async_shutdown(self) -> None:
+        """Cancel polling, leave the watchdog and write the board history."""
+        await super().async_shutdown()
+        if self._unsub_watchdog is not None:
+            self._unsub_watchdog()
+            self._unsub_watchdog = None
+        if self.history is not None:
+            await self.history.async_close()
+
+    def async_invalidate_cached_fields(self) -> None:
+        """Refresh the slow tiers on the next poll, e.g. after a control action.
+
+        Every entity is notified of that poll too, so one that changed its
+        state ahead of the miner is set back if the action did not apply.
+        """
+        self._tier_fetched_at.clear()
+        self._notified_data = None
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners of the values that changed since the last update.
+
+        Entities listen with the key of the snapshot value they show as their
+        context, see snapshot_changes. Listeners without one, and all of them
+        when the success of the polls flipped or a poll read the values in a
+        new last_updated window, are always notified.
+        """
+        previous, self._notified_data = self._notified_data, self.data
+        window = self._updated_window(self._last_good_at)
+        notify_all = (
+            previous is None
+            or self._notified_success != self.last_update_success
+            or self._notified_window != window
+        )
+        self._notified_success = self.last_update_success
+        self._notified_window = window
+        changes = set() if notify_all else snapshot_changes(previous, self.data)
+        for update_callback, context in list(self._listeners.values()):
+            if notify_all or context is None or context in changes:
+                update_callback()
+
+    def _due_data_options(self, now: float) -> list[str]:
+        """Return the DataOptions values to fetch on this poll."""
+        data_options = list(FAST_DATA_OPTIONS)
+        # Full resolution history needs the boards of every poll
+        hashboard_interval = (
+            0 if self.history is not None else self._hashboard_interval
+        )
+        for tier, max_age in (
+            (HASHBOARD_DATA_OPTIONS, hashboard_interval),
+            (IDENTITY_DATA_OPTIONS, self._identity_ttl),
+        ):
+            fetched_at = self._tier_fetched_at.get(tier)
+            if fetched_at is None or now - fetched_at >= max_age:
+                data_options.extend(tier)
+        return data_options
+
+    def _cache_fields(
+        self, fetched_fields: dict, data_options: list, now: float
+    ) -> None:
+        """Cache freshly fetched slow fields."""
+        fetched = {str(option) for option in data_options}
+        for tier in (HASHBOARD_DATA_OPTIONS, IDENTITY_DATA_OPTIONS):
+            if tier[0] in fetched:
+                self._tier_fetched_at[tier] = now
+        self._field_cache.update(fetched_fields)
 
     @property
     def available(self):
-        """Return if device is available or not."""
-        return self.miner is not None
+        """Return if device is available or not, restored data counts."""
+        return self.miner is not None or self.restored
 
-    async def get_miner(self):
-        """Get a valid Miner instance."""
-        import pyasic  # lazy import to avoid blocking event loop
+    @property
+    def miner_info(self) -> dict:
+        """Return the static miner details the platforms set up entities from.
+
+        Comes from the restored snapshot until the miner has been fingerprinted.
+        """
+        if self.miner is None:
+            return self._restored_miner_info
+        return {
+            "expected_hashboards": self.miner.expected_hashboards,
+            "supports_autotuning": self.miner.supports_autotuning,
+            "supports_shutdown": self.miner.supports_shutdown,
+        }
+
+    async def async_restore_snapshot(self) -> bool:
+        """Seed data from the persisted snapshot, return if there was one."""
+        if (snapshot := await self._snapshot.async_load()) is None:
+            return False
+
+        self._restored_miner_info = snapshot["miner"]
+        self._field_updated = snapshot.get("updated", {})
+        self._last_good_at = snapshot.get("saved_at", 0)
+        self.data = self._last_good_data = MinerSnapshot.from_dict(snapshot["data"])
+        self._fw_ver = self.data.fw_ver
+        if (
+            self.statistics is not None
+            and (statistics := snapshot.get("statistics")) is not None
+        ):
+            self.statistics.restore(statistics)
+        self.restored = True
+        return True
 
+    @property
+    def power_limit_range(self) -> dict:
+        """Return the configured power limit range."""
+        return {
+            "min": self.config_entry.data.get(CONF_MIN_POWER, 1600),
+            "max": self.config_entry.data.get(CONF_MAX_POWER, 6000),
+        }
+
+    @property
+    def miner_config(self):
+        """Return the last pyasic MinerConfig read from the miner, if any.
+
+        Kept once in the field cache rather than in every snapshot.
+        """
+        return self._field_cache.get("config")
+
+    def _fallback_data(self) -> MinerSnapshot:
+        """Return the data published on the first failed poll.
+
+        Recent last known data is kept through short outages, after that
+        the sensors drop to zero.
+        """
+        if (
+            self._last_good_data is not None
+            and time.time() - self._last_good_at
+            < LAST_KNOWN_DATA_MAX_AGE.total_seconds()
+        ):
+            return self._last_good_data
+        return DEFAULT_DATA
+
+    @callback
+    def async_get_rolling(self) -> MinerRolling:
+        """Return the rolling windows, starting them on the first call."""
+        if self.rolling is None:
+            self.rolling = MinerRolling(
+                self.miner_info.get("expected_hashboards") or 3,
+                self.poll_interval.total_seconds(),
+            )
+        return self.rolling
+
+    def field_updated(self, key: str) -> datetime | None:
+        """Return when a miner sensor, or a board sensor as "slot:sensor", was last read."""
+        if (updated := self._field_updated.get(key)) is None:
+            return None
+        return dt_util.utc_from_timestamp(updated)
+
+    def field_updated_window(self, key: str) -> int | None:
+        """Return the FIELD_UPDATED_RESOLUTION window a sensor was last read in."""
+        return self._updated_window(self._field_updated.get(key))
+
+    @staticmethod
+    def _updated_window(updated: float | None) -> int | None:
+        if updated is None:
+            return None
+        return int(updated // FIELD_UPDATED_RESOLUTION)
+
+    def _stamp_fields(
+        self, data: MinerSnapshot, boards_fetched: bool, now: float
+    ) -> None:
+        """Record when the values in freshly polled data were read."""
+        for sensor, value in zip(MINER_SENSORS, data.sensors):
+            if value is not None:
+                self._field_updated[sensor] = now
+        if boards_fetched:
+            for slot, values in enumerate(data.boards):
+                for sensor, value in zip(BOARD_SENSORS, values or ()):
+                    if value is not None:
+                        self._field_updated[f"{slot}:{sensor}"] = now
+
+    @callback
+    def _snapshot_to_save(self) -> dict:
+        """Return the snapshot to persist."""
+        snapshot = {
+            "data": self._last_good_data.as_dict(),
+            "miner": self.miner_info,
+            "updated": self._field_updated,
+            "saved_at": self._last_good_at,
+        }
+        if self.statistics is not None:
+            snapshot["statistics"] = self.statistics.as_dict()
+        return snapshot
+
+    async def get_miner(self, force: bool = False):
+        """Get a valid Miner instance.
+
+        The fingerprinted miner is cached across polls and only resolved again
+        when forced, after repeated failures, or when the IP or firmware changed.
+        """
         miner_ip = self.config_entry.data[CONF_IP]
-        miner = await pyasic.get_miner(miner_ip)
+        if (
+            not force
+            and not self._fingerprint_stale
+            and self.miner is not None
+            and str(self.miner.ip) == miner_ip
+        ):
+            return self.miner
+
+        # Single-flight: concurrent callers share one fingerprint handshake
+        if self._fingerprint_task is None:
+            self._fingerprint_task = self.hass.async_create_task(
+                self._async_fingerprint(miner_ip)
+            )
+        task = self._fingerprint_task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._fingerprint_task is task:
+                self._fingerprint_task = None
+
+    async def _async_fingerprint(self, miner_ip: str):
+        """Resolve the miner type for an IP and apply credentials."""
+        import pyasic  # lazy import to avoid blocking event loop
+
+        start = time.perf_counter()
+        with track_operation(
+            self.hass, OPERATION_FINGERPRINT, self.config_entry.entry_id, miner_ip
+        ):
+            miner = await pyasic.get_miner(miner_ip)
+        if (timing := self.poll_stats.active) is not None:
+            timing.add(METRIC_FINGERPRINT, time.perf_counter() - start)
         if miner is None:
             return None
 
-        self.miner = miner
-        if self.miner.api is not None:
-            if self.miner.api.pwd is not None:
-                self.miner.api.pwd = self.config_entry.data.get(CONF_RPC_PASSWORD, "")
+        instrument_miner(miner, self.poll_stats)
+        self.miner = self._apply_credentials(miner)
+        self._fingerprint_stale = False
+        self.async_invalidate_cached_fields()
+        return self.miner
 
-        if self.miner.web is not None:
-            self.miner.web.username = self.config_entry.data.get(CONF_WEB_USERNAME, "")
-            self.miner.web.pwd = self.config_entry.data.get(CONF_WEB_PASSWORD, "")
+    def _apply_credentials(self, miner: "pyasic.AnyMiner") -> "pyasic.AnyMiner":
+        """Apply the configured credentials to a miner instance."""
+        return apply_credentials(miner, self.config_entry.data)
 
-        if self.miner.ssh is not None:
-            self.miner.ssh.username = self.config_entry.data.get(CONF_SSH_USERNAME, "")
-            self.miner.ssh.pwd = self.config_entry.data.get(CONF_SSH_PASSWORD, "")
-        return self.miner
+    def _record_failure(self) -> None:
+        """Count a failed poll and drop the cached fingerprint if it persists."""
+        self._failure_count += 1
+        if self._failure_count >= REFINGERPRINT_FAILURE_THRESHOLD:
+            self._fingerprint_stale = True
+        self.breaker.record_failure(self._failure_count)
+
+    @property
+    def breaker_attributes(self) -> dict:
+        """Return circuit breaker details for diagnostic entities."""
+        return {
+            "failure_count": self._failure_count,
+            "next_retry": self.breaker.next_retry,
+        }
+
+    async def async_poll(self) -> None:
+        """Run one scheduled poll and publish the result to listeners."""
+        try:
+            data = await self._async_update_data()
+        except UpdateFailed as err:
+            if self.last_update_success:
+                _LOGGER.error("Error fetching %s data: %s", self.name, err)
+            self.last_update_success = False
+            self.last_exception = err
+            self.async_update_listeners()
+            return
+        except Exception as err:
+            if self.last_update_success:
+                _LOGGER.exception("Unexpected error fetching %s data", self.name)
+            self.last_update_success = False
+            self.last_exception = err
+            self.async_update_listeners()
+            return
+
+        self.async_set_updated_data(data)
 
     async def _async_update_data(self):
+        """Fetch sensors from miners, timing the poll."""
+        timing = self.poll_stats.start_poll()
+        if (profiler := self.profiler) is not None:
+            profiler.poll_started()
+        try:
+            with track_operation(
+                self.hass, OPERATION_POLL, self.config_entry.entry_id, self.name
+            ):
+                return await self._async_poll_miner(timing)
+        except Exception as err:
+            self.trace.add_error(err.__cause__ or err)
+            raise
+        finally:
+            self.poll_stats.finish_poll(timing)
+            if not timing.ok and self.rolling is not None:
+                # Failed polls count against the uptime
+                self.rolling.add(time.time(), None)
+            if profiler is not None:
+                profiler.poll_finished(self)
+
+    async def _async_poll_miner(self, timing: PollTiming):
         """Fetch sensors from miners."""
         import pyasic  # lazy import to avoid blocking event loop
 
-        miner = await self.get_miner()
+        if not self.breaker.allow_request():
+            raise UpdateFailed(
+                f"Miner offline, next retry at {self.breaker.next_retry}"
+            )
+
+        # Skip the full fingerprint handshake while the miner is unreachable
+        if self._failure_count and not await async_probe(
+            self.config_entry.data[CONF_IP]
+        ):
+            miner = None
+        else:
+            try:
+                miner = await self.get_miner()
+            except Exception as err:
+                # A failed handshake counts like a miner not answering
+                _LOGGER.debug("%s: fingerprint failed: %s", self.name, err)
+                self.trace.add_error(err)
+                miner = None
 
         if miner is None:
-            self._failure_count += 1
+            self._record_failure()
 
             if self._failure_count == 1:
+                self.trace.add_error("Miner offline")
                 _LOGGER.warning(
-                    "Miner is offline – returning zeroed data (first failure)."
+                    "Miner is offline – returning last known data (first failure)."
                 )
-                return {
-                    **DEFAULT_DATA,
-                    "power_limit_range": {
-                        "min": self.config_entry.data.get(CONF_MIN_POWER, 1600),
-                        "max": self.config_entry.data.get(CONF_MAX_POWER, 6000),
-                    },
-                }
+                return self._fallback_data()
 
             raise UpdateFailed("Miner Offline (consecutive failure)")
 
         # At this point, miner is valid
-        _LOGGER.debug(f"Found miner: {self.miner}")
-
-        # Base data options to fetch
+        _LOGGER.debug("Found miner: %s", self.miner)
+
+        # Data options due on this poll, see the polling tiers above, minus
+        # the ones this firmware is known to fail on
+        capabilities = await async_get_capability_cache(self.hass)
+        key = capability_key(self.miner.make, self.miner.model, self._fw_ver)
+        unsupported = capabilities.unsupported(key).difference(REQUIRED_DATA_OPTIONS)
+        now = time.monotonic()
         data_options = [
-            pyasic.DataOptions.HOSTNAME,
-            pyasic.DataOptions.MAC,
-            pyasic.DataOptions.IS_MINING,
-            pyasic.DataOptions.FW_VERSION,
-            pyasic.DataOptions.HASHRATE,
-            pyasic.DataOptions.EXPECTED_HASHRATE,
-            pyasic.DataOptions.HASHBOARDS,
-            pyasic.DataOptions.WATTAGE,
-            pyasic.DataOptions.WATTAGE_LIMIT,
-# EBE_20260309
-#            pyasic.DataOptions.FANS,
-            pyasic.DataOptions.CONFIG,
+            pyasic.DataOptions(option)
+            for option in self._due_data_options(now)
+            if option not in unsupported
         ]
 
+        # For large fleets the whole poll runs in a worker process, see
+        # workers
+        field_cache = dict(self._field_cache)
+        start = time.perf_counter()
         try:
-            miner_data = await self.miner.get_data(include=data_options)
+            data, fetched_fields, build_time = await self._async_get_data(
+                data_options, field_cache
+            )
         except Exception as err:
-            # VNish firmware has a bug with CONFIG - retry without it
-            if "config" in str(err).lower():
+            # Some firmwares fail on single options (e.g. CONFIG on VNish),
+            # remember that and retry without it
+            failed_option = _failed_data_option(err, data_options)
+            if (
+                failed_option is not None
+                and str(failed_option) not in REQUIRED_DATA_OPTIONS
+            ):
                 _LOGGER.warning(
-                    f"Config fetch failed for {self.miner}, retrying without CONFIG: {err}"
+                    "%s fetch failed for %s, retrying without it: %s",
+                    failed_option,
+                    self.miner,
+                    err,
                 )
-                data_options.remove(pyasic.DataOptions.CONFIG)
+                self.trace.add_error(err)
+                data_options.remove(failed_option)
+                timing.add(METRIC_RETRIES, 1)
                 try:
-                    miner_data = await self.miner.get_data(include=data_options)
+                    data, fetched_fields, build_time = await self._async_get_data(
+                        data_options, field_cache
+                    )
                 except Exception as retry_err:
-                    self._failure_count += 1
+                    self._record_failure()
                     if self._failure_count == 1:
+                        self.trace.add_error(retry_err)
                         _LOGGER.warning(
-                            f"Error fetching miner data: {retry_err} – returning zeroed data (first failure)."
+                            "Error fetching miner data: %s – returning last known"
+                            " data (first failure).",
+                            retry_err,
                         )
-                        return {
-                            **DEFAULT_DATA,
-                            "power_limit_range": {
-                                "min": self.config_entry.data.get(CONF_MIN_POWER, 1600),
-                                "max": self.config_entry.data.get(CONF_MAX_POWER, 6000),
-                            },
-                        }
+                        return self._fallback_data()
                     _LOGGER.exception(retry_err)
                     raise UpdateFailed from retry_err
+                # Only the option failed, the miner served the rest
+                capabilities.async_record_failure(key, str(failed_option))
             else:
-                self._failure_count += 1
+                self._record_failure()
 
                 if self._failure_count == 1:
+                    self.trace.add_error(err)
                     _LOGGER.warning(
-                        f"Error fetching miner data: {err} – returning zeroed data (first failure)."
+                        "Error fetching miner data: %s – returning last known"
+                        " data (first failure).",
+                        err,
                     )
-                    return {
-                        **DEFAULT_DATA,
-                        "power_limit_range": {
-                            "min": self.config_entry.data.get(CONF_MIN_POWER, 1600),
-                            "max": self.config_entry.data.get(CONF_MAX_POWER, 6000),
-                        },
-                    }
+                    return self._fallback_data()
 
                 _LOGGER.exception(err)
                 raise UpdateFailed from err
 
-        _LOGGER.debug(f"Got data: {miner_data}")
-
-        _LOGGER.warning(
-            f"EBE_20260309_52: coordinator.py _async_update_data: {miner_data}")
+        timing.add(METRIC_GET_DATA, time.perf_counter() - start - build_time)
+        processing_start = time.perf_counter()
 
+        capabilities.async_mark_supported(key, data_options)
 
         # Success: reset the failure count
         self._failure_count = 0
+        self.breaker.record_success()
+
+        # A firmware update may change which pyasic backend handles the miner
+        if (fw_ver := fetched_fields.get("fw_ver")) is not None:
+            if self._fw_ver is not None and fw_ver != self._fw_ver:
+                _LOGGER.debug(
+                    "%s: firmware changed from %s to %s, fingerprinting again",
+                    self.name,
+                    self._fw_ver,
+                    fw_ver,
+                )
+                self._fingerprint_stale = True
+            elif self._fw_ver is None:
+                # Keep what was probed before the firmware version was known
+                capabilities.async_migrate(
+                    key, capability_key(self.miner.make, self.miner.model, fw_ver)
+                )
+            self._fw_ver = fw_ver
+
+        self._cache_fields(fetched_fields, data_options, now)
+
+        self._last_good_data = data
+        self._last_good_at = time.time()
+        self.restored = False
+        boards_fetched = pyasic.DataOptions.HASHBOARDS in data_options
+        self._stamp_fields(data, boards_fetched, self._last_good_at)
+        self._snapshot.async_schedule_save(self._snapshot_to_save)
+        if self.statistics is not None:
+            self.statistics.add(data, self._last_good_at)
+        if self.rolling is not None:
+            self.rolling.add(self._last_good_at, data)
+        if self.history is not None and boards_fetched:
+            # Skips a poll started before the history was enabled
+            self.history.add(self._last_good_at, data)
+
+        timing.ok = True
+        timing.add(
+            METRIC_POST_PROCESSING,
+            build_time + time.perf_counter() - processing_start,
+        )
+        return data
 
+    async def _async_get_data(
+        self, data_options: list, field_cache: dict
+    ) -> tuple[MinerSnapshot, dict, float]:
+        """Fetch the data options and derive the data from them."""
+        if self.worker_pool is not None:
+            return await self.worker_pool.async_get_data(
+                self.miner,
+                self.config_entry.data,
+                data_options,
+                field_cache,
+                self._fw_ver,
+            )
+        miner_data = await self.miner.get_data(include=data_options)
+        return build_data(self.miner.ip, data_options, field_cache, miner_data)
+
+
+def apply_credentials(miner: "pyasic.AnyMiner", data: Mapping) -> "pyasic.AnyMiner":
+    """Apply the credentials of config entry data to a miner instance."""
+    if miner.api is not None:
+        if miner.api.pwd is not None:
+            miner.api.pwd = data.get(CONF_RPC_PASSWORD, "")
+
+    if miner.web is not None:
+        miner.web.username = data.get(CONF_WEB_USERNAME, "")
+        miner.web.pwd = data.get(CONF_WEB_PASSWORD, "")
+
+    if miner.ssh is not None:
+        miner.ssh.username = data.get(CONF_SSH_USERNAME, "")
+        miner.ssh.pwd = data.get(CONF_SSH_PASSWORD, "")
+    return miner
+
+
+def build_data(
+    ip, data_options: list, field_cache: dict, miner_data
+) -> tuple[MinerSnapshot, dict, float]:
+    """Derive the published data from MinerData.
+
+    Returns the data, the slow fields fetched on this poll for the cache
+    and the seconds spent.
+    """
+    start = time.perf_counter()
+    _LOGGER.debug("Got data: %s", miner_data)
+
+    # Read before the cached slow fields are merged in
+    power_limit = miner_data.wattage_limit
+    fetched_fields = _merge_cached_fields(miner_data, data_options, field_cache)
+
+    # The summary hashrate of every poll. pyasic's hashrate is the sum of
+    # the hashboards when there are any, which would switch the source
+    # between polls that fetch the boards and polls that reuse them
+    raw_hashrate = miner_data.raw_hashrate
+    if raw_hashrate is None:
+        # No summary hashrate on this firmware, the boards are always there
+        raw_hashrate = miner_data.hashrate
+
+    try:
+        hashrate = round(float(raw_hashrate), 2)
+    except TypeError:
+        hashrate = None
+
+    try:
+        efficiency = round(miner_data.wattage / float(raw_hashrate), 2)
+    except TypeError:
+        efficiency = None
+    except ZeroDivisionError:
+        efficiency = 0.0
+
+    try:
+        expected_hashrate = round(float(miner_data.expected_hashrate), 2)
+    except TypeError:
+        expected_hashrate = None
+
+    try:
+        active_preset = miner_data.config.mining_mode.active_preset.name
+    except AttributeError:
+        active_preset = None
+
+    u_efficiency = 0.0
+    if miner_data.wattage is not None:
         try:
-            hashrate = round(float(miner_data.hashrate), 2)
-        except TypeError:
-            hashrate = None
-
-        try:
-            expected_hashrate = round(float(miner_data.expected_hashrate), 2)
-        except TypeError:
-            expected_hashrate = None
+            if hashrate <= 0:
+                u_efficiency = round(float(miner_data.wattage / (hashrate + 0.01)), 2)
+            else:
+                u_efficiency = round(float(miner_data.wattage / hashrate), 2)
+        except AttributeError:
+            u_efficiency = None
 
+    u_is_mining = False
+    if miner_data.wattage is not None:
         try:
-            active_preset = miner_data.config.mining_mode.active_preset.name
+            if miner_data.wattage > 50.0 and hashrate > 0.0:
+                u_is_mining = True
+            else:
+                u_is_mining = False
         except AttributeError:
-            active_preset = None
-
-# EBE_20260309_BEGIN
-
-#        _LOGGER.warning(f"EBE_20250814_001: coordinator.py _async_update_data: hashrate: {hashrate}")
-#        _LOGGER.warning(f"EBE_20250814_002: coordinator.py _async_update_data: miner_data.wattage: {miner_data.wattage}")
-#        _LOGGER.warning(f"EBE_20250814_003: coordinator.py _async_update_data: miner_data: {miner_data}")
-#        _LOGGER.warning(f"EBE_20250814_003: coordinator.py _async_update_data: miner_data.hashboards: {miner_data.hashboards}")
-
-        u_efficiency = 0.0
-        if miner_data.wattage is not None:
-            try:
-                if hashrate <= 0:
-                    u_efficiency = round(float(miner_data.wattage / (hashrate + 0.01)), 2)
-                else:
-                    u_efficiency = round(float(miner_data.wattage / hashrate), 2)
-            except AttributeError:
-                u_efficiency = None
-
-        _LOGGER.warning(f"EBE_20260309: coordinator.py _async_update_data: u_efficiency: {u_efficiency}")
-
-        u_is_mining = False
-        if miner_data.wattage is not None:
-            try:
-                if miner_data.wattage > 50.0 and hashrate > 0.0:
-#                    miner_data.is_mining = True
-                    u_is_mining = True
-                else:
-#                    miner_data.is_mining = False
-                    u_is_mining = False
-            except AttributeError:
-#                miner_data.is_mining = None
-                u_is_mining = None
-
-        _LOGGER.warning(f"EBE_20260309: coordinator.py _async_update_data: u_is_mining: {u_is_mining}")
-
-        board_count = 0
-        u_max_chip_temp = 0.0
-        sum_chip_temp = 0.0
-        for board in miner_data.hashboards:
-            board_count = board_count + 1
-            sum_chip_temp = sum_chip_temp + board.chip_temp
-#            _LOGGER.warning(f"EBE_20250814_03: coordinator.py _async_update_data: miner_data.hashboards: {miner_data.hashboards}")
-#            _LOGGER.warning(f"EBE_20250814_03: coordinator.py _async_update_data: board.chip_temp: {board.chip_temp}")
-#            _LOGGER.warning(f"EBE_20250814_04: coordinator.py _async_update_data: board_count: {board_count}")
-            if u_max_chip_temp < board.chip_temp:
-                u_max_chip_temp = board.chip_temp
-
-        u_mid_chip_temp = float(sum_chip_temp) / float(board_count)
-#        if u_mid_chip_temp < u_max_chip_temp:
-#            u_mid_chip_temp = (float(u_max_chip_temp) + u_mid_chip_temp) / 2.0
-
-        _LOGGER.warning(f"EBE_20250814: coordinator.py _async_update_data: u_max_chip_temp: {u_max_chip_temp}")
-
-# EBE_20260309_END
-
-        data = {
-            "hostname": miner_data.hostname,
-            "mac": miner_data.mac,
-            "make": miner_data.make,
-            "model": miner_data.model,
-            "ip": self.miner.ip,
-# EBE_20260309_BEGIN
-#            "is_mining": miner_data.is_mining,
-            "is_mining": u_is_mining,
-# EBE_20260309_END
-            "fw_ver": miner_data.fw_ver,
-            "miner_sensors": {
-                "hashrate": hashrate,
-                "ideal_hashrate": expected_hashrate,
-                "active_preset_name": active_preset,
-                "temperature": miner_data.temperature_avg,
-                "power_limit": miner_data.wattage_limit,
-                "miner_consumption": miner_data.wattage,
-                "efficiency": miner_data.efficiency_fract,
-# EBE_20260309_BEGIN
-                "u_max_chip_temperature": u_max_chip_temp,
-                "u_mid_chip_temperature": u_mid_chip_temp,
-                "u_efficiency": u_efficiency,
-#                "u_is_mining": u_is_mining,
-# EBE_20260309_END
-            },
-            "board_sensors": {
-                board.slot: {
-                    "board_temperature": board.temp,
-                    "chip_temperature": board.chip_temp,
-                    "board_hashrate": round(float(board.hashrate or 0), 2),
-                }
-                for board in miner_data.hashboards
-            },
-# EBE_20260309_BEGIN
-#            "fan_sensors": {
-#                idx: {"fan_speed": fan.speed} for idx, fan in enumerate(miner_data.fans)
-#            },
-# EBE_20260309_END
-            "config": miner_data.config,
-            "power_limit_range": {
-                "min": self.config_entry.data.get(CONF_MIN_POWER, 1600),
-                "max": self.config_entry.data.get(CONF_MAX_POWER, 6000),
-            },
-        }
-
-        _LOGGER.warning(
-            f"EBE_20260309_53: coordinator.py _async_update_data: {data}")
-
-        return data
+            u_is_mining = None
+
+    board_count = 0
+    u_max_chip_temp = 0.0
+    sum_chip_temp = 0.0
+    for board in miner_data.hashboards:
+        if board.chip_temp is None:
+            continue
+        board_count = board_count + 1
+        sum_chip_temp = sum_chip_temp + board.chip_temp
+        if u_max_chip_temp < board.chip_temp:
+            u_max_chip_temp = board.chip_temp
+
+    # No boards, or none reporting chip temperatures
+    u_mid_chip_temp = (
+        float(sum_chip_temp) / float(board_count) if board_count else None
+    )
+
+    data = MinerSnapshot(
+        hostname=miner_data.hostname,
+        mac=miner_data.mac,
+        make=miner_data.make,
+        model=miner_data.model,
+        ip=ip,
+        is_mining=u_is_mining,
+        fw_ver=miner_data.fw_ver,
+        # In MINER_SENSORS order
+        sensors=(
+            hashrate,
+            expected_hashrate,
+            active_preset,
+            miner_data.temperature_avg,
+            power_limit,
+            miner_data.wattage,
+            efficiency,
+            u_max_chip_temp,
+            u_mid_chip_temp,
+            u_efficiency,
+        ),
+        # In BOARD_SENSORS order
+        boards=board_values(
+            (
+                board.slot,
+                (board.temp, board.chip_temp, round(float(board.hashrate or 0), 2)),
+            )
+            for board in miner_data.hashboards
+        ),
+    )
+
+    return data, fetched_fields, time.perf_counter() - start
+
+
+def _merge_cached_fields(miner_data, data_options: list, field_cache: dict) -> dict:
+    """Fill in the slow fields not fetched and return the ones fetched."""
+    fetched = {str(option) for option in data_options}
+    fetched_fields = {}
+    for tier in (HASHBOARD_DATA_OPTIONS, IDENTITY_DATA_OPTIONS):
+        for field in tier:
+            if field in fetched:
+                fetched_fields[field] = getattr(miner_data, field)
+            elif field in field_cache:
+                setattr(miner_data, field, field_cache[field])
+    return fetched_fields
+
+
+def _failed_data_option(err: Exception, data_options: list):
+    """Return the DataOption a get_data error was raised for, if any."""
+    message = str(err).lower()
+    for option in data_options:
+        # pyasic wraps errors as "Failed to call <option> on <miner> ..."
+        if f"call {option} on" in message:
+            return option
+    for option in data_options:
+        if str(option) == "config" and "config" in message:
+            return option
+    return None
@@ -0,0 +1,70 @@
+"""Diagnostics support for Miner."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_RPC_PASSWORD
+from .const import CONF_SSH_PASSWORD
+from .const import CONF_SSH_USERNAME
+from .const import CONF_WEB_PASSWORD
+from .const import CONF_WEB_USERNAME
+from .const import DOMAIN
+from .patch import PYASIC_PROVISION_STATS
+from .timing import fleet_summary
+from .watchdog import async_get_watchdog
+
+TO_REDACT = {
+    CONF_RPC_PASSWORD,
+    CONF_SSH_PASSWORD,
+    CONF_SSH_USERNAME,
+    CONF_WEB_PASSWORD,
+    CONF_WEB_USERNAME,
+}
+# Keys of raw miner requests and responses that carry credentials
+TRACE_TO_REDACT = {
+    "authorization",
+    "pass",
+    "passwd",
+    "password",
+    "pw",
+    "pwd",
+    "token",
+    "user",
+    "username",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinators = hass.data.get(DOMAIN, {})
+    diagnostics = {
+        "entry": async_redact_data(config_entry.as_dict(), TO_REDACT),
+        "pyasic": PYASIC_PROVISION_STATS,
+    }
+    if (coordinator := coordinators.get(config_entry.entry_id)) is not None:
+        diagnostics["poll_timing"] = coordinator.poll_stats.as_dict()
+        secrets = [
+            config_entry.data.get(key)
+            for key in (CONF_RPC_PASSWORD, CONF_WEB_PASSWORD, CONF_SSH_PASSWORD)
+        ]
+        diagnostics["trace"] = async_redact_data(
+            coordinator.trace.as_dict(secrets), TRACE_TO_REDACT
+        )
+    watchdog = async_get_watchdog(hass)
+    diagnostics["loop_watchdog"] = {
+        **watchdog.as_dict(),
+        "entry": watchdog.entry_stats(config_entry.entry_id),
+    }
+    diagnostics["fleet_poll_timing"] = fleet_summary(
+        {
+            coordinator.config_entry.title: coordinator.poll_stats
+            for coordinator in coordinators.values()
+        }
+    )
+    return diagnostics
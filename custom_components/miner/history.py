@@ -0,0 +1,275 @@
+"""Full resolution board history of a miner in an append-only file.
+
+While history is kept the boards are fetched on every poll, and each
+board reading is a fixed-width record of time, board slot, board
+temperature, chip temperature and hashrate, appended in batches from the
+executor. Records are in time order, so a read memory-maps the file and
+bisects to the range it wants, copying only that range into arrays. The
+retention job drops expired records by rewriting the file, only once
+enough of it has expired to be worth the copy. The board_history service
+returns the records of a time range.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from array import array
+from datetime import timedelta
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+from .models import BOARD_SENSORS
+from .models import MinerSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# File header: magic, format version and record size
+HISTORY_HEADER = struct.Struct("<8sHH4x")
+HISTORY_MAGIC = b"MINERHST"
+HISTORY_VERSION = 1
+# Record: time, board slot, then the values in BOARD_SENSORS order, NaN
+# for a missing one
+HISTORY_RECORD = struct.Struct("<dH2x3f")
+HISTORY_TIME = struct.Struct("<d")
+# Columns a read returns and their array typecodes
+HISTORY_COLUMNS = {
+    "time": "d",
+    "slot": "H",
+    **dict.fromkeys(BOARD_SENSORS, "f"),
+}
+
+# Records buffered before they are written regardless of the flush timer
+HISTORY_BATCH_RECORDS = 256
+# Seconds buffered records wait for more before they are written
+HISTORY_FLUSH_DELAY = 60
+# Interval between checks for expired records
+HISTORY_RETENTION_INTERVAL = timedelta(hours=6)
+# Share of expired records from which the file is rewritten without them
+HISTORY_COMPACT_RATIO = 0.1
+
+
+class BoardHistoryStore:
+    """Append-only board history of one config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, retention_days: int):
+        """Initialize the store, call async_start to write."""
+        self.hass = hass
+        self.path = history_path(hass, entry_id)
+        self.retention_days = retention_days
+        self._buffer = bytearray()
+        # Serializes appends and compaction, reads go without
+        self._lock = asyncio.Lock()
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._unsub_retention: CALLBACK_TYPE | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start the retention job and flush on shutdown."""
+        self._unsub_retention = async_track_time_interval(
+            self.hass,
+            self._async_apply_retention,
+            HISTORY_RETENTION_INTERVAL,
+            name="miner board history retention",
+        )
+        self._unsub_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+        )
+
+    async def async_close(self) -> None:
+        """Stop the jobs and write what is buffered."""
+        for unsub in (self._unsub_flush, self._unsub_retention, self._unsub_stop):
+            if unsub is not None:
+                unsub()
+        self._unsub_flush = self._unsub_retention = self._unsub_stop = None
+        await self.async_flush()
+
+    async def _async_on_stop(self, _event) -> None:
+        self._unsub_stop = None
+        await self.async_close()
+
+    @callback
+    def add(self, now: float, data: MinerSnapshot) -> None:
+        """Buffer the board readings of a poll."""
+        for slot, values in enumerate(data.boards):
+            if values is None:
+                continue
+            self._buffer += HISTORY_RECORD.pack(
+                now,
+                slot,
+                *(math.nan if value is None else value for value in values),
+            )
+        if len(self._buffer) >= HISTORY_BATCH_RECORDS * HISTORY_RECORD.size:
+            self.hass.async_create_background_task(
+                self.async_flush(), "miner board history flush"
+            )
+        elif self._unsub_flush is None and self._buffer:
+            self._unsub_flush = async_call_later(
+                self.hass, HISTORY_FLUSH_DELAY, self._async_flush_later
+            )
+
+    async def _async_flush_later(self, _now) -> None:
+        self._unsub_flush = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Append the buffered records to the file."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if not self._buffer:
+            return
+        records, self._buffer = bytes(self._buffer), bytearray()
+        async with self._lock:
+            await self.hass.async_add_executor_job(_append, self.path, records)
+
+    async def async_read(self, start: float, end: float) -> dict[str, array]:
+        """Return the records from start up to end as arrays by column.
+
+        Times are Unix timestamps, buffered records are written first.
+        """
+        await self.async_flush()
+        return await self.hass.async_add_executor_job(_read, self.path, start, end)
+
+    async def _async_apply_retention(self, _now=None) -> None:
+        """Drop the expired records once enough of them expired."""
+        cutoff = time.time() - self.retention_days * 86400
+        async with self._lock:
+            await self.hass.async_add_executor_job(_compact, self.path, cutoff)
+
+
+def history_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the path of the board history file of an entry."""
+    return hass.config.path(".storage", f"{DOMAIN}.history.{entry_id}.bin")
+
+
+async def async_remove_history(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the board history file of an entry, if there is one."""
+    await hass.async_add_executor_job(_remove, history_path(hass, entry_id))
+
+
+def _header() -> bytes:
+    return HISTORY_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION, HISTORY_RECORD.size)
+
+
+def _valid_header(header: bytes) -> bool:
+    return len(header) == HISTORY_HEADER.size and header == _header()
+
+
+def _remove(path: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def _append(path: str, records: bytes) -> None:
+    """Append records, starting the file or cutting a torn last record."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab+") as file:
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        if not _valid_header(file.read(HISTORY_HEADER.size)):
+            if size:
+                _LOGGER.warning("Starting over unreadable board history %s", path)
+            file.truncate(0)
+            file.write(_header())
+        elif (torn := (size - HISTORY_HEADER.size) % HISTORY_RECORD.size) != 0:
+            file.truncate(size - torn)
+        file.write(records)
+
+
+class _Times:
+    """Record times of a mapped file, as a sequence to bisect."""
+
+    def __init__(self, mapped: mmap.mmap, count: int) -> None:
+        self._mapped = mapped
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> float:
+        return HISTORY_TIME.unpack_from(
+            self._mapped, HISTORY_HEADER.size + index * HISTORY_RECORD.size
+        )[0]
+
+
+def _map(file) -> tuple[mmap.mmap, int] | None:
+    """Map a history file, return it and its record count, None if empty."""
+    size = os.fstat(file.fileno()).st_size
+    count = (size - HISTORY_HEADER.size) // HISTORY_RECORD.size
+    if count <= 0:
+        return None
+    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if not _valid_header(mapped[: HISTORY_HEADER.size]):
+        mapped.close()
+        return None
+    return mapped, count
+
+
+def _read(path: str, start: float, end: float) -> dict[str, array]:
+    """Return the records from start up to end, in the executor."""
+    columns = {name: array(typecode) for name, typecode in HISTORY_COLUMNS.items()}
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return columns
+    with file:
+        if (mapped_count := _map(file)) is None:
+            return columns
+        mapped, count = mapped_count
+        with mapped:
+            times = _Times(mapped, count)
+            first = bisect.bisect_left(times, start)
+            last = bisect.bisect_left(times, end, lo=first)
+            column_arrays = list(columns.values())
+            for record in HISTORY_RECORD.iter_unpack(
+                mapped[
+                    HISTORY_HEADER.size
+                    + first * HISTORY_RECORD.size : HISTORY_HEADER.size
+                    + last * HISTORY_RECORD.size
+                ]
+            ):
+                for column, value in zip(column_arrays, record):
+                    column.append(value)
+    return columns
+
+
+def _compact(path: str, cutoff: float) -> None:
+    """Rewrite the file without records before cutoff, in the executor."""
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with file:
+        if (mapped_count := _map(file)) is None:
+            return
+        mapped, count = mapped_count
+        with mapped:
+            expired = bisect.bisect_left(_Times(mapped, count), cutoff)
+            if expired < count * HISTORY_COMPACT_RATIO:
+                return
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as temp:
+                temp.write(_header())
+                temp.write(
+                    mapped[
+                        HISTORY_HEADER.size
+                        + expired * HISTORY_RECORD.size : HISTORY_HEADER.size
+                        + count * HISTORY_RECORD.size
+                    ]
+                )
+    os.replace(temp_path, path)
+    _LOGGER.debug("Dropped %s expired records from %s", expired, path)
@@ -0,0 +1,132 @@
+"""Immutable snapshot of the data of one poll."""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+# Miner sensors in the order of MinerSnapshot.sensors
+MINER_SENSORS = (
+    "hashrate",
+    "ideal_hashrate",
+    "active_preset_name",
+    "temperature",
+    "power_limit",
+    "miner_consumption",
+    "efficiency",
+    "u_max_chip_temperature",
+    "u_mid_chip_temperature",
+    "u_efficiency",
+)
+# Board sensors in the order of each board in MinerSnapshot.boards
+BOARD_SENSORS = ("board_temperature", "chip_temperature", "board_hashrate")
+
+# Indexes entities look their value up by, resolved once at setup
+MINER_SENSOR_INDEX = {sensor: index for index, sensor in enumerate(MINER_SENSORS)}
+BOARD_SENSOR_INDEX = {sensor: index for index, sensor in enumerate(BOARD_SENSORS)}
+SENSOR_POWER_LIMIT = MINER_SENSOR_INDEX["power_limit"]
+
+# Snapshot fields entities listen to by name, see snapshot_changes
+SNAPSHOT_FIELDS = ("hostname", "mac", "make", "model", "ip", "is_mining", "fw_ver")
+
+
+class MinerSnapshot(NamedTuple):
+    """Data of one poll, shared as is by every entity of the miner."""
+
+    hostname: str | None
+    mac: str | None
+    make: str | None
+    model: str | None
+    ip: str | None
+    is_mining: bool | None
+    fw_ver: str | None
+    # Values in MINER_SENSORS order
+    sensors: tuple
+    # Values in BOARD_SENSORS order by board slot, None for a missing slot
+    boards: tuple[tuple | None, ...]
+
+    def board_value(self, slot: int, index: int):
+        """Return a value of a board, None when the board is missing."""
+        try:
+            return self.boards[slot][index]
+        except (IndexError, TypeError):
+            return None
+
+    def as_dict(self) -> dict:
+        """Return the snapshot as nested dicts, as it is stored."""
+        return {
+            "hostname": self.hostname,
+            "mac": self.mac,
+            "make": self.make,
+            "model": self.model,
+            "ip": self.ip,
+            "is_mining": self.is_mining,
+            "fw_ver": self.fw_ver,
+            "miner_sensors": dict(zip(MINER_SENSORS, self.sensors)),
+            "board_sensors": {
+                slot: dict(zip(BOARD_SENSORS, values))
+                for slot, values in enumerate(self.boards)
+                if values is not None
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> MinerSnapshot:
+        """Return a snapshot from nested dicts, board slots may be strings."""
+        miner_sensors = data.get("miner_sensors", {})
+        boards = {
+            int(slot): sensors
+            for slot, sensors in data.get("board_sensors", {}).items()
+        }
+        return cls(
+            hostname=data.get("hostname"),
+            mac=data.get("mac"),
+            make=data.get("make"),
+            model=data.get("model"),
+            ip=data.get("ip"),
+            is_mining=data.get("is_mining"),
+            fw_ver=data.get("fw_ver"),
+            sensors=tuple(miner_sensors.get(sensor) for sensor in MINER_SENSORS),
+            boards=board_values(
+                (slot, tuple(sensors.get(sensor) for sensor in BOARD_SENSORS))
+                for slot, sensors in boards.items()
+            ),
+        )
+
+
+def board_values(boards) -> tuple[tuple | None, ...]:
+    """Return (slot, values) pairs as a tuple indexed by slot."""
+    boards = list(boards)
+    values: list[tuple | None] = [None] * (
+        max((slot for slot, _ in boards), default=-1) + 1
+    )
+    for slot, board in boards:
+        values[slot] = board
+    return tuple(values)
+
+
+def snapshot_changes(previous: MinerSnapshot, current: MinerSnapshot) -> set:
+    """Return the keys of the values that differ between two snapshots.
+
+    Keys are a field name, the index of a miner sensor or (slot, index) of
+    a board sensor, the same keys entities listen with.
+    """
+    if previous is current:
+        return set()
+    changed = {
+        field
+        for field in SNAPSHOT_FIELDS
+        if getattr(previous, field) != getattr(current, field)
+    }
+    changed.update(
+        index
+        for index, (old, new) in enumerate(zip(previous.sensors, current.sensors))
+        if old != new
+    )
+    for slot in range(max(len(previous.boards), len(current.boards))):
+        if previous.boards[slot : slot + 1] == current.boards[slot : slot + 1]:
+            continue
+        changed.update(
+            (slot, index)
+            for index in range(len(BOARD_SENSORS))
+            if previous.board_value(slot, index) != current.board_value(slot, index)
+        )
+    return changed
@@ -17,6 +17,7 @@ from homeassistant.const import UnitOfPower
 
 from .const import DOMAIN
 from .coordinator import MinerCoordinator
+from .models import SENSOR_POWER_LIMIT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,8 +40,7 @@ async def async_setup_entry(
     """Add sensors for passed config_entry in HA."""
     coordinator: MinerCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    await coordinator.async_config_entry_first_refresh()
-    if coordinator.miner.supports_autotuning:
+    if coordinator.miner_info.get("supports_autotuning"):
         async_add_entities(
             [
                 MinerPowerLimitNumber(
@@ -58,8 +58,9 @@ class MinerPowerLimitNumber(CoordinatorEntity[MinerCoordinator], NumberEntity):
         self, coordinator: MinerCoordinator, entity_description: NumberEntityDescription
     ):
         """Initialize the PowerLimit entity."""
-        super().__init__(coordinator=coordinator)
-        self._attr_native_value = self.coordinator.data["miner_sensors"]["power_limit"]
+        # Notified by the coordinator when the power limit changed
+        super().__init__(coordinator=coordinator, context=SENSOR_POWER_LIMIT)
+        self._attr_native_value = self.coordinator.data.sensors[SENSOR_POWER_LIMIT]
         self.entity_description = entity_description
 
     @property
@@ -71,32 +72,32 @@ class MinerPowerLimitNumber(CoordinatorEntity[MinerCoordinator], NumberEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
             connections={
-                ("ip", self.coordinator.data["ip"]),
-                (device_registry.CONNECTION_NETWORK_MAC, self.coordinator.data["mac"]),
+                ("ip", self.coordinator.data.ip),
+                (device_registry.CONNECTION_NETWORK_MAC, self.coordinator.data.mac),
             },
-            configuration_url=f"http://{self.coordinator.data['ip']}",
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            configuration_url=f"http://{self.coordinator.data.ip}",
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
     @property
     def unique_id(self) -> str | None:
         """Return device UUID."""
-        return f"{self.coordinator.data['mac']}-power_limit"
+        return f"{self.coordinator.data.mac}-power_limit"
 
     @property
     def native_min_value(self) -> float | None:
         """Return device minimum value."""
-        return self.coordinator.data["power_limit_range"]["min"]
+        return self.coordinator.power_limit_range["min"]
 
     @property
     def native_max_value(self) -> float | None:
         """Return device maximum value."""
-        return self.coordinator.data["power_limit_range"]["max"]
+        return self.coordinator.power_limit_range["max"]
 
     @property
     def native_step(self) -> float | None:
@@ -134,19 +135,19 @@ class MinerPowerLimitNumber(CoordinatorEntity[MinerCoordinator], NumberEntity):
         if not result:
             raise pyasic.APIError("Failed to set wattage.")
 
+        self.coordinator.async_invalidate_cached_fields()
         self._attr_native_value = value
         self.async_write_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        if self.coordinator.data["miner_sensors"]["power_limit"] is not None:
-            self._attr_native_value = self.coordinator.data["miner_sensors"][
-                "power_limit"
-            ]
+        power_limit = self.coordinator.data.sensors[SENSOR_POWER_LIMIT]
+        if power_limit is not None:
+            self._attr_native_value = power_limit
 
         super()._handle_coordinator_update()
 
     @property
     def available(self) -> bool:
-        """Return if entity is available or not."""
-        return self.coordinator.available
+        """Return if entity is available, controls need the fingerprinted miner."""
+        return self.coordinator.miner is not None
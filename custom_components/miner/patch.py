@@ -4,17 +4,37 @@ from __future__ import annotations
 import os
 import site
 import sys
+import threading
+import time
 from subprocess import PIPE
 from subprocess import Popen
 
+from homeassistant.core import HomeAssistant
 from homeassistant.util.package import _LOGGER
 from homeassistant.util.package import is_virtual_env
 
+from .const import DOMAIN
+from .const import PYASIC_VERSION
+
 _UV_ENV_PYTHON_VARS = (
     "UV_SYSTEM_PYTHON",
     "UV_PYTHON",
 )
 
+DATA_PYASIC_PROVISION = f"{DOMAIN}_pyasic_provision"
+
+# Process-wide result of ensure_pyasic, shared by setup and the config flow
+_pyasic = None
+_pyasic_lock = threading.Lock()
+
+# Cold-start cost of provisioning pyasic, reported in diagnostics
+PYASIC_PROVISION_STATS: dict = {
+    "version": PYASIC_VERSION,
+    "installed": False,
+    "install_seconds": None,
+    "import_seconds": None,
+}
+
 
 # Copy-paste of home assistant core install, but pre-releases are supported
 def install_package(
@@ -89,3 +109,82 @@ def install_package(
             return False
 
     return True
+
+
+def _import_pyasic():
+    """Import pyasic, return None if it is missing, broken or the wrong version."""
+    try:
+        from importlib.metadata import version
+
+        import pyasic
+
+        # Verify the module actually loaded correctly
+        if not hasattr(pyasic, "get_miner"):
+            raise ImportError("pyasic module incomplete")
+        if version("pyasic") != PYASIC_VERSION:
+            raise ImportError("Version mismatch")
+        return pyasic
+    except Exception:
+        return None
+
+
+def ensure_pyasic():
+    """Ensure the pinned pyasic is installed and imported, once per process.
+
+    Blocking, run it in the executor. Concurrent callers wait for the first
+    one and share its result.
+    """
+    global _pyasic
+
+    if _pyasic is not None:
+        return _pyasic
+
+    with _pyasic_lock:
+        if _pyasic is not None:
+            return _pyasic
+
+        start = time.perf_counter()
+        pyasic = _import_pyasic()
+        if pyasic is None:
+            install_start = time.perf_counter()
+            install_package(f"pyasic=={PYASIC_VERSION}", force_reinstall=True)
+            PYASIC_PROVISION_STATS["installed"] = True
+            PYASIC_PROVISION_STATS["install_seconds"] = round(
+                time.perf_counter() - install_start, 3
+            )
+
+            # Clear any cached broken imports
+            for mod_name in list(sys.modules):
+                if mod_name.startswith("pyasic"):
+                    del sys.modules[mod_name]
+
+            import pyasic
+
+        PYASIC_PROVISION_STATS["import_seconds"] = round(
+            time.perf_counter() - start - (PYASIC_PROVISION_STATS["install_seconds"] or 0),
+            3,
+        )
+        _pyasic = pyasic
+
+    return _pyasic
+
+
+async def async_ensure_pyasic(hass: HomeAssistant):
+    """Ensure pyasic is available without blocking the event loop.
+
+    All callers share one executor job, so many entries setting up at once
+    do not each occupy an executor thread.
+    """
+    if _pyasic is not None:
+        return _pyasic
+
+    if (job := hass.data.get(DATA_PYASIC_PROVISION)) is None:
+        job = hass.data[DATA_PYASIC_PROVISION] = hass.async_add_executor_job(
+            ensure_pyasic
+        )
+    try:
+        return await job
+    finally:
+        if job.done() and (job.cancelled() or job.exception() is not None):
+            # Let the next caller retry a failed install
+            hass.data.pop(DATA_PYASIC_PROVISION, None)
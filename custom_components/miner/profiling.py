@@ -0,0 +1,180 @@
+"""Profile the polling path of selected miners on demand."""
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import MinerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PROFILER = f"{DOMAIN}_profiler"
+
+PROFILE_MODE_CPROFILE = "cprofile"
+PROFILE_MODE_SAMPLE = "sample"
+
+DEFAULT_PROFILE_POLLS = 10
+# Upper bound so a forgotten session cannot run for hours
+MAX_PROFILE_POLLS = 100
+# Seconds between stack samples of the event loop thread
+PROFILE_SAMPLE_INTERVAL = 0.005
+# Poll intervals a session may take per poll before it is written anyway,
+# for miners that are removed or stop being polled meanwhile
+PROFILE_TIMEOUT_FACTOR = 3
+
+
+@callback
+def async_get_profiler(hass: HomeAssistant) -> PollProfiler | None:
+    """Return the running profiling session, if any."""
+    return hass.data.get(DATA_PROFILER)
+
+
+class PollProfiler:
+    """Profile the event loop while polls of the selected miners run.
+
+    cProfile records every call on the event loop thread, the sampler
+    records the stack of that thread every few milliseconds and writes
+    them folded, one stack per line, as flame graph tools read them. Both
+    only record while at least one selected poll is in flight, so work of
+    other miners polled at the same time is included.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: list[MinerCoordinator],
+        polls: int,
+        mode: str = PROFILE_MODE_CPROFILE,
+    ) -> None:
+        """Initialize a session, start it with async_start."""
+        self.hass = hass
+        self.mode = mode
+        self._coordinators = coordinators
+        self._remaining = {id(coordinator): polls for coordinator in coordinators}
+        self._active = 0
+        self._profile: cProfile.Profile | None = None
+        self._stacks: Counter[str] = Counter()
+        self._sampler: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._cancel_timeout: CALLBACK_TYPE | None = None
+        self.path = hass.config.path(
+            f"miner_profile_{time.strftime('%Y%m%d_%H%M%S')}"
+            + (".prof" if mode == PROFILE_MODE_CPROFILE else ".folded")
+        )
+
+    @callback
+    def async_start(self) -> None:
+        """Attach the session to its coordinators."""
+        self.hass.data[DATA_PROFILER] = self
+        for coordinator in self._coordinators:
+            coordinator.profiler = self
+        if self.mode == PROFILE_MODE_CPROFILE:
+            self._profile = cProfile.Profile()
+        else:
+            self._sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(),),
+                name="miner_profile_sampler",
+                daemon=True,
+            )
+            self._sampler.start()
+        interval = max(
+            coordinator.poll_interval.total_seconds()
+            for coordinator in self._coordinators
+        )
+        self._cancel_timeout = async_call_later(
+            self.hass,
+            interval * PROFILE_TIMEOUT_FACTOR * max(self._remaining.values()),
+            self._async_timeout,
+        )
+        _LOGGER.info("Profiling the next polls of %s miners", len(self._coordinators))
+
+    def poll_started(self) -> None:
+        """Record from now on, called as a selected poll starts."""
+        self._active += 1
+        if self._active == 1 and self._profile is not None:
+            self._profile.enable()
+
+    def poll_finished(self, coordinator: MinerCoordinator) -> None:
+        """Stop recording when no selected poll is left in flight."""
+        self._active -= 1
+        if self._active == 0 and self._profile is not None:
+            self._profile.disable()
+        key = id(coordinator)
+        if key in self._remaining:
+            self._remaining[key] -= 1
+            if self._remaining[key] <= 0:
+                del self._remaining[key]
+                coordinator.profiler = None
+        if not self._remaining:
+            self.hass.async_create_task(self.async_finish())
+
+    async def _async_timeout(self, _now) -> None:
+        self._cancel_timeout = None
+        _LOGGER.warning(
+            "Profiled polls did not finish in time, writing the profile so far"
+        )
+        await self.async_finish()
+
+    async def async_finish(self) -> None:
+        """Detach from the coordinators and write the results."""
+        from homeassistant.components import persistent_notification
+
+        if self.hass.data.get(DATA_PROFILER) is not self:
+            return
+        del self.hass.data[DATA_PROFILER]
+        if self._cancel_timeout is not None:
+            self._cancel_timeout()
+        for coordinator in self._coordinators:
+            if coordinator.profiler is self:
+                coordinator.profiler = None
+        if self._profile is not None:
+            self._profile.disable()
+            await self.hass.async_add_executor_job(self._profile.dump_stats, self.path)
+        else:
+            self._stopped.set()
+            await self.hass.async_add_executor_job(self._write_stacks)
+        _LOGGER.info("Wrote the poll profile to %s", self.path)
+        persistent_notification.async_create(
+            self.hass,
+            f"The poll profile was written to `{self.path}`.",
+            title="Miner profile",
+            notification_id=DATA_PROFILER,
+        )
+
+    def _sample(self, thread_id: int) -> None:
+        """Count the stacks of the event loop thread, runs in its own thread."""
+        while not self._stopped.wait(PROFILE_SAMPLE_INTERVAL):
+            if not self._active:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                    f":{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def _write_stacks(self) -> None:
+        self._sampler.join()
+        with open(self.path, "w", encoding="utf-8") as file:
+            for stack, count in self._stacks.most_common():
+                file.write(f"{stack} {count}\n")
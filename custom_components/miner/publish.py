@@ -0,0 +1,69 @@
+"""Rules for how often changes of snapshot sensors are written.
+
+A change larger than the deadband of its sensor kind is written right
+away, so detail is kept when something happens. Smaller changes are
+written at most once per minimum publish interval, or never when the
+kind has no interval, which keeps jitter out of the recorder.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import NamedTuple
+
+from .const import CONF_DEADBAND
+from .const import CONF_DEADBAND_RELATIVE
+from .const import CONF_MIN_PUBLISH_INTERVAL
+from .const import CONF_PUBLISH_RULES
+from .models import BOARD_SENSORS
+from .models import MINER_SENSORS
+
+# Sensor kinds publish rules can be configured for
+PUBLISH_SENSORS = (*MINER_SENSORS, *BOARD_SENSORS)
+
+
+class PublishRule(NamedTuple):
+    """How changes of one sensor kind are written."""
+
+    # Largest change written only by the minimum publish interval
+    deadband: float = 0.0
+    # Whether the deadband is a percentage of the value last written
+    relative: bool = False
+    # Seconds between writes of changes within the deadband, 0 for never
+    min_interval: float = 0.0
+
+    def within_deadband(self, old, new) -> bool:
+        """Return whether a value moved by no more than the deadband."""
+        if old == new:
+            return True
+        if not self.deadband:
+            return False
+        try:
+            change = abs(new - old)
+            deadband = (
+                abs(old) * self.deadband / 100 if self.relative else self.deadband
+            )
+        except TypeError:
+            return False
+        return change <= deadband
+
+
+# Rules of kinds not configured on the entry, ignores chip temperature jitter
+DEFAULT_PUBLISH_RULES = {
+    "chip_temperature": PublishRule(deadband=0.1),
+    "u_max_chip_temperature": PublishRule(deadband=0.1),
+    "u_mid_chip_temperature": PublishRule(deadband=0.1),
+}
+# Writes every change
+NO_PUBLISH_RULE = PublishRule()
+
+
+def publish_rules(options: Mapping) -> dict[str, PublishRule]:
+    """Return the publish rule of each sensor kind from entry options."""
+    rules = dict(DEFAULT_PUBLISH_RULES)
+    for sensor, rule in options.get(CONF_PUBLISH_RULES, {}).items():
+        rules[sensor] = PublishRule(
+            deadband=rule.get(CONF_DEADBAND, 0.0),
+            relative=rule.get(CONF_DEADBAND_RELATIVE, False),
+            min_interval=rule.get(CONF_MIN_PUBLISH_INTERVAL, 0.0),
+        )
+    return rules
@@ -0,0 +1,239 @@
+"""Rolling averages of a miner and its boards over fixed windows.
+
+Samples go into fixed-size rings of arrays, and each window keeps the
+running count, sum and sum of squares of what it covers, so a poll
+updates every window in O(1) and reading one is O(1) too. The short
+windows run over the raw samples. The day runs over 5-minute buckets,
+so it does not need a day of raw samples.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+
+from .models import BOARD_SENSOR_INDEX
+from .models import MINER_SENSOR_INDEX
+from .models import MinerSnapshot
+
+ROLLING_5M = "5m"
+ROLLING_1H = "1h"
+ROLLING_24H = "24h"
+# Seconds covered by each window
+ROLLING_WINDOWS = {ROLLING_5M: 300, ROLLING_1H: 3600, ROLLING_24H: 86400}
+# Windows over raw samples, the others over buckets
+RAW_WINDOWS = (ROLLING_5M, ROLLING_1H)
+# Seconds per bucket of the day window
+ROLLING_BUCKET = 300
+
+# Rolling metrics of the miner and their index in MinerSnapshot.sensors
+MINER_ROLLING = {
+    "hashrate": MINER_SENSOR_INDEX["hashrate"],
+    "miner_consumption": MINER_SENSOR_INDEX["miner_consumption"],
+    "chip_temperature": MINER_SENSOR_INDEX["u_mid_chip_temperature"],
+    "efficiency": MINER_SENSOR_INDEX["efficiency"],
+}
+# Rolling metrics of each board and their index in a board of the snapshot
+BOARD_ROLLING = {
+    "board_hashrate": BOARD_SENSOR_INDEX["board_hashrate"],
+    "chip_temperature": BOARD_SENSOR_INDEX["chip_temperature"],
+}
+
+# Totals of a window: samples, samples while mining, then count, sum and
+# sum of squares of each column
+_SAMPLES = 0
+_MINING = 1
+_COLUMNS = 2
+
+
+class _Window:
+    """Running totals over the records of a ring that are recent enough."""
+
+    def __init__(self, seconds: float, columns: int) -> None:
+        self.seconds = seconds
+        # Absolute index of the oldest record still counted
+        self.tail = 0
+        self.totals = array("d", bytes(8 * (_COLUMNS + 3 * columns)))
+
+    def stats(self, column: int) -> tuple[float | None, float | None, int]:
+        """Return the mean, standard deviation and sample count of a column."""
+        offset = _COLUMNS + 3 * column
+        count = int(self.totals[offset])
+        if not count:
+            return None, None, 0
+        mean = self.totals[offset + 1] / count
+        variance = self.totals[offset + 2] / count - mean * mean
+        return mean, math.sqrt(max(variance, 0.0)), count
+
+    def uptime(self) -> float | None:
+        """Return the share of samples taken while the miner was mining."""
+        if not self.totals[_SAMPLES]:
+            return None
+        return self.totals[_MINING] / self.totals[_SAMPLES]
+
+
+class _SampleRing:
+    """Ring of raw samples, with windows over them."""
+
+    def __init__(self, capacity: int, columns: int, windows: dict) -> None:
+        self._capacity = capacity
+        self._columns = columns
+        self._times = array("d", bytes(8 * capacity))
+        self._mining = array("b", bytes(capacity))
+        # NaN for a missing value
+        self._values = array("d", bytes(8 * capacity * columns))
+        self._added = 0
+        self.windows = {
+            name: _Window(seconds, columns) for name, seconds in windows.items()
+        }
+
+    def add(self, now: float, values: list[float], mining: bool) -> None:
+        if self._added >= self._capacity:
+            oldest = self._added - self._capacity
+            for window in self.windows.values():
+                if window.tail == oldest:
+                    self._count(window, oldest, -1)
+                    window.tail += 1
+        slot = self._added % self._capacity
+        self._times[slot] = now
+        self._mining[slot] = mining
+        self._values[slot * self._columns : (slot + 1) * self._columns] = array(
+            "d", values
+        )
+        self._added += 1
+        for window in self.windows.values():
+            self._count(window, self._added - 1, 1)
+            while (
+                window.tail < self._added
+                and self._times[window.tail % self._capacity] <= now - window.seconds
+            ):
+                self._count(window, window.tail, -1)
+                window.tail += 1
+
+    def _count(self, window: _Window, index: int, sign: int) -> None:
+        """Add a sample to, or with a sign of -1 remove it from, a window."""
+        slot = index % self._capacity
+        totals = window.totals
+        totals[_SAMPLES] += sign
+        totals[_MINING] += sign * self._mining[slot]
+        offset = _COLUMNS
+        for value in self._values[slot * self._columns : (slot + 1) * self._columns]:
+            if value == value:
+                totals[offset] += sign
+                totals[offset + 1] += sign * value
+                totals[offset + 2] += sign * value * value
+            offset += 3
+
+
+class _BucketRing:
+    """Ring of buckets of summed samples, with one window over them."""
+
+    def __init__(self, seconds: float, bucket: float, columns: int) -> None:
+        self._bucket = bucket
+        self._capacity = math.ceil(seconds / bucket) + 1
+        self._width = _COLUMNS + 3 * columns
+        self._starts = array("d", bytes(8 * self._capacity))
+        self._records = array("d", bytes(8 * self._capacity * self._width))
+        self._added = 0
+        self.window = _Window(seconds, columns)
+
+    def add(self, now: float, values: list[float], mining: bool) -> None:
+        start = now - now % self._bucket
+        last = (self._added - 1) % self._capacity
+        if not self._added or self._starts[last] != start:
+            if self._added >= self._capacity:
+                oldest = self._added - self._capacity
+                if self.window.tail == oldest:
+                    self._count(oldest, -1)
+                    self.window.tail += 1
+            last = self._added % self._capacity
+            self._starts[last] = start
+            offset = last * self._width
+            self._records[offset : offset + self._width] = array(
+                "d", bytes(8 * self._width)
+            )
+            self._added += 1
+        # The open bucket is in the window, so it is summed into both
+        for totals, offset in (
+            (self._records, last * self._width),
+            (self.window.totals, 0),
+        ):
+            totals[offset + _SAMPLES] += 1
+            totals[offset + _MINING] += mining
+            offset += _COLUMNS
+            for value in values:
+                if value == value:
+                    totals[offset] += 1
+                    totals[offset + 1] += value
+                    totals[offset + 2] += value * value
+                offset += 3
+        window = self.window
+        while (
+            window.tail < self._added
+            and self._starts[window.tail % self._capacity] <= now - window.seconds
+        ):
+            self._count(window.tail, -1)
+            window.tail += 1
+
+    def _count(self, index: int, sign: int) -> None:
+        offset = (index % self._capacity) * self._width
+        totals = self.window.totals
+        for position in range(self._width):
+            totals[position] += sign * self._records[offset + position]
+
+
+class MinerRolling:
+    """Rolling windows of the metrics of a miner and of its boards."""
+
+    def __init__(self, boards: int, poll_interval: float) -> None:
+        """Initialize empty windows sized for the poll interval."""
+        self._boards = boards
+        self._columns = columns = len(MINER_ROLLING) + boards * len(BOARD_ROLLING)
+        capacity = math.ceil(ROLLING_WINDOWS[ROLLING_1H] / poll_interval) + 1
+        self._samples = _SampleRing(
+            capacity,
+            columns,
+            {name: ROLLING_WINDOWS[name] for name in RAW_WINDOWS},
+        )
+        self._day = _BucketRing(ROLLING_WINDOWS[ROLLING_24H], ROLLING_BUCKET, columns)
+        self._windows = {**self._samples.windows, ROLLING_24H: self._day.window}
+
+    def add(self, now: float, data: MinerSnapshot | None) -> None:
+        """Add a poll, None for a failed one, which counts as not mining."""
+        if data is None:
+            values = [math.nan] * self._columns
+            mining = False
+        else:
+            values = [
+                math.nan if (value := data.sensors[index]) is None else value
+                for index in MINER_ROLLING.values()
+            ]
+            for slot in range(self._boards):
+                values.extend(
+                    math.nan
+                    if (value := data.board_value(slot, index)) is None
+                    else value
+                    for index in BOARD_ROLLING.values()
+                )
+            mining = bool(data.is_mining)
+        self._samples.add(now, values, mining)
+        self._day.add(now, values, mining)
+
+    def stats(
+        self, window: str, metric: str, board: int | None = None
+    ) -> tuple[float | None, float | None, int]:
+        """Return the mean, standard deviation and samples of a metric."""
+        if board is None:
+            column = list(MINER_ROLLING).index(metric)
+        elif board < self._boards:
+            column = (
+                len(MINER_ROLLING)
+                + board * len(BOARD_ROLLING)
+                + list(BOARD_ROLLING).index(metric)
+            )
+        else:
+            return None, None, 0
+        return self._windows[window].stats(column)
+
+    def uptime(self, window: str) -> float | None:
+        """Return the share of polls in a window the miner was mining."""
+        return self._windows[window].uptime()
@@ -0,0 +1,157 @@
+"""Fleet-wide poll scheduler shared by all Miner config entries."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import ipaddress
+import itertools
+import logging
+import zlib
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+
+from .const import CONF_IP
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import MinerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+# Miners polled at the same time across the whole integration
+MAX_CONCURRENT_POLLS = 32
+# Miners polled at the same time within one /24 subnet
+MAX_CONCURRENT_POLLS_PER_SUBNET = 8
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> MinerPollScheduler:
+    """Return the poll scheduler shared by all config entries."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = MinerPollScheduler(hass)
+    return scheduler
+
+
+class MinerPollScheduler:
+    """Drive polling for every MinerCoordinator from a single timer.
+
+    Each coordinator gets a stable start phase inside its poll interval so
+    the fleet does not fire at once, and in-flight polls are capped both
+    globally and per subnet.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = MAX_CONCURRENT_POLLS,
+        max_per_subnet: int = MAX_CONCURRENT_POLLS_PER_SUBNET,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._coordinators: dict[str, MinerCoordinator] = {}
+        self._tokens: dict[str, int] = {}
+        self._queue: list[tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._global_limit = asyncio.Semaphore(max_concurrent)
+        self._max_per_subnet = max_per_subnet
+        self._subnet_limits: dict[str, asyncio.Semaphore] = {}
+
+    @callback
+    def async_add_coordinator(
+        self, coordinator: MinerCoordinator, delay: float | None = None
+    ) -> CALLBACK_TYPE:
+        """Start polling a coordinator and return a callback that stops it.
+
+        Without an explicit delay the first poll lands on a phase derived
+        from the entry id, which spreads the fleet evenly over the interval.
+        """
+        entry_id = coordinator.config_entry.entry_id
+        self._coordinators[entry_id] = coordinator
+
+        if delay is None:
+            interval = coordinator.poll_interval.total_seconds()
+            delay = (zlib.crc32(entry_id.encode()) % 1000) / 1000 * interval
+        self._schedule(entry_id, self.hass.loop.time() + delay)
+
+        @callback
+        def _remove() -> None:
+            if self._coordinators.get(entry_id) is coordinator:
+                del self._coordinators[entry_id]
+                del self._tokens[entry_id]
+            if not self._coordinators and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+                self._queue.clear()
+
+        return _remove
+
+    @callback
+    def _schedule(self, entry_id: str, when: float) -> None:
+        """Queue the next poll of an entry, replacing any pending one."""
+        token = next(self._counter)
+        self._tokens[entry_id] = token
+        heapq.heappush(self._queue, (when, token, entry_id))
+
+        if self._timer is None or when < self._timer.when():
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = self.hass.loop.call_at(when, self._async_fire)
+
+    @callback
+    def _async_fire(self) -> None:
+        """Start every poll that is due and re-arm the timer."""
+        self._timer = None
+        now = self.hass.loop.time()
+
+        while self._queue and self._queue[0][0] <= now:
+            due, token, entry_id = heapq.heappop(self._queue)
+            if self._tokens.get(entry_id) != token:
+                # Removed or rescheduled since it was queued
+                continue
+            coordinator = self._coordinators[entry_id]
+            coordinator.config_entry.async_create_background_task(
+                self.hass,
+                self._async_poll(entry_id, coordinator, due),
+                f"{DOMAIN} poll {coordinator.name}",
+            )
+
+        if self._queue:
+            self._timer = self.hass.loop.call_at(self._queue[0][0], self._async_fire)
+
+    async def _async_poll(
+        self, entry_id: str, coordinator: MinerCoordinator, due: float
+    ) -> None:
+        """Poll one coordinator within the concurrency limits."""
+        try:
+            # Subnet first, a poll waiting for its subnet holds no global slot
+            async with self._subnet_limit(coordinator), self._global_limit:
+                await coordinator.async_poll()
+        finally:
+            if self._coordinators.get(entry_id) is coordinator:
+                # Keep the original phase; skip ticks missed by a slow poll
+                interval = coordinator.poll_interval.total_seconds()
+                now = self.hass.loop.time()
+                next_due = due + interval
+                if next_due <= now:
+                    next_due += ((now - next_due) // interval + 1) * interval
+                self._schedule(entry_id, next_due)
+
+    def _subnet_limit(self, coordinator: MinerCoordinator) -> asyncio.Semaphore:
+        """Return the semaphore for the /24 subnet of a miner."""
+        host = coordinator.config_entry.data[CONF_IP]
+        try:
+            subnet = str(ipaddress.ip_network(f"{host}/24", strict=False))
+        except ValueError:
+            # Hostnames cannot be grouped, give them their own bucket
+            subnet = host
+        if (limit := self._subnet_limits.get(subnet)) is None:
+            limit = self._subnet_limits[subnet] = asyncio.Semaphore(
+                self._max_per_subnet
+            )
+        return limit
@@ -1,7 +1,10 @@
 """Support for Miner sensors."""
 from __future__ import annotations
 
+import dataclasses
 import logging
+import time
+from abc import abstractmethod
 
 from homeassistant.components.sensor import EntityCategory
 from homeassistant.components.sensor import SensorDeviceClass
@@ -9,15 +12,22 @@ from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor import SensorEntityDescription
 from homeassistant.components.sensor import SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE
 from homeassistant.const import REVOLUTIONS_PER_MINUTE
+from homeassistant.const import UnitOfInformation
 from homeassistant.const import UnitOfPower
 from homeassistant.const import UnitOfTemperature
+from homeassistant.const import UnitOfTime
+from homeassistant.core import CALLBACK_TYPE
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.helpers import entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .breaker import BREAKER_STATES
 from .const import DOMAIN
 from .const import JOULES_PER_TERA_HASH
 from .const import TERA_HASH_PER_SECOND
@@ -26,6 +36,22 @@ from .const import TERA_HASH_PER_SECOND
 from .const import WATTS_PER_TERA_HASH
 
 from .coordinator import MinerCoordinator
+from .models import BOARD_SENSOR_INDEX
+from .models import BOARD_SENSORS
+from .models import MINER_SENSOR_INDEX
+from .models import MINER_SENSORS
+from .publish import NO_PUBLISH_RULE
+from .rolling import BOARD_ROLLING
+from .rolling import MINER_ROLLING
+from .rolling import ROLLING_WINDOWS
+from .timing import METRIC_BYTES
+from .timing import METRIC_FETCH
+from .timing import METRIC_FINGERPRINT
+from .timing import METRIC_GET_DATA
+from .timing import METRIC_POST_PROCESSING
+from .timing import METRIC_RETRIES
+from .timing import METRIC_TOTAL
+from .watchdog import async_get_watchdog
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -67,6 +93,59 @@ ENTITY_DESCRIPTION_KEY_MAP: dict[str, SensorEntityDescription] = {
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
     ),
+    "connection_state": SensorEntityDescription(
+        key="Connection State",
+        device_class=SensorDeviceClass.ENUM,
+        options=BREAKER_STATES,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    "poll_time": SensorEntityDescription(
+        key="Poll Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "get_data_time": SensorEntityDescription(
+        key="Get Data Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "post_processing_time": SensorEntityDescription(
+        key="Post-processing Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "poll_bytes": SensorEntityDescription(
+        key="Poll Bytes Received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "loop_stall_time": SensorEntityDescription(
+        key="Event Loop Stall Time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    "uptime": SensorEntityDescription(
+        key="Uptime",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
     "active_preset_name": SensorEntityDescription(
         key="Active Preset Name",
         device_class=SensorDeviceClass.ENUM,
@@ -136,6 +215,25 @@ ENTITY_DESCRIPTION_KEY_MAP: dict[str, SensorEntityDescription] = {
     # EBE_20260309_END
 }
 
+def _rolling_description(sensor: str, window: str) -> SensorEntityDescription:
+    """Return the description of a rolling sensor, disabled by default."""
+    description = ENTITY_DESCRIPTION_KEY_MAP[sensor]
+    suffix = window if sensor == "uptime" else f"{window} Average"
+    return dataclasses.replace(
+        description,
+        key=f"{description.key} {suffix}",
+        entity_registry_enabled_default=False,
+    )
+
+
+# Poll timing sensors and the MinerPollStats metric they report the median of
+POLL_TIMING_SENSORS = {
+    "poll_time": METRIC_TOTAL,
+    "get_data_time": METRIC_GET_DATA,
+    "post_processing_time": METRIC_POST_PROCESSING,
+    "poll_bytes": METRIC_BYTES,
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -180,14 +278,62 @@ async def async_setup_entry(
             entity_description=description,
         )
 
-    await coordinator.async_config_entry_first_refresh()
-
     sensors = []
-    for s in coordinator.data["miner_sensors"]:
+    for s in MINER_SENSORS:
         sensors.append(_create_miner_entity(s))
-    for board in range(coordinator.miner.expected_hashboards or 3):
-        for s in ["board_temperature", "chip_temperature", "board_hashrate"]:
+    for board in range(coordinator.miner_info.get("expected_hashboards") or 3):
+        for s in BOARD_SENSORS:
             sensors.append(_create_board_entity(board, s))
+    for window in ROLLING_WINDOWS:
+        for metric in MINER_ROLLING:
+            sensors.append(
+                MinerRollingSensor(
+                    coordinator=coordinator,
+                    metric=metric,
+                    window=window,
+                    board_num=None,
+                    entity_description=_rolling_description(metric, window),
+                )
+            )
+        for board in range(coordinator.miner_info.get("expected_hashboards") or 3):
+            for metric in BOARD_ROLLING:
+                sensors.append(
+                    MinerRollingSensor(
+                        coordinator=coordinator,
+                        metric=metric,
+                        window=window,
+                        board_num=board,
+                        entity_description=_rolling_description(metric, window),
+                    )
+                )
+        sensors.append(
+            MinerUptimeSensor(
+                coordinator=coordinator,
+                window=window,
+                entity_description=_rolling_description("uptime", window),
+            )
+        )
+    sensors.append(
+        MinerConnectionSensor(
+            coordinator=coordinator,
+            entity_description=ENTITY_DESCRIPTION_KEY_MAP["connection_state"],
+        )
+    )
+    for sensor, metric in POLL_TIMING_SENSORS.items():
+        sensors.append(
+            MinerPollTimingSensor(
+                coordinator=coordinator,
+                sensor=sensor,
+                metric=metric,
+                entity_description=ENTITY_DESCRIPTION_KEY_MAP[sensor],
+            )
+        )
+    sensors.append(
+        MinerLoopStallSensor(
+            coordinator=coordinator,
+            entity_description=ENTITY_DESCRIPTION_KEY_MAP["loop_stall_time"],
+        )
+    )
 # EBE_20260309_BEGIN
 #    for fan in range(coordinator.miner.expected_fans or 4):
 #        for s in ["fan_speed"]:
@@ -196,10 +342,139 @@ async def async_setup_entry(
     async_add_entities(sensors)
 
 
-class MinerSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
-    """Defines a Miner Sensor."""
+def restored_attributes(coordinator: MinerCoordinator, **attributes) -> dict:
+    """Return state attributes, flagged while the data is restored."""
+    if coordinator.restored:
+        attributes["restored"] = True
+    return attributes
+
+
+class MinerBaseSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
+    """Base of the sensors of a miner device."""
 
     entity_description: SensorEntityDescription
+    # Board slot of a board sensor, named after it
+    _board_num: int | None = None
+
+    @property
+    def name(self) -> str | None:
+        """Return name of the entity."""
+        if self._board_num is None:
+            return f"{self.coordinator.config_entry.title} {self.entity_description.key}"
+        return f"{self.coordinator.config_entry.title} Board #{self._board_num} {self.entity_description.key}"
+
+    @property
+    def device_info(self) -> entity.DeviceInfo:
+        """Return device info."""
+        return entity.DeviceInfo(
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
+            name=f"{self.coordinator.config_entry.title}",
+        )
+
+
+class MinerSnapshotSensor(MinerBaseSensor):
+    """Base of the sensors showing a value of the snapshot.
+
+    The coordinator only notifies them when their value changed, and the
+    publish rule of the sensor kind decides when a change is written. An
+    unchanged value is written again once it was read in a new
+    FIELD_UPDATED_RESOLUTION window, so last_updated never lags further.
+    """
+
+    _sensor: str
+
+    def __init__(self, coordinator: MinerCoordinator, context) -> None:
+        """Initialize the sensor listening for changes of a snapshot key."""
+        super().__init__(coordinator=coordinator, context=context)
+        # Availability, restored flag, last_updated window and value last
+        # written, and when
+        self._written: tuple | None = None
+        self._written_at = 0.0
+        self._unsub_publish: CALLBACK_TYPE | None = None
+
+    @property
+    @abstractmethod
+    def _sensor_data(self):
+        """Return the snapshot value of the sensor."""
+
+    @property
+    @abstractmethod
+    def _field_key(self) -> str:
+        """Return the key the coordinator stamps the value's reads with."""
+
+    @property
+    def _state_flags(self) -> tuple[bool, bool, int | None]:
+        """Return the availability, restored flag and last_updated window."""
+        return (
+            self.available,
+            self.coordinator.restored,
+            self.coordinator.field_updated_window(self._field_key),
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return when the value was last read from the miner."""
+        return restored_attributes(
+            self.coordinator,
+            last_updated=self.coordinator.field_updated(self._field_key),
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._written = (*self._state_flags, self._sensor_data)
+        self._written_at = time.monotonic()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop a pending write."""
+        await super().async_will_remove_from_hass()
+        if self._unsub_publish is not None:
+            self._unsub_publish()
+            self._unsub_publish = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state as the publish rule of the sensor allows."""
+        value = self._sensor_data
+        if self._written is not None and self._state_flags == self._written[:-1]:
+            written_value = self._written[-1]
+            if value == written_value:
+                return
+            rule = self.coordinator.publish_rules.get(self._sensor, NO_PUBLISH_RULE)
+            if rule.within_deadband(written_value, value):
+                if not rule.min_interval:
+                    return
+                due = self._written_at + rule.min_interval - time.monotonic()
+                if due > 0:
+                    # Publish the latest value once the interval is over
+                    if self._unsub_publish is None:
+                        self._unsub_publish = async_call_later(
+                            self.hass, due, self._async_publish_later
+                        )
+                    return
+        self._async_publish()
+
+    @callback
+    def _async_publish_later(self, _now) -> None:
+        self._unsub_publish = None
+        if (*self._state_flags, self._sensor_data) != self._written:
+            self._async_publish()
+
+    @callback
+    def _async_publish(self) -> None:
+        if self._unsub_publish is not None:
+            self._unsub_publish()
+            self._unsub_publish = None
+        self._written = (*self._state_flags, self._sensor_data)
+        self._written_at = time.monotonic()
+        super()._handle_coordinator_update()
+
+
+class MinerSensor(MinerSnapshotSensor):
+    """Defines a Miner Sensor."""
 
     def __init__(
         self,
@@ -208,34 +483,21 @@ class MinerSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
         entity_description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-{sensor}"
+        self._index = MINER_SENSOR_INDEX[sensor]
+        super().__init__(coordinator=coordinator, context=self._index)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{sensor}"
         self._sensor = sensor
         self.entity_description = entity_description
 
     @property
     def _sensor_data(self):
         """Return sensor data."""
-        try:
-            return self.coordinator.data["miner_sensors"][self._sensor]
-        except LookupError:
-            return None
-
-    @property
-    def name(self) -> str | None:
-        """Return name of the entity."""
-        return f"{self.coordinator.config_entry.title} {self.entity_description.key}"
+        return self.coordinator.data.sensors[self._index]
 
     @property
-    def device_info(self) -> entity.DeviceInfo:
-        """Return device info."""
-        return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
-            name=f"{self.coordinator.config_entry.title}",
-        )
+    def _field_key(self) -> str:
+        """Return the key the reads of the sensor are stamped with."""
+        return self._sensor
 
     @property
     def native_value(self) -> StateType:
@@ -248,11 +510,9 @@ class MinerSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
         return self.coordinator.available
 
 
-class MinerBoardSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
+class MinerBoardSensor(MinerSnapshotSensor):
     """Defines a Miner Board Sensor."""
 
-    entity_description: SensorEntityDescription
-
     def __init__(
         self,
         coordinator: MinerCoordinator,
@@ -261,8 +521,9 @@ class MinerBoardSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
         entity_description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-{board_num}-{sensor}"
+        self._index = BOARD_SENSOR_INDEX[sensor]
+        super().__init__(coordinator=coordinator, context=(board_num, self._index))
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{board_num}-{sensor}"
         self._board_num = board_num
         self._sensor = sensor
         self.entity_description = entity_description
@@ -270,26 +531,12 @@ class MinerBoardSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
     @property
     def _sensor_data(self):
         """Return sensor data."""
-        try:
-            return self.coordinator.data["board_sensors"][self._board_num][self._sensor]
-        except LookupError:
-            return None
+        return self.coordinator.data.board_value(self._board_num, self._index)
 
     @property
-    def name(self) -> str | None:
-        """Return name of the entity."""
-        return f"{self.coordinator.config_entry.title} Board #{self._board_num} {self.entity_description.key}"
-
-    @property
-    def device_info(self) -> entity.DeviceInfo:
-        """Return device info."""
-        return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
-            name=f"{self.coordinator.config_entry.title}",
-        )
+    def _field_key(self) -> str:
+        """Return the key the reads of the sensor are stamped with."""
+        return f"{self._board_num}:{self._sensor}"
 
     @property
     def native_value(self) -> StateType:
@@ -302,11 +549,9 @@ class MinerBoardSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
         return self.coordinator.available
 
 
-class MinerFanSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
+class MinerFanSensor(MinerBaseSensor):
     """Defines a Miner Fan Sensor."""
 
-    entity_description: SensorEntityDescription
-
     def __init__(
         self,
         coordinator: MinerCoordinator,
@@ -316,7 +561,7 @@ class MinerFanSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-{fan_num}-{sensor}"
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{fan_num}-{sensor}"
         self._fan_num = fan_num
         self._sensor = sensor
         self.entity_description = entity_description
@@ -324,28 +569,14 @@ class MinerFanSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
 
     @property
     def _sensor_data(self):
-        """Return sensor data."""
-        try:
-            return self.coordinator.data["fan_sensors"][self._fan_num][self._sensor]
-        except LookupError:
-            return None
+        """Return sensor data, fans are not part of the snapshot yet."""
+        return None
 
     @property
     def name(self) -> str | None:
         """Return name of the entity."""
         return f"{self.coordinator.config_entry.title} Fan #{self._fan_num} {self.entity_description.key}"
 
-    @property
-    def device_info(self) -> entity.DeviceInfo:
-        """Return device info."""
-        return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
-            name=f"{self.coordinator.config_entry.title}",
-        )
-
     @property
     def native_value(self) -> StateType:
         """Return the state of the sensor."""
@@ -355,3 +586,216 @@ class MinerFanSensor(CoordinatorEntity[MinerCoordinator], SensorEntity):
     def available(self) -> bool:
         """Return if entity is available or not."""
         return self.coordinator.available
+
+
+class MinerRollingSensor(MinerBaseSensor):
+    """Defines a sensor for the rolling average of a miner or board metric."""
+
+    def __init__(
+        self,
+        coordinator: MinerCoordinator,
+        metric: str,
+        window: str,
+        board_num: int | None,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        scope = metric if board_num is None else f"{board_num}-{metric}"
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{scope}-{window}_average"
+        self._metric = metric
+        self._window = window
+        self._board_num = board_num
+        self.entity_description = entity_description
+
+    async def async_added_to_hass(self) -> None:
+        """Start the rolling windows of the miner."""
+        self.coordinator.async_get_rolling()
+        await super().async_added_to_hass()
+
+    @property
+    def _stats(self) -> tuple:
+        """Return the mean, standard deviation and samples of the window."""
+        if (rolling := self.coordinator.rolling) is None:
+            return None, None, 0
+        return rolling.stats(self._window, self._metric, self._board_num)
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the mean over the window."""
+        mean, _, _ = self._stats
+        return None if mean is None else round(mean, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the standard deviation and the samples in the window."""
+        _, stddev, samples = self._stats
+        return {
+            "stddev": None if stddev is None else round(stddev, 2),
+            "samples": samples,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available or not."""
+        return self.coordinator.available
+
+
+class MinerUptimeSensor(MinerBaseSensor):
+    """Defines a sensor for the share of polls a miner was mining in a window."""
+
+    def __init__(
+        self,
+        coordinator: MinerCoordinator,
+        window: str,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-uptime_{window}"
+        self._window = window
+        self.entity_description = entity_description
+
+    async def async_added_to_hass(self) -> None:
+        """Start the rolling windows of the miner."""
+        self.coordinator.async_get_rolling()
+        await super().async_added_to_hass()
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the uptime over the window in percent."""
+        if (rolling := self.coordinator.rolling) is None:
+            return None
+        uptime = rolling.uptime(self._window)
+        return None if uptime is None else round(uptime * 100, 1)
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available or not.
+
+        Stays available while the miner is offline, that is downtime.
+        """
+        return True
+
+
+class MinerConnectionSensor(MinerBaseSensor):
+    """Defines a Miner circuit breaker state sensor."""
+
+    def __init__(
+        self,
+        coordinator: MinerCoordinator,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-connection_state"
+        self.entity_description = entity_description
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.coordinator.breaker.state
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the failure count and next retry time."""
+        return self.coordinator.breaker_attributes
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available or not.
+
+        Stays available while the miner is offline to report the breaker.
+        """
+        return True
+
+
+class MinerPollTimingSensor(MinerBaseSensor):
+    """Defines a sensor for the rolling median of a poll timing metric."""
+
+    def __init__(
+        self,
+        coordinator: MinerCoordinator,
+        sensor: str,
+        metric: str,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-{sensor}"
+        self._metric = metric
+        self.entity_description = entity_description
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the median over the last polls."""
+        return self.coordinator.poll_stats.percentiles(self._metric).get("p50")
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the other percentiles and the breakdown of the metric."""
+        stats = self.coordinator.poll_stats
+        attributes = {
+            key: value
+            for key, value in stats.percentiles(self._metric).items()
+            if key != "p50"
+        }
+        if self._metric == METRIC_TOTAL:
+            attributes["polls"] = stats.polls
+            attributes["failed_polls"] = stats.failed_polls
+            attributes["retries"] = int(sum(stats.samples(METRIC_RETRIES)))
+            attributes["fingerprint_ms"] = stats.percentiles(METRIC_FINGERPRINT)
+        elif self._metric == METRIC_GET_DATA:
+            attributes["fetch_ms"] = stats.percentiles(METRIC_FETCH)
+            attributes["data_options_p50_ms"] = {
+                option: values["p50"]
+                for option, values in stats.option_percentiles().items()
+            }
+        return attributes
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available or not.
+
+        Stays available while the miner is offline to report failing polls.
+        """
+        return True
+
+
+class MinerLoopStallSensor(MinerBaseSensor):
+    """Defines a sensor for the event loop stall time blamed on a miner."""
+
+    def __init__(
+        self,
+        coordinator: MinerCoordinator,
+        entity_description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator=coordinator)
+        self._attr_unique_id = f"{self.coordinator.data.mac}-loop_stall_time"
+        self.entity_description = entity_description
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the total stall time blamed on this miner."""
+        watchdog = async_get_watchdog(self.hass)
+        return watchdog.entry_stats(self.coordinator.config_entry.entry_id)[
+            "stall_ms"
+        ]
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the stall count and the lag of the whole event loop."""
+        watchdog = async_get_watchdog(self.hass)
+        stats = watchdog.entry_stats(self.coordinator.config_entry.entry_id)
+        del stats["stall_ms"]
+        return {**stats, "loop_lag_ms": watchdog.lag_percentiles()}
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available or not.
+
+        Stays available while the miner is offline, stalls are still counted,
+        but only while the watchdog runs.
+        """
+        return async_get_watchdog(self.hass).running
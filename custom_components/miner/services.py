@@ -3,44 +3,80 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
+from datetime import timedelta
 
 from homeassistant.const import CONF_DEVICE_ID
 from homeassistant.core import HomeAssistant
 from homeassistant.core import ServiceCall
+from homeassistant.core import ServiceResponse
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.device_registry import (
     async_get as async_get_device_registry,
 )
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
+from .const import SERVICE_BOARD_HISTORY
+from .const import SERVICE_PROFILE
 from .const import SERVICE_REBOOT
 from .const import SERVICE_RESTART_BACKEND
 from .const import SERVICE_SET_WORK_MODE
-
-from pyasic.config.mining import MiningModeConfig
+from .profiling import DEFAULT_PROFILE_POLLS
+from .profiling import MAX_PROFILE_POLLS
+from .profiling import PROFILE_MODE_CPROFILE
+from .profiling import PollProfiler
+from .profiling import async_get_profiler
+from .watchdog import OPERATION_SERVICE
+from .watchdog import track_operation
 
 LOGGER = logging.getLogger(__name__)
 
+# Board history returned when the call gives no start
+DEFAULT_BOARD_HISTORY_SPAN = timedelta(hours=1)
+
 
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Service handler setup."""
+    if hass.services.has_service(DOMAIN, SERVICE_REBOOT):
+        # Already registered by another config entry
+        return
 
-    async def get_miners(call: ServiceCall):
+    def tracked(handler):
+        # Blame event loop stalls during the call on the service
+        async def run(call: ServiceCall) -> ServiceResponse:
+            with track_operation(hass, OPERATION_SERVICE, label=call.service):
+                return await handler(call)
+
+        return run
+
+    def get_coordinators(call: ServiceCall):
         hass_devices = hass.data[DOMAIN]
 
         miner_ids = call.data[CONF_DEVICE_ID]
 
         if not miner_ids:
-            return
+            return []
+        if isinstance(miner_ids, str):
+            # Single device selector
+            miner_ids = [miner_ids]
 
         registry = async_get_device_registry(hass)
 
+        return [
+            hass_devices[registry.async_get(d).primary_config_entry]
+            for d in miner_ids
+        ]
+
+    async def get_miners(call: ServiceCall):
+        coordinators = get_coordinators(call)
+        # Control actions may change config, so refresh the slow polling tiers
+        for coordinator in coordinators:
+            coordinator.async_invalidate_cached_fields()
+
         return await asyncio.gather(
-            *(
-                [
-                    hass_devices[registry.async_get(d).primary_config_entry].get_miner()
-                    for d in miner_ids
-                ]
-            )
+            *(coordinator.get_miner() for coordinator in coordinators)
         )
 
     async def reboot(call: ServiceCall) -> None:
@@ -48,14 +84,14 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if len(miners) > 0:
             await asyncio.gather(*[miner.reboot() for miner in miners])
 
-    hass.services.async_register(DOMAIN, SERVICE_REBOOT, reboot)
+    hass.services.async_register(DOMAIN, SERVICE_REBOOT, tracked(reboot))
 
     async def restart_backend(call: ServiceCall) -> None:
         miners = await get_miners(call)
         if len(miners) > 0:
             await asyncio.gather(*[miner.restart_backend() for miner in miners])
 
-    hass.services.async_register(DOMAIN, SERVICE_RESTART_BACKEND, restart_backend)
+    hass.services.async_register(DOMAIN, SERVICE_RESTART_BACKEND, tracked(restart_backend))
 
     async def set_work_mode(call: ServiceCall) -> None:
         miners = await get_miners(call)
@@ -63,6 +99,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             mode = call.data["mode"]
 
             async def set_mining_mode(miner):
+                # lazy import to keep pyasic out of the integration import
+                from pyasic.config.mining import MiningModeConfig
+
                 cfg_mode = MiningModeConfig.default()
                 if mode == "high":
                     cfg_mode = MiningModeConfig.high()
@@ -76,4 +115,77 @@ async def async_setup_services(hass: HomeAssistant) -> None:
 
             await asyncio.gather(*(set_mining_mode(miner) for miner in miners))
 
-    hass.services.async_register(DOMAIN, SERVICE_SET_WORK_MODE, set_work_mode)
+    hass.services.async_register(DOMAIN, SERVICE_SET_WORK_MODE, tracked(set_work_mode))
+
+    async def profile(call: ServiceCall) -> None:
+        if async_get_profiler(hass) is not None:
+            raise HomeAssistantError("A miner profile is already running.")
+
+        # Without devices, profile the whole fleet
+        if call.data.get(CONF_DEVICE_ID):
+            coordinators = get_coordinators(call)
+        else:
+            coordinators = list(hass.data[DOMAIN].values())
+        if not coordinators:
+            raise HomeAssistantError("No miners to profile.")
+
+        polls = int(call.data.get("polls", DEFAULT_PROFILE_POLLS))
+        polls = max(1, min(polls, MAX_PROFILE_POLLS))
+        mode = call.data.get("mode", PROFILE_MODE_CPROFILE)
+        PollProfiler(hass, coordinators, polls, mode).async_start()
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, tracked(profile))
+
+    async def board_history(call: ServiceCall) -> ServiceResponse:
+        coordinators = get_coordinators(call)
+        if len(coordinators) != 1:
+            raise HomeAssistantError("Select one miner to read the history of.")
+        coordinator = coordinators[0]
+        if coordinator.history is None:
+            raise HomeAssistantError(
+                f"Board history is not enabled for {coordinator.config_entry.title}."
+            )
+
+        end = _service_time(call.data.get("end")) or dt_util.utcnow()
+        start = (
+            _service_time(call.data.get("start")) or end - DEFAULT_BOARD_HISTORY_SPAN
+        )
+        columns = await coordinator.history.async_read(
+            start.timestamp(), end.timestamp()
+        )
+        names = list(columns)
+        return {
+            "records": [
+                {
+                    name: _record_value(name, value)
+                    for name, value in zip(names, record)
+                }
+                for record in zip(*columns.values())
+            ]
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BOARD_HISTORY,
+        tracked(board_history),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _service_time(value):
+    """Return a service datetime field as an aware datetime, None if unset."""
+    if value is None:
+        return None
+    if (parsed := dt_util.parse_datetime(str(value))) is None:
+        raise HomeAssistantError(f"Invalid time: {value}")
+    return dt_util.as_utc(parsed)
+
+
+def _record_value(name: str, value):
+    """Return a board history value as a response value."""
+    if name == "time":
+        return dt_util.utc_from_timestamp(value).isoformat()
+    if isinstance(value, float):
+        # Stored as 32 bit floats, NaN for a missing reading
+        return None if math.isnan(value) else round(value, 2)
+    return value
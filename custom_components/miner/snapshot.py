@@ -0,0 +1,50 @@
+"""Persisted last-known snapshot of a miner."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+# Seconds between snapshot writes, polls in between only update memory
+SAVE_DELAY = 60
+
+
+class MinerSnapshotStore:
+    """Store the last known data of one config entry across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot store."""
+        self._store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry_id}"
+        )
+        self._save_scheduled_at: float | None = None
+
+    async def async_load(self) -> dict | None:
+        """Return the stored snapshot, if any."""
+        return await self._store.async_load()
+
+    @callback
+    def async_schedule_save(self, data_func: Callable[[], dict]) -> None:
+        """Save the snapshot returned by data_func at most every SAVE_DELAY.
+
+        Store.async_delay_save restarts its timer on every call, which would
+        postpone the write for as long as polls keep succeeding.
+        """
+        now = time.monotonic()
+        if (
+            self._save_scheduled_at is not None
+            and now - self._save_scheduled_at < SAVE_DELAY
+        ):
+            return
+        self._save_scheduled_at = now
+        self._store.async_delay_save(data_func, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored snapshot."""
+        await self._store.async_remove()
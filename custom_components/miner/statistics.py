@@ -0,0 +1,279 @@
+"""Long-term statistics of the fleet, aggregated in memory.
+
+Each poll adds its hashrate, wattage, chip temperature and efficiency to
+5-minute buckets of the miner. A closed bucket is folded into the mean,
+min and max of its hour, and the hours changed since the last flush are
+imported as external statistics in one batch for the whole fleet. The
+recorder only takes hourly rows, so the hour being filled is imported
+again as its buckets close. That hour and the open bucket are persisted
+with the miner's snapshot, so after a restart the hour is imported with
+the samples from before it too.
+"""
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.const import UnitOfPower
+from homeassistant.const import UnitOfTemperature
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .const import JOULES_PER_TERA_HASH
+from .const import TERA_HASH_PER_SECOND
+from .models import MINER_SENSOR_INDEX
+from .models import MinerSnapshot
+
+DATA_STATISTICS = f"{DOMAIN}_statistics"
+
+# Seconds per bucket samples are aggregated in
+STATISTICS_BUCKET = 300
+# Seconds per row of the recorder's long-term statistics
+STATISTICS_HOUR = 3600
+# Interval between imports of the changed hours of the fleet
+STATISTICS_FLUSH_INTERVAL = timedelta(seconds=STATISTICS_BUCKET)
+
+# Statistic, its name, unit and index in MinerSnapshot.sensors
+STATISTICS = (
+    ("hashrate", "Hashrate", TERA_HASH_PER_SECOND, MINER_SENSOR_INDEX["hashrate"]),
+    (
+        "wattage",
+        "Miner Consumption",
+        UnitOfPower.WATT,
+        MINER_SENSOR_INDEX["miner_consumption"],
+    ),
+    (
+        "chip_temperature",
+        "Chip Temperature",
+        UnitOfTemperature.CELSIUS,
+        MINER_SENSOR_INDEX["u_mid_chip_temperature"],
+    ),
+    (
+        "efficiency",
+        "Efficiency",
+        JOULES_PER_TERA_HASH,
+        MINER_SENSOR_INDEX["efficiency"],
+    ),
+)
+
+
+@callback
+def async_get_statistics(hass: HomeAssistant) -> FleetStatistics:
+    """Return the statistics importer shared by all config entries."""
+    if (statistics := hass.data.get(DATA_STATISTICS)) is None:
+        statistics = hass.data[DATA_STATISTICS] = FleetStatistics(hass)
+    return statistics
+
+
+class MinerStatistics:
+    """5-minute buckets and the hours they fold into, for one miner."""
+
+    def __init__(self) -> None:
+        """Initialize without samples."""
+        # Start of the open bucket, and its count, sum, min and max per
+        # statistic
+        self._bucket_start: float | None = None
+        self._bucket: list[list | None] = [None] * len(STATISTICS)
+        # Hour start to count, sum, min and max per statistic
+        self._hours: dict[float, list[list | None]] = {}
+        # Hours changed since they were last imported
+        self._dirty: set[float] = set()
+        # MAC of the last sample, the statistic ids are derived from it
+        self.mac: str | None = None
+
+    def add(self, data: MinerSnapshot, now: float) -> None:
+        """Add the values of a poll, closing the bucket it does not fall in."""
+        if data.mac:
+            self.mac = data.mac
+        bucket_start = now - now % STATISTICS_BUCKET
+        if bucket_start != self._bucket_start:
+            self._close_bucket()
+            self._bucket_start = bucket_start
+        for position, (*_, index) in enumerate(STATISTICS):
+            value = data.sensors[index]
+            if value is None:
+                continue
+            if (bucket := self._bucket[position]) is None:
+                self._bucket[position] = [1, value, value, value]
+                continue
+            bucket[0] += 1
+            bucket[1] += value
+            if value < bucket[2]:
+                bucket[2] = value
+            if value > bucket[3]:
+                bucket[3] = value
+
+    def _close_bucket(self) -> None:
+        """Fold the open bucket into its hour."""
+        if self._bucket_start is None:
+            return
+        hour_start = self._bucket_start - self._bucket_start % STATISTICS_HOUR
+        hour = self._hours.setdefault(hour_start, [None] * len(STATISTICS))
+        for position, bucket in enumerate(self._bucket):
+            if bucket is None:
+                continue
+            if (total := hour[position]) is None:
+                hour[position] = bucket
+                continue
+            total[0] += bucket[0]
+            total[1] += bucket[1]
+            total[2] = min(total[2], bucket[2])
+            total[3] = max(total[3], bucket[3])
+        self._dirty.add(hour_start)
+        self._bucket_start = None
+        self._bucket = [None] * len(STATISTICS)
+
+    def as_dict(self) -> dict:
+        """Return the hours not yet dropped and the open bucket, to persist."""
+        return {
+            "hours": [[start, totals] for start, totals in self._hours.items()],
+            "bucket_start": self._bucket_start,
+            "bucket": self._bucket,
+            "mac": self.mac,
+        }
+
+    def restore(self, stored: dict) -> None:
+        """Continue from persisted hours, before the first sample is added.
+
+        Restored hours are imported again, with the samples added to them.
+        """
+        for start, totals in stored["hours"]:
+            self._hours[start] = totals
+            self._dirty.add(start)
+        self._bucket_start = stored["bucket_start"]
+        self._bucket = stored["bucket"]
+        self.mac = stored.get("mac")
+
+    def take_changed(self, now: float, final: bool = False) -> list[tuple]:
+        """Return (hour start, per statistic totals) of the changed hours.
+
+        Hours that can get no more buckets are dropped once taken, the hour
+        being filled is kept to be persisted. The open bucket is closed when
+        it has ended, or when final.
+        """
+        if self._bucket_start is not None and (
+            final or now >= self._bucket_start + STATISTICS_BUCKET
+        ):
+            self._close_bucket()
+        changed = [(start, self._hours[start]) for start in sorted(self._dirty)]
+        self._dirty.clear()
+        current_hour = now - now % STATISTICS_HOUR
+        for start in list(self._hours):
+            if start < current_hour:
+                del self._hours[start]
+        return changed
+
+
+class FleetStatistics:
+    """Import the statistics of every miner in batches."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without miners."""
+        self.hass = hass
+        self._coordinators: dict = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_coordinator(self, coordinator) -> CALLBACK_TYPE:
+        """Import the statistics of a miner, return a callback that stops it."""
+        entry_id = coordinator.config_entry.entry_id
+        self._coordinators[entry_id] = coordinator
+        if self._unsub_flush is None:
+            self._unsub_flush = async_track_time_interval(
+                self.hass,
+                self._async_flush,
+                STATISTICS_FLUSH_INTERVAL,
+                name="miner statistics",
+            )
+            self._unsub_stop = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+            )
+
+        @callback
+        def _remove() -> None:
+            if self._coordinators.get(entry_id) is coordinator:
+                del self._coordinators[entry_id]
+            self._async_import(coordinator, time.time(), final=True)
+            if not self._coordinators:
+                self._async_stop()
+
+        return _remove
+
+    @callback
+    def _async_stop(self) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+    @callback
+    def _async_on_stop(self, _event) -> None:
+        """Import the open buckets too, before the recorder stops."""
+        self._unsub_stop = None
+        self._async_flush(final=True)
+        self._async_stop()
+
+    @callback
+    def _async_flush(self, _now=None, final: bool = False) -> None:
+        """Import the hours changed since the last flush, for all miners."""
+        now = time.time()
+        for coordinator in list(self._coordinators.values()):
+            self._async_import(coordinator, now, final)
+
+    @callback
+    def _async_import(self, coordinator, now: float, final: bool = False) -> None:
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        statistics = coordinator.statistics
+        changed = statistics.take_changed(now, final)
+        if not changed:
+            return
+        # The MAC of the samples, the data falls back to defaults while the
+        # miner is unreachable
+        object_id = slugify(statistics.mac or coordinator.config_entry.entry_id)
+        for position, (statistic, name, unit, _) in enumerate(STATISTICS):
+            rows = [
+                {
+                    "start": dt_util.utc_from_timestamp(start),
+                    "mean": totals[position][1] / totals[position][0],
+                    "min": totals[position][2],
+                    "max": totals[position][3],
+                }
+                for start, totals in changed
+                if totals[position] is not None
+            ]
+            if not rows:
+                continue
+            async_add_external_statistics(
+                self.hass,
+                {
+                    **_mean_metadata(),
+                    "has_sum": False,
+                    "name": f"{coordinator.config_entry.title} {name}",
+                    "source": DOMAIN,
+                    "statistic_id": f"{DOMAIN}:{object_id}_{statistic}",
+                    "unit_of_measurement": unit,
+                },
+                rows,
+            )
+
+
+def _mean_metadata() -> dict:
+    """Return the statistic metadata declaring arithmetic means."""
+    try:
+        from homeassistant.components.recorder.models import StatisticMeanType
+    except ImportError:
+        # Home Assistant before 2025.3 only knows has_mean
+        return {"has_mean": True}
+    return {"mean_type": StatisticMeanType.ARITHMETIC}
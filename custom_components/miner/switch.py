@@ -31,8 +31,7 @@ async def async_setup_entry(
         """Create a sensor entity."""
         created.add(key)
 
-    await coordinator.async_config_entry_first_refresh()
-    if coordinator.miner.supports_shutdown:
+    if coordinator.miner_info.get("supports_shutdown"):
         async_add_entities(
             [
                 MinerActiveSwitch(
@@ -50,9 +49,10 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
         coordinator: MinerCoordinator,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator=coordinator)
-        self._attr_unique_id = f"{self.coordinator.data['mac']}-active"
-        self._attr_is_on = self.coordinator.data["is_mining"]
+        # Notified by the coordinator when is_mining changed
+        super().__init__(coordinator=coordinator, context="is_mining")
+        self._attr_unique_id = f"{self.coordinator.data.mac}-active"
+        self._attr_is_on = self.coordinator.data.is_mining
         self.updating_switch = False
         self._last_mining_mode = None
 
@@ -65,10 +65,10 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
     def device_info(self) -> entity.DeviceInfo:
         """Return device info."""
         return entity.DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["mac"])},
-            manufacturer=self.coordinator.data["make"],
-            model=self.coordinator.data["model"],
-            sw_version=self.coordinator.data["fw_ver"],
+            identifiers={(DOMAIN, self.coordinator.data.mac)},
+            manufacturer=self.coordinator.data.make,
+            model=self.coordinator.data.model,
+            sw_version=self.coordinator.data.fw_ver,
             name=f"{self.coordinator.config_entry.title}",
         )
 
@@ -91,6 +91,7 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
                 await miner.send_config(config)
             except Exception as err:
                 _LOGGER.warning(f"{self.coordinator.config_entry.title}: Could not restore config: {err}")
+        self.coordinator.async_invalidate_cached_fields()
         self.updating_switch = True
         self.async_write_ha_state()
 
@@ -102,7 +103,8 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
             raise TypeError(f"{miner}: Shutdown not supported.")
         if miner.supports_power_modes:
             try:
-                self._last_mining_mode = self.coordinator.data.get("config", {}).mining_mode if self.coordinator.data.get("config") else None
+                config = self.coordinator.miner_config
+                self._last_mining_mode = config.mining_mode if config else None
             except Exception:
                 self._last_mining_mode = None
         self._attr_is_on = False
@@ -111,12 +113,13 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
         except Exception as err:
             # VNish and some firmwares return empty response but still work
             _LOGGER.warning(f"{self.coordinator.config_entry.title}: Stop API returned error (may still work): {err}")
+        self.coordinator.async_invalidate_cached_fields()
         self.updating_switch = True
         self.async_write_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        is_mining = self.coordinator.data["is_mining"]
+        is_mining = self.coordinator.data.is_mining
         if is_mining is not None:
             if self.updating_switch:
                 if is_mining == self._attr_is_on:
@@ -128,5 +131,5 @@ class MinerActiveSwitch(CoordinatorEntity[MinerCoordinator], SwitchEntity):
 
     @property
     def available(self) -> bool:
-        """Return if entity is available or not."""
-        return self.coordinator.available
+        """Return if entity is available, controls need the fingerprinted miner."""
+        return self.coordinator.miner is not None
@@ -0,0 +1,242 @@
+"""Per-poll timing of miner polls.
+
+Bytes received count CGMiner RPC responses and web API responses as
+JSON, the Braiins OS gRPC API is not counted nor traced.
+"""
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from collections.abc import Iterable
+from contextvars import ContextVar
+from functools import wraps
+
+from .trace import MinerTrace
+
+# Polls kept per miner for the rolling percentiles, 20 minutes at 10 s
+POLL_TIMING_WINDOW = 120
+# Miners listed as slowest in the fleet summary
+FLEET_SLOWEST_COUNT = 5
+
+METRIC_TOTAL = "total"
+METRIC_FINGERPRINT = "fingerprint"
+METRIC_GET_DATA = "get_data"
+METRIC_FETCH = "fetch"
+METRIC_POST_PROCESSING = "post_processing"
+METRIC_BYTES = "bytes"
+METRIC_RETRIES = "retries"
+# Timings reported in milliseconds, the others are counts
+DURATION_METRICS = (
+    METRIC_TOTAL,
+    METRIC_FINGERPRINT,
+    METRIC_GET_DATA,
+    METRIC_FETCH,
+    METRIC_POST_PROCESSING,
+)
+
+# Set while a web multicommand is observed, its own commands are not
+_observing_web: ContextVar[bool] = ContextVar("observing_web", default=False)
+
+
+def percentiles(values: Iterable[float], scale: float = 1) -> dict:
+    """Return nearest-rank p50/p90/p99 and max of values."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+
+    def pick(fraction: float) -> float:
+        return round(ordered[round(fraction * (len(ordered) - 1))] * scale, 2)
+
+    return {
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+        "p99": pick(0.99),
+        "max": round(ordered[-1] * scale, 2),
+    }
+
+
+class PollTiming:
+    """Measurements of one poll while it runs."""
+
+    def __init__(self) -> None:
+        """Start timing a poll."""
+        self.started = time.perf_counter()
+        self.ok = False
+        self.metrics: dict[str, float] = {METRIC_RETRIES: 0, METRIC_BYTES: 0}
+        # Seconds spent in the pyasic parser of each DataOption
+        self.options: dict[str, float] = {}
+
+    def add(self, metric: str, value: float) -> None:
+        """Add to a metric of this poll."""
+        self.metrics[metric] = self.metrics.get(metric, 0) + value
+
+
+class MinerPollStats:
+    """Rolling timings of the last polls of one miner."""
+
+    def __init__(
+        self, window: int = POLL_TIMING_WINDOW, trace: MinerTrace | None = None
+    ) -> None:
+        """Initialize empty stats, raw responses and polls also go to trace."""
+        self._window = window
+        self.trace = trace
+        self._samples: dict[str, deque[float]] = {}
+        self._option_samples: dict[str, deque[float]] = {}
+        self.polls = 0
+        self.failed_polls = 0
+        self.active: PollTiming | None = None
+
+    def start_poll(self) -> PollTiming:
+        """Start timing a poll."""
+        self.active = PollTiming()
+        return self.active
+
+    def finish_poll(self, timing: PollTiming) -> None:
+        """Add a finished poll to the rolling window."""
+        if self.active is timing:
+            self.active = None
+        timing.metrics[METRIC_TOTAL] = time.perf_counter() - timing.started
+        if METRIC_GET_DATA in timing.metrics:
+            # What get_data spent outside the parsers, mostly waiting on the miner
+            timing.metrics[METRIC_FETCH] = max(
+                0.0, timing.metrics[METRIC_GET_DATA] - sum(timing.options.values())
+            )
+        self.polls += 1
+        if not timing.ok:
+            self.failed_polls += 1
+        for metric, value in timing.metrics.items():
+            self._sample(self._samples, metric, value)
+        for option, value in timing.options.items():
+            self._sample(self._option_samples, option, value)
+        if self.trace is not None:
+            self.trace.add_poll(timing)
+
+    def add_response(self, kind: str, request, response: bytes) -> None:
+        """Count a raw response of the miner."""
+        if (timing := self.active) is not None:
+            timing.add(METRIC_BYTES, len(response))
+        if self.trace is not None:
+            self.trace.add_response(kind, request, response)
+
+    def _sample(self, samples: dict, key: str, value: float) -> None:
+        if (window := samples.get(key)) is None:
+            window = samples[key] = deque(maxlen=self._window)
+        window.append(value)
+
+    def samples(self, metric: str) -> deque[float]:
+        """Return the rolling samples of a metric, in seconds for durations."""
+        return self._samples.get(metric, deque())
+
+    def percentiles(self, metric: str) -> dict:
+        """Return the percentiles of a metric, durations in milliseconds."""
+        scale = 1000 if metric in DURATION_METRICS else 1
+        return percentiles(self.samples(metric), scale)
+
+    def option_percentiles(self) -> dict:
+        """Return the parser time percentiles of each DataOption in milliseconds."""
+        return {
+            option: percentiles(samples, 1000)
+            for option, samples in sorted(self._option_samples.items())
+        }
+
+    def as_dict(self) -> dict:
+        """Return every rolling metric, for diagnostics."""
+        return {
+            "polls": self.polls,
+            "failed_polls": self.failed_polls,
+            **{metric: self.percentiles(metric) for metric in sorted(self._samples)},
+            "data_options": self.option_percentiles(),
+        }
+
+
+def fleet_summary(stats: dict[str, MinerPollStats]) -> dict:
+    """Return poll timings aggregated over miners, keyed by name."""
+    totals = [value for item in stats.values() for value in item.samples(METRIC_TOTAL)]
+    slowest = sorted(
+        (
+            (item.percentiles(METRIC_TOTAL).get("p90", 0), name)
+            for name, item in stats.items()
+        ),
+        reverse=True,
+    )[:FLEET_SLOWEST_COUNT]
+    return {
+        "miners": len(stats),
+        "polls": sum(item.polls for item in stats.values()),
+        "failed_polls": sum(item.failed_polls for item in stats.values()),
+        "total": percentiles(totals, 1000),
+        "bytes": percentiles(
+            value for item in stats.values() for value in item.samples(METRIC_BYTES)
+        ),
+        "slowest_p90_ms": {name: p90 for p90, name in slowest},
+    }
+
+
+def instrument_miner(miner, stats: MinerPollStats) -> None:
+    """Time the DataOption parsers and observe the responses of a pyasic miner.
+
+    pyasic looks the parsers and API clients up on the instance, so
+    wrapping them there observes this miner without touching the others,
+    or pyasic's global settings.
+    """
+    import pyasic  # lazy import to avoid blocking event loop
+
+    for option in pyasic.DataOptions:
+        try:
+            name = getattr(miner.data_locations, str(option)).cmd
+            parser = getattr(miner, name)
+        except AttributeError:
+            continue
+        setattr(miner, name, _timed_parser(parser, str(option), stats))
+
+    if miner.rpc is not None and hasattr(miner.rpc, "_send_bytes"):
+        miner.rpc._send_bytes = _observed_send(miner.rpc._send_bytes, stats)
+    if (web := getattr(miner, "web", None)) is not None:
+        for name in ("send_command", "multicommand"):
+            if hasattr(web, name):
+                setattr(web, name, _observed_web(getattr(web, name), stats))
+
+
+def _timed_parser(parser, option: str, stats: MinerPollStats):
+    @wraps(parser)
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await parser(*args, **kwargs)
+        finally:
+            if (timing := stats.active) is not None:
+                timing.options[option] = timing.options.get(option, 0) + (
+                    time.perf_counter() - start
+                )
+
+    return timed
+
+
+def _observed_send(send_bytes, stats: MinerPollStats):
+    @wraps(send_bytes)
+    async def observed(data: bytes, *args, **kwargs):
+        response = await send_bytes(data, *args, **kwargs)
+        stats.add_response("rpc", data, response)
+        return response
+
+    return observed
+
+
+def _observed_web(send, stats: MinerPollStats):
+    @wraps(send)
+    async def observed(*commands, **kwargs):
+        if _observing_web.get():
+            return await send(*commands, **kwargs)
+        token = _observing_web.set(True)
+        try:
+            response = await send(*commands, **kwargs)
+        finally:
+            _observing_web.reset(token)
+        stats.add_response(
+            "web",
+            " ".join(map(str, commands)).encode(),
+            json.dumps(response, default=str).encode(),
+        )
+        return response
+
+    return observed
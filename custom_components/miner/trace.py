@@ -0,0 +1,129 @@
+"""Ring buffers of the recent raw traffic, polls and errors of a miner.
+
+Polls only keep references to what they received, decoding, parsing and
+redacting happen when the diagnostics are downloaded.
+"""
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+from datetime import timezone
+
+# Raw responses kept per miner, a poll takes one to a few
+TRACE_RESPONSES = 10
+# Polls and errors kept per miner
+TRACE_POLLS = 10
+# Longer responses are cut, a full miner config can be large
+TRACE_MAX_RESPONSE_BYTES = 16384
+
+REDACTED = "**REDACTED**"
+
+
+class MinerTrace:
+    """Last raw responses, poll timings and errors of one miner."""
+
+    def __init__(
+        self,
+        responses: int = TRACE_RESPONSES,
+        polls: int = TRACE_POLLS,
+    ) -> None:
+        """Initialize empty buffers."""
+        # (time, kind, request, response)
+        self.responses: deque[tuple] = deque(maxlen=responses)
+        # (time, PollTiming)
+        self.polls: deque[tuple] = deque(maxlen=polls)
+        # (time, error type, message)
+        self.errors: deque[tuple] = deque(maxlen=polls)
+
+    def add_response(self, kind: str, request, response: bytes) -> None:
+        """Keep a raw response, request is bytes or (method, raw path, body)."""
+        if len(response) > TRACE_MAX_RESPONSE_BYTES:
+            response = response[:TRACE_MAX_RESPONSE_BYTES]
+        self.responses.append((time.time(), kind, request, response))
+
+    def add_poll(self, timing) -> None:
+        """Keep the timing of a finished poll."""
+        self.polls.append((time.time(), timing))
+
+    def add_error(self, err: Exception | str) -> None:
+        """Keep an error of a poll."""
+        if isinstance(err, str):
+            self.errors.append((time.time(), None, err))
+        else:
+            self.errors.append((time.time(), type(err).__name__, str(err)))
+
+    def as_dict(self, secrets: Iterable[str] = ()) -> dict:
+        """Return the buffers formatted for diagnostics.
+
+        The configured secrets are replaced in requests, secret keys of JSON
+        bodies are left for the caller to redact.
+        """
+        secrets = [secret for secret in secrets if secret]
+        return {
+            "responses": [
+                {
+                    "time": _isoformat(at),
+                    "kind": kind,
+                    "request": _format_request(request, secrets),
+                    "response": _decode(response),
+                    "response_bytes": len(response),
+                }
+                for at, kind, request, response in self.responses
+            ],
+            "polls": [
+                {
+                    "time": _isoformat(at),
+                    "ok": timing.ok,
+                    "ms": {
+                        metric: round(value * 1000, 2)
+                        for metric, value in timing.metrics.items()
+                        if isinstance(value, float)
+                    },
+                    "counts": {
+                        metric: value
+                        for metric, value in timing.metrics.items()
+                        if not isinstance(value, float)
+                    },
+                    "data_options_ms": {
+                        option: round(value * 1000, 2)
+                        for option, value in sorted(timing.options.items())
+                    },
+                }
+                for at, timing in self.polls
+            ],
+            "errors": [
+                {"time": _isoformat(at), "type": kind, "message": message}
+                for at, kind, message in self.errors
+            ],
+        }
+
+
+def _isoformat(at: float) -> str:
+    return datetime.fromtimestamp(at, timezone.utc).isoformat()
+
+
+def _format_request(request, secrets: list[str]):
+    if isinstance(request, tuple):
+        method, path, body = request
+        return {
+            "method": method,
+            "path": path.decode("utf-8", errors="replace"),
+            "body": _decode(body, secrets),
+        }
+    return _decode(request, secrets)
+
+
+def _decode(raw: bytes, secrets: list[str] = ()):
+    """Return raw bytes as JSON when they parse, else as text."""
+    if not raw:
+        return None
+    text = raw.decode("utf-8", errors="replace").rstrip("\x00")
+    for secret in secrets:
+        text = text.replace(secret, REDACTED)
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
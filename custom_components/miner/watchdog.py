@@ -0,0 +1,284 @@
+"""Event loop lag watchdog that blames stalls on miner operations."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextvars import ContextVar
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .timing import percentiles
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_WATCHDOG = f"{DOMAIN}_watchdog"
+
+OPERATION_POLL = "poll"
+OPERATION_FINGERPRINT = "fingerprint"
+OPERATION_CONFIG_FLOW = "config_flow"
+OPERATION_SERVICE = "service"
+
+# Seconds between heartbeats of the loop timer
+LAG_TIMER_INTERVAL = 0.05
+# Seconds the watchdog thread waits between looks at the heartbeat
+WATCHDOG_CHECK_INTERVAL = 0.02
+# A heartbeat this late in seconds is a stall
+STALL_THRESHOLD = 0.1
+# Lag samples kept, a minute of heartbeats
+LAG_WINDOW = 1200
+# Stalls kept for diagnostics
+STALL_HISTORY = 50
+# Innermost frames kept as evidence of a stall
+STALL_FRAMES = 6
+
+# Innermost operation of the running code, inherited by the tasks it starts
+_current_operation: ContextVar[TrackedOperation | None] = ContextVar(
+    "miner_operation", default=None
+)
+
+
+@callback
+def async_get_watchdog(hass: HomeAssistant) -> LoopWatchdog:
+    """Return the watchdog shared by all config entries."""
+    if (watchdog := hass.data.get(DATA_WATCHDOG)) is None:
+        watchdog = hass.data[DATA_WATCHDOG] = LoopWatchdog(hass)
+    return watchdog
+
+
+def track_operation(
+    hass: HomeAssistant, kind: str, entry_id: str | None = None, label: str = ""
+) -> contextlib.AbstractContextManager[TrackedOperation | None]:
+    """Blame stalls on an operation while the block runs.
+
+    The block gets the operation, or None while the watchdog is stopped.
+    """
+    if (watchdog := hass.data.get(DATA_WATCHDOG)) is None or not watchdog.running:
+        return contextlib.nullcontext()
+    return watchdog.track(kind, entry_id, label)
+
+
+class TrackedOperation:
+    """An operation stalls are blamed on, and the task that runs it."""
+
+    __slots__ = ("kind", "entry_id", "label", "task")
+
+    def __init__(
+        self, kind: str, entry_id: str | None, label: str, task: asyncio.Task | None
+    ) -> None:
+        """Initialize the operation."""
+        self.kind = kind
+        self.entry_id = entry_id
+        self.label = label
+        self.task = task
+
+
+class LoopWatchdog:
+    """Measure event loop lag and attribute stalls to the running operation.
+
+    A timer on the loop records how late each heartbeat fires. A thread
+    notices when a heartbeat is overdue, while the loop is still stalled,
+    and blames the innermost operation of the task holding the loop. Tasks
+    an operation started, like the concurrent fetches of pyasic, inherit it
+    through their context. Both only run while an entry enables the
+    watchdog in its options.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize a stopped watchdog."""
+        self.hass = hass
+        self.lag: deque[float] = deque(maxlen=LAG_WINDOW)
+        # (time, lag, kind, entry id, label, frames)
+        self.stalls: deque[tuple] = deque(maxlen=STALL_HISTORY)
+        # Stall count and seconds per entry id
+        self.entry_stalls: dict[str, list] = {}
+        self._entries: set[str] = set()
+        # Operations in progress, innermost last
+        self._operations: list[TrackedOperation] = []
+        self._expected = 0.0
+        self._captured: tuple | None = None
+        self._timer = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @property
+    def running(self) -> bool:
+        """Return whether the watchdog is measuring."""
+        return self._timer is not None
+
+    @callback
+    def async_add_entry(self, entry_id: str) -> CALLBACK_TYPE:
+        """Run while an entry is loaded, return a callback that removes it."""
+        self._entries.add(entry_id)
+        if not self.running:
+            self._async_start()
+
+        @callback
+        def _remove() -> None:
+            self._entries.discard(entry_id)
+            self.entry_stalls.pop(entry_id, None)
+            if not self._entries:
+                self._async_stop()
+
+        return _remove
+
+    @callback
+    def _async_start(self) -> None:
+        # A fresh event, a watcher still winding down never sees it cleared
+        self._stopped = threading.Event()
+        self._expected = time.monotonic() + LAG_TIMER_INTERVAL
+        self._timer = self.hass.loop.call_later(LAG_TIMER_INTERVAL, self._beat)
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(threading.get_ident(), self._stopped),
+            name="miner_loop_watchdog",
+            daemon=True,
+        )
+        self._thread.start()
+        self._unsub_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+        )
+
+    @callback
+    def _async_on_stop(self, _event) -> None:
+        self._unsub_stop = None
+        self._async_stop()
+
+    @callback
+    def _async_stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._stopped.set()
+        if self._thread is not None:
+            # The watcher wakes on the event, this only waits out a capture
+            self._thread.join(WATCHDOG_CHECK_INTERVAL)
+            self._thread = None
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+    @contextlib.contextmanager
+    def track(
+        self, kind: str, entry_id: str | None, label: str
+    ) -> Iterator[TrackedOperation]:
+        """Blame stalls on an operation while the block runs."""
+        operation = TrackedOperation(kind, entry_id, label, asyncio.current_task())
+        token = _current_operation.set(operation)
+        self._operations.append(operation)
+        try:
+            yield operation
+        finally:
+            self._operations.remove(operation)
+            _current_operation.reset(token)
+
+    def _beat(self) -> None:
+        """Record the lag of this heartbeat, runs on the loop."""
+        now = time.monotonic()
+        lag = max(0.0, now - self._expected)
+        self.lag.append(lag)
+        if lag >= STALL_THRESHOLD:
+            self._record_stall(lag, self._captured)
+        self._captured = None
+        self._expected = now + LAG_TIMER_INTERVAL
+        self._timer = self.hass.loop.call_later(LAG_TIMER_INTERVAL, self._beat)
+
+    def _record_stall(self, lag: float, captured: tuple | None) -> None:
+        kind, entry_id, label, frames = captured or (None, None, "", ())
+        self.stalls.append((time.time(), lag, kind, entry_id, label, frames))
+        if entry_id is not None:
+            stats = self.entry_stalls.setdefault(entry_id, [0, 0.0, None])
+            stats[0] += 1
+            stats[1] += lag
+            stats[2] = kind
+        _LOGGER.debug(
+            "Event loop stalled for %.0f ms in %s %s", lag * 1000, kind, label
+        )
+
+    def _watch(self, thread_id: int, stopped: threading.Event) -> None:
+        """Catch the loop thread in the act of a stall, runs in its own thread."""
+        loop = self.hass.loop
+        while not stopped.wait(WATCHDOG_CHECK_INTERVAL):
+            if (
+                self._captured is None
+                and time.monotonic() - self._expected >= STALL_THRESHOLD
+            ):
+                self._captured = self._capture(
+                    sys._current_frames().get(thread_id),
+                    asyncio.current_task(loop),
+                )
+
+    def _capture(self, frame, running: asyncio.Task | None) -> tuple:
+        frames = []
+        while frame is not None and len(frames) < STALL_FRAMES:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                f":{frame.f_lineno})"
+            )
+            frame = frame.f_back
+        operation = self._operation_of(running)
+        if operation is None:
+            return None, None, "", tuple(frames)
+        return operation.kind, operation.entry_id, operation.label, tuple(frames)
+
+    def _operation_of(self, task: asyncio.Task | None) -> TrackedOperation | None:
+        """Return the innermost operation a task runs in."""
+        if task is None:
+            return None
+        if (get_context := getattr(task, "get_context", None)) is not None:
+            # Python 3.12, also finds the operation of the task's parent
+            return get_context().get(_current_operation)
+        return next(
+            (
+                operation
+                for operation in reversed(list(self._operations))
+                if operation.task is task
+            ),
+            None,
+        )
+
+    def entry_stats(self, entry_id: str) -> dict:
+        """Return the stalls blamed on an entry."""
+        count, seconds, kind = self.entry_stalls.get(entry_id, (0, 0.0, None))
+        return {
+            "stalls": count,
+            "stall_ms": round(seconds * 1000, 1),
+            "last_operation": kind,
+        }
+
+    def lag_percentiles(self) -> dict:
+        """Return the percentiles of the last minute of lag in milliseconds."""
+        return percentiles(self.lag, 1000)
+
+    def as_dict(self) -> dict:
+        """Return lag percentiles and recent stalls, for diagnostics."""
+        return {
+            "running": self.running,
+            "lag_ms": self.lag_percentiles(),
+            "stall_threshold_ms": STALL_THRESHOLD * 1000,
+            "stalls": [
+                {
+                    "time": dt_util.utc_from_timestamp(at).isoformat(),
+                    "lag_ms": round(lag * 1000, 1),
+                    "operation": kind,
+                    "entry_id": entry_id,
+                    "label": label,
+                    "frames": list(frames),
+                }
+                for at, lag, kind, entry_id, label, frames in self.stalls
+            ],
+        }
+
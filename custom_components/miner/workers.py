@@ -0,0 +1,296 @@
+"""Poll miners in worker processes, for fleets too large for one event loop.
+
+Each worker process runs its own event loop with pyasic and fetches,
+parses and derives the data of the miners routed to it. Coordinators keep
+fingerprinting and controlling their miner in Home Assistant, a poll sends
+the miner class and firmware version, credentials, due data options and
+the coordinator's slow field cache over a pipe and gets the derived
+snapshot back, plus the slow fields fetched on that poll. Workers keep no
+field cache of their own, so a restarted worker polls like the old one.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import zlib
+from collections.abc import Mapping
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+
+from .const import CONF_RPC_PASSWORD
+from .const import CONF_WEB_PASSWORD
+from .const import CONF_WEB_USERNAME
+from .const import DOMAIN
+from .coordinator import apply_credentials
+from .coordinator import build_data
+from .models import MinerSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_WORKER_POOL = f"{DOMAIN}_worker_pool"
+
+# Config entries from which polls move to worker processes
+POLL_WORKER_FLEET_SIZE = 1000
+# Worker processes, leaving a core to Home Assistant
+POLL_WORKER_PROCESSES = max(1, min(4, (os.cpu_count() or 2) - 1))
+# Seconds a poll may take in a worker before it is given up
+POLL_WORKER_TIMEOUT = 60
+# Seconds a worker gets to exit on shutdown before it is terminated
+POLL_WORKER_SHUTDOWN_TIMEOUT = 5
+
+# Entry data a worker needs to poll, SSH is only used by control actions
+POLL_CREDENTIALS = (CONF_RPC_PASSWORD, CONF_WEB_USERNAME, CONF_WEB_PASSWORD)
+
+
+class PollWorkerError(Exception):
+    """A poll failed in, or could not reach, a worker process."""
+
+
+@callback
+def use_poll_workers(hass: HomeAssistant) -> bool:
+    """Return whether the fleet is large enough to poll in worker processes."""
+    return len(hass.config_entries.async_entries(DOMAIN)) >= POLL_WORKER_FLEET_SIZE
+
+
+@callback
+def async_get_worker_pool(hass: HomeAssistant) -> MinerWorkerPool:
+    """Return the worker pool shared by all config entries."""
+    if (pool := hass.data.get(DATA_WORKER_POOL)) is None:
+        pool = hass.data[DATA_WORKER_POOL] = MinerWorkerPool(hass)
+
+        async def _shutdown(_event) -> None:
+            hass.data.pop(DATA_WORKER_POOL, None)
+            await pool.async_shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _shutdown)
+    return pool
+
+
+class MinerWorkerPool:
+    """Worker processes polling miners, each miner sticks to one worker.
+
+    Workers start on their first poll and again after they died.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, processes: int = POLL_WORKER_PROCESSES
+    ) -> None:
+        """Initialize a pool without started workers."""
+        self.hass = hass
+        self._workers: list[_WorkerProcess | None] = [None] * processes
+        self._locks = [asyncio.Lock() for _ in range(processes)]
+
+    async def async_get_data(
+        self,
+        miner,
+        credentials: Mapping,
+        data_options: list,
+        field_cache: dict,
+        fw_ver: str | None = None,
+    ) -> tuple[MinerSnapshot, dict, float]:
+        """Poll a miner in its worker, return what build_data returns.
+
+        fw_ver is passed as the version pyasic creates the miner class with.
+        """
+        ip = str(miner.ip)
+        worker = await self._async_worker(zlib.crc32(ip.encode()) % len(self._workers))
+        async with asyncio.timeout(POLL_WORKER_TIMEOUT):
+            return await worker.async_request(
+                ip,
+                type(miner).__name__,
+                fw_ver,
+                {
+                    key: credentials[key]
+                    for key in POLL_CREDENTIALS
+                    if key in credentials
+                },
+                [str(option) for option in data_options],
+                field_cache,
+            )
+
+    async def _async_worker(self, index: int) -> _WorkerProcess:
+        async with self._locks[index]:
+            worker = self._workers[index]
+            if worker is None or not worker.alive:
+                if worker is not None:
+                    _LOGGER.warning("Poll worker %s exited, starting it again", index)
+                worker = await self.hass.async_add_executor_job(_WorkerProcess)
+                worker.attach(self.hass.loop)
+                self._workers[index] = worker
+            return worker
+
+    async def async_shutdown(self) -> None:
+        """Stop the worker processes."""
+        workers = [worker for worker in self._workers if worker is not None]
+        self._workers = [None] * len(self._workers)
+        for worker in workers:
+            worker.detach()
+        await self.hass.async_add_executor_job(
+            _join, [worker.process for worker in workers]
+        )
+
+
+class _WorkerProcess:
+    """Parent side of one worker process."""
+
+    def __init__(self) -> None:
+        """Start the process, blocks so runs in the executor."""
+        context = multiprocessing.get_context("spawn")
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child,), name="miner_poll_worker", daemon=True
+        )
+        self.process.start()
+        child.close()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._request_ids = itertools.count()
+        # request id to the future of its reply
+        self._pending: dict[int, asyncio.Future] = {}
+
+    @property
+    def alive(self) -> bool:
+        """Return whether the worker still takes polls."""
+        return not self.conn.closed and self.process.is_alive()
+
+    @callback
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Read replies on the event loop."""
+        self._loop = loop
+        loop.add_reader(self.conn.fileno(), self._on_readable)
+
+    @callback
+    def detach(self) -> None:
+        """Stop reading and close the pipe, the worker exits when it notices."""
+        if self.conn.closed:
+            return
+        self._loop.remove_reader(self.conn.fileno())
+        self.conn.close()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(PollWorkerError("Poll worker exited"))
+
+    async def async_request(self, *request) -> tuple[MinerSnapshot, dict, float]:
+        """Send a poll to the worker and wait for its result."""
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        try:
+            self.conn.send((request_id, *request))
+            ok, result = await future
+        except OSError as err:
+            raise PollWorkerError(f"Poll worker unreachable: {err}") from err
+        finally:
+            del self._pending[request_id]
+        if not ok:
+            raise PollWorkerError(result)
+        return result
+
+    def _on_readable(self) -> None:
+        try:
+            request_id, ok, result = self.conn.recv()
+        except (EOFError, OSError):
+            self.detach()
+            return
+        if (future := self._pending.get(request_id)) is not None and not future.done():
+            future.set_result((ok, result))
+
+
+def _join(processes: list) -> None:
+    for process in processes:
+        process.join(POLL_WORKER_SHUTDOWN_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+
+
+def _worker_main(conn) -> None:
+    """Serve polls until the pipe closes, runs in a worker process."""
+    # Home Assistant stops the workers, not a Ctrl-C to the process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_async_serve(conn))
+
+
+async def _async_serve(conn) -> None:
+    loop = asyncio.get_running_loop()
+    # ip to (miner class name, firmware version, miner)
+    miners: dict[str, tuple] = {}
+    tasks: set[asyncio.Task] = set()
+    closed = loop.create_future()
+
+    def on_readable() -> None:
+        try:
+            request_id, *request = conn.recv()
+        except (EOFError, OSError):
+            loop.remove_reader(conn.fileno())
+            if not closed.done():
+                closed.set_result(None)
+            return
+        task = loop.create_task(_async_serve_poll(conn, miners, request_id, *request))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    loop.add_reader(conn.fileno(), on_readable)
+    await closed
+
+
+async def _async_serve_poll(conn, miners: dict, request_id: int, *request) -> None:
+    try:
+        reply = (request_id, True, await _async_poll(miners, *request))
+    except Exception as err:
+        reply = (request_id, False, f"{type(err).__name__}: {err}")
+    # Home Assistant going away is noticed by the reader
+    with contextlib.suppress(OSError):
+        conn.send(reply)
+
+
+async def _async_poll(
+    miners: dict,
+    ip: str,
+    miner_class: str,
+    version: str | None,
+    credentials: dict,
+    data_options: list[str],
+    field_cache: dict,
+) -> tuple[MinerSnapshot, dict, float]:
+    import pyasic
+
+    entry = miners.get(ip)
+    if entry is None or entry[:2] != (miner_class, version):
+        miner = await _async_make_miner(ip, miner_class, version)
+        entry = miners[ip] = (miner_class, version, miner)
+    miner = entry[2]
+    apply_credentials(miner, credentials)
+
+    options = [pyasic.DataOptions(option) for option in data_options]
+    miner_data = await miner.get_data(include=options)
+    return build_data(miner.ip, options, field_cache, miner_data)
+
+
+async def _async_make_miner(ip: str, miner_class: str, version: str | None):
+    """Create the miner Home Assistant fingerprinted, without a handshake."""
+    import pyasic
+
+    if (cls := _miner_classes().get(miner_class)) is not None:
+        return cls(ip, version)
+    if (miner := await pyasic.get_miner(ip)) is None:
+        raise ConnectionError(f"No miner found at {ip}")
+    return miner
+
+
+@functools.cache
+def _miner_classes() -> dict[str, type]:
+    """Return the pyasic miner classes by name."""
+    from pyasic.miners.factory import MINER_CLASSES
+
+    return {
+        cls.__name__: cls
+        for classes in MINER_CLASSES.values()
+        for cls in classes.values()
+    }
@@ -0,0 +1,49 @@
+"""Fixtures for the Miner tests."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.miner.models import BOARD_SENSOR_INDEX
+from custom_components.miner.models import MINER_SENSOR_INDEX
+from custom_components.miner.models import MINER_SENSORS
+from custom_components.miner.models import MinerSnapshot
+
+
+def make_snapshot(
+    is_mining: bool = True, boards: tuple = (), **sensors
+) -> MinerSnapshot:
+    """Return a snapshot with the given miner sensors and board values."""
+    values = [None] * len(MINER_SENSORS)
+    for sensor, value in sensors.items():
+        values[MINER_SENSOR_INDEX[sensor]] = value
+    return MinerSnapshot(
+        hostname="miner",
+        mac="02:00:00:00:00:01",
+        make="AntMiner",
+        model="S19",
+        ip="10.0.0.1",
+        is_mining=is_mining,
+        fw_ver="1.0",
+        sensors=tuple(values),
+        boards=boards,
+    )
+
+
+def make_board(**sensors) -> tuple:
+    """Return the values of a board in BOARD_SENSORS order."""
+    values = [None] * len(BOARD_SENSOR_INDEX)
+    for sensor, value in sensors.items():
+        values[BOARD_SENSOR_INDEX[sensor]] = value
+    return tuple(values)
+
+
+@pytest.fixture
+def monotonic(monkeypatch):
+    """Return a settable clock patched in for time.monotonic."""
+
+    class Clock:
+        now = 1000.0
+
+    clock = Clock()
+    monkeypatch.setattr("time.monotonic", lambda: clock.now)
+    return clock
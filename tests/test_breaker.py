@@ -0,0 +1,101 @@
+"""Tests for the poll circuit breaker."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.miner import breaker
+from custom_components.miner.breaker import BACKOFF_BASE
+from custom_components.miner.breaker import BACKOFF_JITTER
+from custom_components.miner.breaker import BACKOFF_MAX
+from custom_components.miner.breaker import FAILURE_THRESHOLD
+from custom_components.miner.breaker import STATE_CLOSED
+from custom_components.miner.breaker import STATE_HALF_OPEN
+from custom_components.miner.breaker import STATE_OPEN
+from custom_components.miner.breaker import MinerCircuitBreaker
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    """Make the backoff exact."""
+    monkeypatch.setattr(breaker.random, "uniform", lambda low, high: 1.0)
+
+
+def test_stays_closed_below_threshold(monotonic) -> None:
+    """Failures below the threshold keep polling."""
+    circuit = MinerCircuitBreaker()
+    for failures in range(1, FAILURE_THRESHOLD):
+        circuit.record_failure(failures)
+        assert circuit.state == STATE_CLOSED
+        assert circuit.allow_request()
+    assert circuit.next_retry is None
+
+
+def test_opens_at_threshold_until_backoff(monotonic) -> None:
+    """The breaker rejects polls until the backoff expired, then half-opens."""
+    circuit = MinerCircuitBreaker()
+    circuit.record_failure(FAILURE_THRESHOLD)
+    assert circuit.state == STATE_OPEN
+    assert circuit.next_retry is not None
+    assert not circuit.allow_request()
+
+    monotonic.now += BACKOFF_BASE - 0.1
+    assert not circuit.allow_request()
+    monotonic.now += 0.1
+    assert circuit.allow_request()
+    assert circuit.state == STATE_HALF_OPEN
+
+
+def test_half_open_failure_backs_off_longer(monotonic) -> None:
+    """A failed half-open poll opens the breaker with a doubled backoff."""
+    circuit = MinerCircuitBreaker()
+    circuit.record_failure(FAILURE_THRESHOLD)
+    monotonic.now += BACKOFF_BASE
+    assert circuit.allow_request()
+
+    circuit.record_failure(FAILURE_THRESHOLD + 1)
+    assert circuit.state == STATE_OPEN
+    monotonic.now += 2 * BACKOFF_BASE - 0.1
+    assert not circuit.allow_request()
+    monotonic.now += 0.1
+    assert circuit.allow_request()
+
+
+def test_success_closes(monotonic) -> None:
+    """A successful poll closes the breaker and clears the retry."""
+    circuit = MinerCircuitBreaker()
+    circuit.record_failure(FAILURE_THRESHOLD)
+    monotonic.now += BACKOFF_BASE
+    assert circuit.allow_request()
+
+    circuit.record_success()
+    assert circuit.state == STATE_CLOSED
+    assert circuit.next_retry is None
+    assert circuit.allow_request()
+
+
+def test_backoff_is_capped(monotonic) -> None:
+    """The backoff stops growing at BACKOFF_MAX."""
+    circuit = MinerCircuitBreaker()
+    circuit.record_failure(FAILURE_THRESHOLD + 20)
+    monotonic.now += BACKOFF_MAX - 0.1
+    assert not circuit.allow_request()
+    monotonic.now += 0.1
+    assert circuit.allow_request()
+
+
+def test_backoff_is_jittered(monkeypatch, monotonic) -> None:
+    """The backoff is spread by up to BACKOFF_JITTER either way."""
+    spreads = []
+
+    def uniform(low: float, high: float) -> float:
+        spreads.append((low, high))
+        return high
+
+    monkeypatch.setattr(breaker.random, "uniform", uniform)
+    circuit = MinerCircuitBreaker()
+    circuit.record_failure(FAILURE_THRESHOLD)
+    assert spreads == [(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)]
+    monotonic.now += BACKOFF_BASE
+    assert not circuit.allow_request()
+    monotonic.now += BACKOFF_BASE * BACKOFF_JITTER
+    assert circuit.allow_request()
@@ -0,0 +1,48 @@
+"""Tests for the capability cache of data options."""
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from custom_components.miner.capabilities import UNSUPPORTED_AFTER_FAILURES
+from custom_components.miner.capabilities import MinerCapabilityCache
+
+KEY = "AntMiner|S19|1.0"
+
+
+def make_cache() -> MinerCapabilityCache:
+    """Return a cache without storage."""
+    cache = MinerCapabilityCache(MagicMock())
+    cache._store = MagicMock()
+    cache.loaded = True
+    return cache
+
+
+def test_unsupported_after_consecutive_failures() -> None:
+    """An option is left out only once it failed repeatedly."""
+    cache = make_cache()
+    for _ in range(UNSUPPORTED_AFTER_FAILURES - 1):
+        cache.async_record_failure(KEY, "config")
+        assert cache.unsupported(KEY) == set()
+    cache.async_record_failure(KEY, "config")
+    assert cache.unsupported(KEY) == {"config"}
+    cache._store.async_delay_save.assert_called_once()
+
+
+def test_success_resets_failures() -> None:
+    """A successful fetch starts the count of failures over."""
+    cache = make_cache()
+    for _ in range(UNSUPPORTED_AFTER_FAILURES - 1):
+        cache.async_record_failure(KEY, "config")
+    cache.async_mark_supported(KEY, ["config"])
+    cache.async_record_failure(KEY, "config")
+    assert cache.unsupported(KEY) == set()
+
+
+def test_migrate_keeps_failures() -> None:
+    """Failures counted before the firmware was known carry over."""
+    cache = make_cache()
+    for _ in range(UNSUPPORTED_AFTER_FAILURES - 1):
+        cache.async_record_failure("AntMiner|S19", "config")
+    cache.async_migrate("AntMiner|S19", KEY)
+    cache.async_record_failure(KEY, "config")
+    assert cache.unsupported(KEY) == {"config"}
@@ -0,0 +1,51 @@
+"""Tests for deriving the published data of a poll."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from custom_components.miner.coordinator import build_data
+from custom_components.miner.models import MINER_SENSOR_INDEX
+
+
+def make_miner_data(hashboards: list, **fields) -> SimpleNamespace:
+    """Return the MinerData fields build_data reads."""
+    data = {
+        "hostname": "miner",
+        "mac": "02:00:00:00:00:01",
+        "make": "AntMiner",
+        "model": "S19",
+        "fw_ver": "1.0",
+        "raw_hashrate": 100.0,
+        "hashrate": 100.0,
+        "expected_hashrate": 104.0,
+        "wattage": 3000,
+        "wattage_limit": 3250,
+        "temperature_avg": 60,
+        "config": None,
+        "hashboards": hashboards,
+    }
+    data.update(fields)
+    return SimpleNamespace(**data)
+
+
+def board(slot: int, chip_temp, hashrate: float = 33.0) -> SimpleNamespace:
+    """Return the HashBoard fields build_data reads."""
+    return SimpleNamespace(slot=slot, temp=55, chip_temp=chip_temp, hashrate=hashrate)
+
+
+def test_summary_hashrate() -> None:
+    """Hashrate and efficiency come from the summary, not the board sum."""
+    miner_data = make_miner_data([board(0, 70), board(1, 72)], hashrate=66.0)
+    data, _, _ = build_data("10.0.0.1", [], {}, miner_data)
+    assert data.sensors[MINER_SENSOR_INDEX["hashrate"]] == 100.0
+    assert data.sensors[MINER_SENSOR_INDEX["efficiency"]] == 30.0
+    assert data.sensors[MINER_SENSOR_INDEX["u_mid_chip_temperature"]] == 71.0
+    assert data.sensors[MINER_SENSOR_INDEX["u_max_chip_temperature"]] == 72
+
+
+def test_without_boards() -> None:
+    """No boards, or boards without chip temperatures, leave no mean."""
+    for hashboards in ([], [board(0, None)]):
+        data, _, _ = build_data("10.0.0.1", [], {}, make_miner_data(hashboards))
+        assert data.sensors[MINER_SENSOR_INDEX["u_mid_chip_temperature"]] is None
+        assert data.sensors[MINER_SENSOR_INDEX["hashrate"]] == 100.0
@@ -0,0 +1,63 @@
+"""Tests for the publish rules of snapshot sensors."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.miner.const import CONF_DEADBAND
+from custom_components.miner.const import CONF_DEADBAND_RELATIVE
+from custom_components.miner.const import CONF_MIN_PUBLISH_INTERVAL
+from custom_components.miner.const import CONF_PUBLISH_RULES
+from custom_components.miner.publish import DEFAULT_PUBLISH_RULES
+from custom_components.miner.publish import NO_PUBLISH_RULE
+from custom_components.miner.publish import PublishRule
+from custom_components.miner.publish import publish_rules
+
+
+@pytest.mark.parametrize(
+    ("rule", "old", "new", "within"),
+    [
+        (NO_PUBLISH_RULE, 50.0, 50.0, True),
+        (NO_PUBLISH_RULE, 50.0, 50.1, False),
+        (PublishRule(deadband=0.5), 50.0, 50.5, True),
+        (PublishRule(deadband=0.5), 50.0, 49.4, False),
+        (PublishRule(deadband=1, relative=True), 200.0, 202.0, True),
+        (PublishRule(deadband=1, relative=True), 200.0, 197.9, False),
+        (PublishRule(deadband=1, relative=True), -200.0, -198.0, True),
+        (PublishRule(deadband=0.5), None, 50.0, False),
+        (PublishRule(deadband=0.5), 50.0, None, False),
+        (PublishRule(deadband=0.5), "low", "high", False),
+        (PublishRule(deadband=0.5), "low", "low", True),
+    ],
+)
+def test_within_deadband(rule: PublishRule, old, new, within: bool) -> None:
+    """Changes within the deadband are held, others and non numbers are not."""
+    assert rule.within_deadband(old, new) is within
+
+
+def test_default_rules() -> None:
+    """Without options only the chip temperature jitter is held back."""
+    rules = publish_rules({})
+    assert rules == DEFAULT_PUBLISH_RULES
+    assert rules.get("hashrate", NO_PUBLISH_RULE) == NO_PUBLISH_RULE
+
+
+def test_rules_from_options() -> None:
+    """Configured rules override the defaults and fill missing keys."""
+    rules = publish_rules(
+        {
+            CONF_PUBLISH_RULES: {
+                "hashrate": {
+                    CONF_DEADBAND: 2,
+                    CONF_DEADBAND_RELATIVE: True,
+                    CONF_MIN_PUBLISH_INTERVAL: 300,
+                },
+                "chip_temperature": {CONF_MIN_PUBLISH_INTERVAL: 60},
+            }
+        }
+    )
+    assert rules["hashrate"] == PublishRule(deadband=2, relative=True, min_interval=300)
+    assert rules["chip_temperature"] == PublishRule(min_interval=60)
+    assert (
+        rules["u_mid_chip_temperature"]
+        == DEFAULT_PUBLISH_RULES["u_mid_chip_temperature"]
+    )
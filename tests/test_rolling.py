@@ -0,0 +1,110 @@
+"""Tests for the rolling windows of a miner."""
+from __future__ import annotations
+
+import statistics
+
+import pytest
+
+from custom_components.miner.rolling import ROLLING_1H
+from custom_components.miner.rolling import ROLLING_5M
+from custom_components.miner.rolling import ROLLING_24H
+from custom_components.miner.rolling import MinerRolling
+
+from .conftest import make_board
+from .conftest import make_snapshot
+
+POLL_INTERVAL = 10
+START = 1_700_000_000 - 1_700_000_000 % 300
+
+
+def test_empty() -> None:
+    """Windows without samples have no stats."""
+    rolling = MinerRolling(3, POLL_INTERVAL)
+    assert rolling.stats(ROLLING_5M, "hashrate") == (None, None, 0)
+    assert rolling.uptime(ROLLING_24H) is None
+
+
+def test_mean_and_stddev() -> None:
+    """A window reports the mean and population deviation of its samples."""
+    rolling = MinerRolling(3, POLL_INTERVAL)
+    values = [100.0, 102.0, 98.0, 104.0, 96.0]
+    for step, value in enumerate(values):
+        rolling.add(START + step * POLL_INTERVAL, make_snapshot(hashrate=value))
+    for window in (ROLLING_5M, ROLLING_1H, ROLLING_24H):
+        mean, stddev, samples = rolling.stats(window, "hashrate")
+        assert mean == pytest.approx(statistics.fmean(values))
+        assert stddev == pytest.approx(statistics.pstdev(values))
+        assert samples == len(values)
+
+
+def test_samples_expire() -> None:
+    """Samples older than a window leave it, longer windows keep them."""
+    rolling = MinerRolling(3, POLL_INTERVAL)
+    rolling.add(START, make_snapshot(hashrate=50.0))
+    for step in range(1, 31):
+        rolling.add(START + step * POLL_INTERVAL, make_snapshot(hashrate=100.0))
+
+    mean, stddev, samples = rolling.stats(ROLLING_5M, "hashrate")
+    assert (mean, stddev, samples) == (100.0, 0.0, 30)
+    mean, _, samples = rolling.stats(ROLLING_1H, "hashrate")
+    assert samples == 31
+    assert mean == pytest.approx((50 + 30 * 100) / 31)
+
+
+def test_ring_wraps() -> None:
+    """More than an hour of samples keeps the hour window exact."""
+    rolling = MinerRolling(3, POLL_INTERVAL)
+    for step in range(1000):
+        rolling.add(START + step * POLL_INTERVAL, make_snapshot(hashrate=float(step)))
+    mean, _, samples = rolling.stats(ROLLING_1H, "hashrate")
+    assert samples == 360
+    assert mean == pytest.approx(statistics.fmean(range(640, 1000)))
+    _, _, samples = rolling.stats(ROLLING_24H, "hashrate")
+    assert samples == 1000
+
+
+def test_day_window_over_buckets() -> None:
+    """The day window drops whole buckets once they are a day old."""
+    rolling = MinerRolling(3, 300)
+    for step in range(300):
+        rolling.add(START + step * 300, make_snapshot(hashrate=float(step)))
+    mean, _, samples = rolling.stats(ROLLING_24H, "hashrate")
+    assert samples == 288
+    assert mean == pytest.approx(statistics.fmean(range(12, 300)))
+
+
+def test_missing_values_and_boards() -> None:
+    """Missing values are left out, boards are tracked by slot."""
+    rolling = MinerRolling(2, POLL_INTERVAL)
+    rolling.add(
+        START,
+        make_snapshot(
+            hashrate=None,
+            boards=(make_board(board_hashrate=30.0), None),
+        ),
+    )
+    rolling.add(
+        START + POLL_INTERVAL,
+        make_snapshot(
+            hashrate=90.0,
+            boards=(make_board(board_hashrate=32.0), make_board(board_hashrate=28.0)),
+        ),
+    )
+    assert rolling.stats(ROLLING_5M, "hashrate") == (90.0, 0.0, 1)
+    assert rolling.stats(ROLLING_5M, "board_hashrate", 0)[0] == pytest.approx(31.0)
+    assert rolling.stats(ROLLING_5M, "board_hashrate", 1) == (28.0, 0.0, 1)
+    assert rolling.stats(ROLLING_5M, "board_hashrate", 2) == (None, None, 0)
+
+
+def test_uptime() -> None:
+    """Failed polls and polls while not mining count as downtime."""
+    rolling = MinerRolling(3, POLL_INTERVAL)
+    rolling.add(START, make_snapshot(hashrate=100.0))
+    rolling.add(START + 10, make_snapshot(is_mining=False, hashrate=0.0))
+    rolling.add(START + 20, None)
+    rolling.add(START + 30, make_snapshot(hashrate=100.0))
+    for window in (ROLLING_5M, ROLLING_24H):
+        assert rolling.uptime(window) == 0.5
+    mean, _, samples = rolling.stats(ROLLING_5M, "hashrate")
+    assert samples == 3
+    assert mean == pytest.approx(200 / 3)
@@ -0,0 +1,78 @@
+"""Tests for the long-term statistics buckets of a miner."""
+from __future__ import annotations
+
+import json
+
+from custom_components.miner.statistics import STATISTICS
+from custom_components.miner.statistics import STATISTICS_BUCKET
+from custom_components.miner.statistics import STATISTICS_HOUR
+from custom_components.miner.statistics import MinerStatistics
+
+from .conftest import make_snapshot
+
+HOUR = 1_700_000_000 - 1_700_000_000 % STATISTICS_HOUR
+HASHRATE = [statistic for statistic, *_ in STATISTICS].index("hashrate")
+
+
+def test_buckets_fold_into_hours() -> None:
+    """Closed buckets are imported as the count, sum, min and max of the hour."""
+    statistics = MinerStatistics()
+    for step, value in enumerate((100.0, 110.0, 90.0)):
+        statistics.add(make_snapshot(hashrate=value), HOUR + step * 200)
+
+    changed = statistics.take_changed(HOUR + 2 * STATISTICS_BUCKET)
+    assert [start for start, _ in changed] == [HOUR]
+    assert changed[0][1][HASHRATE] == [3, 300.0, 90.0, 110.0]
+    assert statistics.take_changed(HOUR + 2 * STATISTICS_BUCKET) == []
+
+
+def test_open_bucket_waits() -> None:
+    """The open bucket is only imported once it ended, or when final."""
+    statistics = MinerStatistics()
+    statistics.add(make_snapshot(hashrate=100.0), HOUR)
+    assert statistics.take_changed(HOUR + 10) == []
+    assert statistics.take_changed(HOUR + 10, final=True)[0][1][HASHRATE] == [
+        1,
+        100.0,
+        100.0,
+        100.0,
+    ]
+
+
+def test_past_hours_are_dropped() -> None:
+    """Hours that can get no more buckets are dropped once taken."""
+    statistics = MinerStatistics()
+    statistics.add(make_snapshot(hashrate=100.0), HOUR)
+    statistics.add(make_snapshot(hashrate=100.0), HOUR + STATISTICS_HOUR)
+    changed = statistics.take_changed(HOUR + STATISTICS_HOUR + STATISTICS_BUCKET)
+    assert [start for start, _ in changed] == [HOUR, HOUR + STATISTICS_HOUR]
+    assert [start for start, _ in statistics.as_dict()["hours"]] == [
+        HOUR + STATISTICS_HOUR
+    ]
+
+
+def test_restore_continues_the_hour() -> None:
+    """After a restart the hour is imported with the samples before it."""
+    before = MinerStatistics()
+    for step in range(6):
+        before.add(make_snapshot(hashrate=100.0), HOUR + step * 100)
+    before.take_changed(HOUR + 600, final=True)
+
+    after = MinerStatistics()
+    after.restore(json.loads(json.dumps(before.as_dict())))
+    for step in range(3):
+        after.add(make_snapshot(hashrate=200.0), HOUR + 900 + step * 100)
+
+    changed = after.take_changed(HOUR + 1200)
+    assert [start for start, _ in changed] == [HOUR]
+    assert changed[0][1][HASHRATE] == [9, 1200.0, 100.0, 200.0]
+
+
+def test_mac_survives_restore() -> None:
+    """The statistic ids keep the MAC of the samples across a restart."""
+    before = MinerStatistics()
+    before.add(make_snapshot(hashrate=100.0), HOUR)
+
+    after = MinerStatistics()
+    after.restore(json.loads(json.dumps(before.as_dict())))
+    assert after.mac == "02:00:00:00:00:01"